@@ -7,6 +7,7 @@ import { motion } from 'framer-motion';
 import { BarChart3, Map, Fish, TrendingUp, Activity, Database, Target, ArrowRight, Headphones, Users } from 'lucide-react';
 import Link from 'next/link';
 import StationsMap from '../../components/StationsMap';
+import TemporalCoverageTable from '../../components/TemporalCoverageTable';
 import AcousticIndicesHeatmap from '../../components/heatmaps/AcousticIndicesHeatmap';
 import DetectionsHeatmap from '../../components/heatmaps/DetectionsHeatmap';
 import EnvironmentalHeatmap from '../../components/heatmaps/EnvironmentalHeatmap';
@@ -200,6 +201,19 @@ export default function ApproachPage() {
             <StationsMap className="h-[400px]" />
           </div>
 
+          <div className="bg-card rounded-lg shadow-lg border p-6 mb-8">
+            <div className="flex items-center mb-4">
+              <Database className="h-6 w-6 text-chart-3 mr-3" />
+              <div>
+                <h3 className="text-xl font-semibold">Data Coverage by Station</h3>
+                <p className="text-sm text-muted-foreground">
+                  When each data stream has records, how much of its span is covered and its longest gap
+                </p>
+              </div>
+            </div>
+            <TemporalCoverageTable />
+          </div>
+
           <div className="bg-accent/10 border border-accent/30 rounded-lg p-6">
             <p className="text-muted-foreground">
               <strong>Why May River?</strong> This system provides an ideal test case with established fish communities, 
@@ -0,0 +1,114 @@
+'use client';
+
+import { useMemo, useState } from 'react';
+import { useTemporalCoverage } from '@/lib/data';
+
+interface TemporalCoverageTableProps {
+  className?: string;
+}
+
+const formatDate = (iso: string) => iso.slice(0, 10);
+
+export default function TemporalCoverageTable({ className = '' }: TemporalCoverageTableProps) {
+  const { data, loading, error, source } = useTemporalCoverage();
+  const [selectedStation, setSelectedStation] = useState<string>('all');
+
+  const rows = useMemo(() => {
+    if (!data) return [];
+    return selectedStation === 'all'
+      ? data.summary
+      : data.summary.filter(row => row.station === selectedStation);
+  }, [data, selectedStation]);
+
+  // Hours where every stream at the station has data at once
+  const overlapHours = useMemo(() => {
+    if (!data) return 0;
+    return data.overlap
+      .filter(window => selectedStation === 'all' || window.station === selectedStation)
+      .reduce((total, window) => total + window.hours, 0);
+  }, [data, selectedStation]);
+
+  if (loading) {
+    return (
+      <div className={`flex items-center justify-center p-8 ${className}`}>
+        <div className="text-center">
+          <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-primary mx-auto mb-2"></div>
+          <p className="text-sm text-muted-foreground">Loading coverage data...</p>
+          {source && <p className="text-xs text-muted-foreground mt-1">From: {source}</p>}
+        </div>
+      </div>
+    );
+  }
+
+  if (error || !data) {
+    return (
+      <div className={`bg-red-50 border border-red-200 rounded-lg p-4 text-center ${className}`}>
+        <p className="text-sm text-red-600 mb-2">Failed to load coverage data</p>
+        {error && <p className="text-xs text-red-500">{error.message}</p>}
+      </div>
+    );
+  }
+
+  const gapThreshold = data.metadata.gap_threshold_hours;
+  const gapCount = data.gaps.filter(
+    gap => selectedStation === 'all' || gap.station === selectedStation
+  ).length;
+
+  return (
+    <div className={className}>
+      <div className="flex flex-wrap items-center justify-between gap-4 mb-4">
+        <div className="flex items-center gap-2">
+          <label htmlFor="coverage-station" className="text-sm font-medium">Station:</label>
+          <select
+            id="coverage-station"
+            value={selectedStation}
+            onChange={e => setSelectedStation(e.target.value)}
+            className="border rounded px-2 py-1 text-sm bg-background"
+          >
+            <option value="all">All stations</option>
+            {data.metadata.stations.map(station => (
+              <option key={station} value={station}>{station}</option>
+            ))}
+          </select>
+        </div>
+        <div className="flex gap-6 text-sm text-muted-foreground">
+          <span>
+            <strong className="text-card-foreground">{Math.round(overlapHours).toLocaleString()}</strong> h with all streams present
+          </span>
+          <span>
+            <strong className="text-card-foreground">{gapCount}</strong> gaps over {gapThreshold} h
+          </span>
+        </div>
+      </div>
+
+      <div className="overflow-x-auto">
+        <table className="w-full text-sm">
+          <thead>
+            <tr className="border-b text-left text-muted-foreground">
+              <th className="py-2 pr-4 font-medium">Station</th>
+              <th className="py-2 pr-4 font-medium">Stream</th>
+              <th className="py-2 pr-4 font-medium">First</th>
+              <th className="py-2 pr-4 font-medium">Last</th>
+              <th className="py-2 pr-4 font-medium text-right">Points</th>
+              <th className="py-2 pr-4 font-medium text-right">Coverage</th>
+              <th className="py-2 font-medium text-right">Longest gap</th>
+            </tr>
+          </thead>
+          <tbody>
+            {rows.map(row => (
+              <tr key={`${row.station}-${row.stream}`} className="border-b last:border-0">
+                <td className="py-2 pr-4">{row.station}</td>
+                <td className="py-2 pr-4">{row.stream}</td>
+                <td className="py-2 pr-4">{formatDate(row.first)}</td>
+                <td className="py-2 pr-4">{formatDate(row.last)}</td>
+                <td className="py-2 pr-4 text-right">{row.n_points.toLocaleString()}</td>
+                <td className="py-2 pr-4 text-right">{(row.coverage_fraction * 100).toFixed(1)}%</td>
+                <td className="py-2 text-right">{row.longest_gap_hours.toFixed(1)} h</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      </div>
+    </div>
+  );
+}
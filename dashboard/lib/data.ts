@@ -175,4 +175,68 @@ export function loadStationLocations(): Promise<StationLocation[]> {
  */
 export function useStationLocations() {
   return useViewData<StationLocation[]>('stations_locations');
-}
\ No newline at end of file
+}
+
+// Temporal coverage types (written by notebook 10 from the notebook 1 interval index)
+export interface CoverageInterval {
+  station: string;
+  stream: string;
+  start: string;
+  end: string;
+  n_points: number;
+  step_hours: number;
+}
+
+export interface CoverageGap {
+  station: string;
+  stream: string;
+  gap_start: string;
+  gap_end: string;
+  hours: number;
+}
+
+export interface CoverageOverlap {
+  station: string;
+  start: string;
+  end: string;
+  hours: number;
+}
+
+export interface CoverageSummary {
+  station: string;
+  stream: string;
+  n_points: number;
+  n_runs: number;
+  first: string;
+  last: string;
+  covered_hours: number;
+  span_hours: number;
+  coverage_fraction: number;
+  longest_gap_hours: number;
+}
+
+export interface TemporalCoverage {
+  intervals: CoverageInterval[];
+  gaps: CoverageGap[];
+  overlap: CoverageOverlap[];
+  summary: CoverageSummary[];
+  metadata: {
+    stations: string[];
+    streams: string[];
+    gap_threshold_hours: number;
+  };
+}
+
+/**
+ * Load temporal coverage data
+ */
+export function loadTemporalCoverage(): Promise<TemporalCoverage> {
+  return loadViewData<TemporalCoverage>('temporal_coverage');
+}
+
+/**
+ * React hook for temporal coverage
+ */
+export function useTemporalCoverage() {
+  return useViewData<TemporalCoverage>('temporal_coverage');
+}
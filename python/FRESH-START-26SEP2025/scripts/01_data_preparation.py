@@ -13,6 +13,7 @@ then performs quality assessment and temporal alignment to 2-hour intervals.
 Key Outputs:
 - data/processed/aligned_dataset_2021.parquet - Complete temporally aligned dataset
 - data/processed/data_quality_report.json - Coverage and quality metrics
+- data/processed/01_coverage_intervals.parquet - Run-length availability intervals per data stream
 - figures/01_data_coverage_summary.png - Temporal coverage visualization  
 - figures/01_missing_data_heatmap.png - Missing data patterns
 
@@ -31,6 +32,10 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from mbon_utils.acoustic_index_reader import load_index_table
+from mbon_utils.coverage_index import CoverageIndex
+from mbon_utils.temporal_aggregation import aggregate_bins
+
 def find_project_root():
     """Find main project root (mbon-dash-2025) by looking for data/raw folder structure"""
     current_dir = Path(__file__).parent if "__file__" in locals() else Path.cwd()
@@ -47,6 +52,8 @@ DATA_DIR = DATA_ROOT / "raw"  # Main project raw data
 OUTPUT_DIR = DATA_ROOT / "processed"  # Main project processed folder
 FIGURE_DIR = DATA_ROOT / "processed" / "fresh_start_figures"  # Figures subfolder in processed
 
+INDICES_CACHE_DIR = OUTPUT_DIR / "indices_cache"  # Acoustic index CSVs converted to float32 Parquet
+
 # Ensure output directories exist
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 FIGURE_DIR.mkdir(parents=True, exist_ok=True)
@@ -55,6 +62,7 @@ FIGURE_DIR.mkdir(parents=True, exist_ok=True)
 YEAR = 2021
 STATIONS = ['9M', '14M', '37M']
 AGGREGATION_HOURS = 2  # Aggregate to 2-hour intervals
+GAP_REPORT_HOURS = 24  # Report data gaps longer than this
 
 print("="*60)
 print("SCRIPT 1: DATA PREPARATION")
@@ -68,7 +76,7 @@ print(f"Stations: {', '.join(STATIONS)}")
 print()
 
 def load_acoustic_indices():
-    """Load acoustic indices data for all stations"""
+    """Load acoustic indices for all stations via the streamed float32 Parquet cache"""
     print("1. LOADING ACOUSTIC INDICES")
     print("-" * 30)
     
@@ -80,7 +88,7 @@ def load_acoustic_indices():
         
         if file_path.exists():
             try:
-                df = pd.read_csv(file_path)
+                df = load_index_table(file_path, INDICES_CACHE_DIR)
                 indices_data[station] = df
                 indices_info[station] = {
                     'rows': len(df),
@@ -320,13 +328,8 @@ def create_temporal_alignment(indices_data, detection_data, temp_data, depth_dat
                     # Get numeric columns (indices)
                     numeric_cols = df_idx.select_dtypes(include=[np.number]).columns.tolist()
                     
-                    # Create 2-hour windows
-                    df_idx['datetime_2h'] = df_idx['datetime'].dt.floor(f'{AGGREGATION_HOURS}h')
-                    
-                    # Aggregate by taking mean
-                    agg_dict = {col: 'mean' for col in numeric_cols}
-                    df_idx_grouped = df_idx.groupby('datetime_2h').agg(agg_dict).reset_index()
-                    df_idx_grouped.rename(columns={'datetime_2h': 'datetime'}, inplace=True)
+                    # Mean per 2-hour window
+                    df_idx_grouped = aggregate_bins(df_idx, numeric_cols, f'{AGGREGATION_HOURS}h', group_col=None)
                     
                     # Align to detection time grid by merging
                     station_df = station_df.merge(df_idx_grouped, on='datetime', how='left')
@@ -346,14 +349,8 @@ def create_temporal_alignment(indices_data, detection_data, temp_data, depth_dat
                 if 'Date and time' in df_temp.columns and 'Water temp (°C)' in df_temp.columns:
                     df_temp['datetime'] = pd.to_datetime(df_temp['Date and time'], errors='coerce')
                     
-                    # Create 2-hour windows
-                    df_temp['datetime_2h'] = df_temp['datetime'].dt.floor(f'{AGGREGATION_HOURS}h')
-                    
-                    # Aggregate by taking mean
-                    df_temp_grouped = df_temp.groupby('datetime_2h').agg({
-                        'Water temp (°C)': 'mean'
-                    }).reset_index()
-                    df_temp_grouped.rename(columns={'datetime_2h': 'datetime'}, inplace=True)
+                    # Mean per 2-hour window
+                    df_temp_grouped = aggregate_bins(df_temp, ['Water temp (°C)'], f'{AGGREGATION_HOURS}h', group_col=None)
                     
                     # Align to detection time grid by merging
                     station_df = station_df.merge(df_temp_grouped, on='datetime', how='left')
@@ -373,14 +370,8 @@ def create_temporal_alignment(indices_data, detection_data, temp_data, depth_dat
                 if 'Date and time' in df_depth.columns and 'Water depth (m)' in df_depth.columns:
                     df_depth['datetime'] = pd.to_datetime(df_depth['Date and time'], errors='coerce')
                     
-                    # Create 2-hour windows
-                    df_depth['datetime_2h'] = df_depth['datetime'].dt.floor(f'{AGGREGATION_HOURS}h')
-                    
-                    # Aggregate by taking mean
-                    df_depth_grouped = df_depth.groupby('datetime_2h').agg({
-                        'Water depth (m)': 'mean'
-                    }).reset_index()
-                    df_depth_grouped.rename(columns={'datetime_2h': 'datetime'}, inplace=True)
+                    # Mean per 2-hour window
+                    df_depth_grouped = aggregate_bins(df_depth, ['Water depth (m)'], f'{AGGREGATION_HOURS}h', group_col=None)
                     
                     # Align to detection time grid by merging
                     station_df = station_df.merge(df_depth_grouped, on='datetime', how='left')
@@ -475,7 +466,46 @@ def create_temporal_alignment(indices_data, detection_data, temp_data, depth_dat
         print("⚠️ Warning: No data could be aligned")
         return pd.DataFrame()
 
-def generate_quality_report(indices_info, detection_info, env_info, spl_info, combined_df):
+def build_coverage_index(indices_data, detection_data, temp_data, depth_data, spl_data):
+    """Compress every raw data stream's timestamps into run-length availability intervals"""
+    coverage_index = CoverageIndex()
+    
+    for station in STATIONS:
+        if station in detection_data:
+            df_det = detection_data[station]
+            date_col = 'Date' if 'Date' in df_det.columns else 'Date '
+            if date_col in df_det.columns:
+                coverage_index.add(station, 'Detections (2h)', df_det[date_col], f'{AGGREGATION_HOURS}h')
+        
+        if station in temp_data and 'Date and time' in temp_data[station].columns:
+            coverage_index.add(station, 'Temperature (20m)', temp_data[station]['Date and time'], '20min')
+        
+        if station in depth_data and 'Date and time' in depth_data[station].columns:
+            coverage_index.add(station, 'Depth (1h)', depth_data[station]['Date and time'], '1h')
+        
+        if station in spl_data:
+            df_spl = spl_data[station]
+            if 'Date' in df_spl.columns and 'Time' in df_spl.columns:
+                # Time column holds 1900-dated datetimes or time objects; keep only the time of day
+                dates = pd.to_datetime(df_spl['Date'], errors='coerce').dt.normalize()
+                times = pd.to_datetime(df_spl['Time'].astype(str), errors='coerce', format='mixed')
+                coverage_index.add(station, 'SPL (1h)', dates + (times - times.dt.normalize()), '1h')
+        
+        if station in indices_data:
+            df_idx = indices_data[station]
+            for col in ['datetime', 'DateTime', 'Date', 'time', 'Time']:
+                if col in df_idx.columns:
+                    coverage_index.add(station, 'Indices', df_idx[col])
+                    break
+    
+    coverage_file = OUTPUT_DIR / "01_coverage_intervals.parquet"
+    coverage_index.intervals.to_parquet(coverage_file, index=False)
+    print(f"✓ Coverage index: {len(coverage_index.intervals)} intervals across {len(coverage_index.stations)} stations")
+    print(f"✓ Coverage intervals saved: {coverage_file}")
+    print()
+    return coverage_index
+
+def generate_quality_report(indices_info, detection_info, env_info, spl_info, combined_df, coverage_index):
     """Generate comprehensive data quality report"""
     print("6. GENERATING DATA QUALITY REPORT")
     print("-" * 40)
@@ -518,6 +548,10 @@ def generate_quality_report(indices_info, detection_info, env_info, spl_info, co
             'detection_success_rate': len(detection_info) / len(STATIONS),
             'environmental_success_rate': len(env_info['temperature_stations']) / len(STATIONS),
             'spl_success_rate': len(spl_info) / len(STATIONS)
+        },
+        'temporal_coverage': {
+            'gap_threshold_hours': GAP_REPORT_HOURS,
+            **{key: value for key, value in coverage_index.to_records(GAP_REPORT_HOURS).items() if key != 'intervals'}
         }
     }
     
@@ -535,6 +569,7 @@ def generate_quality_report(indices_info, detection_info, env_info, spl_info, co
     print(f"Environmental: {len(env_info['temperature_stations'])}/{len(STATIONS)} temperature, {len(env_info['depth_stations'])}/{len(STATIONS)} depth")
     print(f"SPL: {len(spl_info)}/{len(STATIONS)} stations")
     print(f"Final aligned dataset: {len(combined_df)} records")
+    print(f"Data gaps over {GAP_REPORT_HOURS}h: {len(quality_report['temporal_coverage']['gaps'])}")
     
     return quality_report
 
@@ -694,8 +729,11 @@ def main():
     # Perform temporal alignment
     combined_df = create_temporal_alignment(indices_data, detection_data, temp_data, depth_data, spl_data)
     
+    # Index raw data availability per stream
+    coverage_index = build_coverage_index(indices_data, detection_data, temp_data, depth_data, spl_data)
+    
     # Generate quality report
-    quality_report = generate_quality_report(indices_info, detection_info, env_info, spl_info, combined_df)
+    quality_report = generate_quality_report(indices_info, detection_info, env_info, spl_info, combined_df, coverage_index)
     
     # Create visualizations
     create_coverage_plots(combined_df, quality_report)
@@ -715,6 +753,7 @@ def main():
     print(f"Key outputs:")
     print(f"- Aligned dataset: {OUTPUT_DIR / 'aligned_dataset_2021.parquet'}")
     print(f"- Quality report: {OUTPUT_DIR / 'data_quality_report.json'}")
+    print(f"- Coverage intervals: {OUTPUT_DIR / '01_coverage_intervals.parquet'}")
     print(f"- Coverage summary: {FIGURE_DIR / '01_data_coverage_summary.png'}")
     print(f"- Missing data heatmap: {FIGURE_DIR / '01_missing_data_heatmap.png'}")
 
@@ -39,6 +39,8 @@ from scipy.spatial.distance import squareform
 from sklearn.preprocessing import StandardScaler
 from statsmodels.stats.outliers_influence import variance_inflation_factor
 
+from mbon_utils.acoustic_index_reader import load_index_table
+
 def find_project_root():
     """Find main project root (mbon-dash-2025) by looking for data/raw folder structure"""
     current_dir = Path(__file__).parent if "__file__" in locals() else Path.cwd()
@@ -106,7 +108,8 @@ def identify_acoustic_indices(df):
         file_path = DATA_ROOT / "raw" / "indices" / f"Acoustic_Indices_{station}_{year}_FullBW_v2_Final.csv"
         if file_path.exists():
             try:
-                df_idx = pd.read_csv(file_path)
+                # Streamed once into a float32 Parquet cache shared with the other scripts
+                df_idx = load_index_table(file_path, DATA_ROOT / "processed" / "indices_cache")
                 # Create datetime column for merging
                 df_idx['datetime'] = pd.to_datetime(df_idx['Date'], errors='coerce')
                 df_idx['station'] = station
@@ -128,7 +131,7 @@ def identify_acoustic_indices(df):
                    'hour', 'minute', 'second', 'File', 'Deployment ID']
     
     acoustic_index_cols = [col for col in df_indices_combined.columns 
-                          if col not in exclude_cols and df_indices_combined[col].dtype in ['float64', 'int64']]
+                          if col not in exclude_cols and pd.api.types.is_numeric_dtype(df_indices_combined[col])]
     
     print(f"Identified {len(acoustic_index_cols)} acoustic index columns")
     print(f"First 10: {acoustic_index_cols[:10]}")
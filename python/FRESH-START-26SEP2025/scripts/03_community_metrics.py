@@ -32,6 +32,8 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from mbon_utils.community_metrics import CommunityMetricsBuilder
+
 def find_project_root():
     """Find main project root (mbon-dash-2025) by looking for data/raw folder structure"""
     current_dir = Path(__file__).parent if "__file__" in locals() else Path.cwd()
@@ -47,6 +49,10 @@ INPUT_DIR = DATA_ROOT / "processed"  # Main project processed folder
 OUTPUT_DIR = DATA_ROOT / "processed"  # Main project processed folder
 FIGURE_DIR = DATA_ROOT / "processed" / "fresh_start_figures"  # Figures subfolder
 
+# Percentile thresholds: None pools all rows; ['station'] or ['station', 'month'] gives local thresholds
+THRESHOLD_BY = None
+CHUNK_SIZE = 50_000  # Rows per chunk fed to the community metrics builder
+
 # Ensure output directories exist
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 FIGURE_DIR.mkdir(parents=True, exist_ok=True)
@@ -128,75 +134,44 @@ def create_community_metrics(df, fish_species, dolphin_species, unknown_bio):
     print("3. CREATING COMMUNITY METRICS")
     print("-" * 35)
     
-    df_metrics = df[['datetime', 'station']].copy()
+    # Sums, richness, calendar features and threshold sketches are computed in a
+    # single pass per chunk. Sums and richness come from the community kernel
+    # that notebooks 06 and 08 use for their fish and marine metrics.
+    # finalize() keeps every chunk's metrics in memory; for archives streamed
+    # with iter_parquet_chunks() that do not fit, pass spill_dir= and use
+    # builder.write_parquet() instead
+    builder = CommunityMetricsBuilder(fish_species, dolphin_species, unknown_bio,
+                                      threshold_by=THRESHOLD_BY)
+    for start in range(0, len(df), CHUNK_SIZE):
+        builder.update(df.iloc[start:start + CHUNK_SIZE])
+    df_metrics = builder.finalize()
     
-    # 1. Total Fish Calling Intensity (sum across all fish species)
     if fish_species:
-        df_metrics['total_fish_intensity'] = df[fish_species].sum(axis=1)
         print(f"✓ Total fish intensity: sum of {len(fish_species)} fish species")
-    else:
-        df_metrics['total_fish_intensity'] = 0
-        print("⚠️ No fish species found")
-    
-    # 2. Fish Species Richness (number of species calling in each time period)
-    if fish_species:
-        df_metrics['fish_species_richness'] = (df[fish_species] > 0).sum(axis=1)
         print(f"✓ Fish species richness: count of active species from {len(fish_species)} total")
     else:
-        df_metrics['fish_species_richness'] = 0
+        print("⚠️ No fish species found")
     
-    # 3. Total Dolphin Activity (sum of all dolphin detection types)
     if dolphin_species:
-        df_metrics['total_dolphin_activity'] = df[dolphin_species].sum(axis=1)
         print(f"✓ Total dolphin activity: sum of {len(dolphin_species)} dolphin detection types")
     else:
-        df_metrics['total_dolphin_activity'] = 0
         print("⚠️ No dolphin species found")
     
-    # 4. Total Biological Activity (fish + dolphins + unknown biological)
-    bio_columns = fish_species + dolphin_species + unknown_bio
-    if bio_columns:
-        df_metrics['total_biological_activity'] = df[bio_columns].sum(axis=1)
-        print(f"✓ Total biological activity: sum of {len(bio_columns)} biological detection types")
-    else:
-        df_metrics['total_biological_activity'] = 0
+    print(f"✓ Total biological activity: sum of {len(builder.species_columns)} biological detection types")
     
-    # 5. Activity Level Percentiles (binary indicators for different activity thresholds)
+    # Activity level percentiles (pooled, or per group when THRESHOLD_BY is set)
+    thresholds = builder.thresholds
     if fish_species:
-        fish_intensity = df_metrics['total_fish_intensity']
-        
-        # Any fish activity (> 0)
-        df_metrics['any_fish_activity'] = (fish_intensity > 0).astype(int)
-        
-        # High activity thresholds based on percentiles
-        percentile_75 = fish_intensity.quantile(0.75)
-        percentile_90 = fish_intensity.quantile(0.90)
-        
-        df_metrics['fish_activity_75th'] = (fish_intensity >= percentile_75).astype(int)
-        df_metrics['fish_activity_90th'] = (fish_intensity >= percentile_90).astype(int)
-        
-        print(f"✓ Activity thresholds: 75th percentile = {percentile_75:.2f}, 90th percentile = {percentile_90:.2f}")
-    else:
-        df_metrics['any_fish_activity'] = 0
-        df_metrics['fish_activity_75th'] = 0  
-        df_metrics['fish_activity_90th'] = 0
-    
-    # 6. Temporal features for modeling
-    df_metrics['hour_of_day'] = df_metrics['datetime'].dt.hour
-    df_metrics['day_of_year'] = df_metrics['datetime'].dt.dayofyear
-    df_metrics['month'] = df_metrics['datetime'].dt.month
-    df_metrics['season'] = df_metrics['month'].map({
-        12: 'Winter', 1: 'Winter', 2: 'Winter',
-        3: 'Spring', 4: 'Spring', 5: 'Spring', 
-        6: 'Summer', 7: 'Summer', 8: 'Summer',
-        9: 'Fall', 10: 'Fall', 11: 'Fall'
-    })
+        grouping = ', '.join(THRESHOLD_BY) if THRESHOLD_BY else 'pooled'
+        print(f"✓ Activity thresholds ({grouping}, {len(thresholds)} groups):")
+        for key, values in list(thresholds.items())[:5]:
+            print(f"    {key}: 75th percentile = {values['75th']:.2f}, 90th percentile = {values['90th']:.2f}")
     
     print(f"✓ Added temporal features: hour, day_of_year, month, season")
     print(f"Final community metrics dataset: {df_metrics.shape}")
     print()
     
-    return df_metrics
+    return df_metrics, thresholds
 
 def analyze_vessel_impact(df, df_metrics, vessel_anthro):
     """Analyze how vessel presence affects biological community metrics"""
@@ -474,7 +449,7 @@ def create_vessel_impact_visualization(df_metrics, vessel_impact):
     plt.close()
     print(f"✓ Vessel impact visualization saved: {vessel_file}")
 
-def save_results(df_metrics, vessel_impact, fish_species, dolphin_species):
+def save_results(df_metrics, vessel_impact, fish_species, dolphin_species, thresholds):
     """Save community metrics and analysis results"""
     print("8. SAVING RESULTS")
     print("-" * 20)
@@ -519,6 +494,13 @@ def save_results(df_metrics, vessel_impact, fish_species, dolphin_species):
                 'any_activity_percent': float(df_metrics['any_fish_activity'].mean() * 100),
                 'high_activity_75th_periods': int(df_metrics['fish_activity_75th'].sum()),
                 'high_activity_90th_periods': int(df_metrics['fish_activity_90th'].sum())
+            },
+            'activity_thresholds': {
+                'grouping': THRESHOLD_BY or 'pooled',
+                'values': {
+                    ' / '.join(map(str, key)) if isinstance(key, tuple) else str(key): values
+                    for key, values in thresholds.items()
+                }
             }
         },
         'vessel_impact': vessel_impact,
@@ -553,7 +535,7 @@ def main():
     fish_species, dolphin_species, vessel_anthro, unknown_bio = identify_species_columns(df)
     
     # Create community metrics
-    df_metrics = create_community_metrics(df, fish_species, dolphin_species, unknown_bio)
+    df_metrics, thresholds = create_community_metrics(df, fish_species, dolphin_species, unknown_bio)
     
     # Analyze vessel impact
     vessel_impact = analyze_vessel_impact(df, df_metrics, vessel_anthro)
@@ -564,7 +546,7 @@ def main():
     create_vessel_impact_visualization(df_metrics, vessel_impact)
     
     # Save results
-    save_results(df_metrics, vessel_impact, fish_species, dolphin_species)
+    save_results(df_metrics, vessel_impact, fish_species, dolphin_species, thresholds)
     
     print()
     print("="*60)
@@ -42,6 +42,10 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import itertools
 
+from mbon_utils.ablation import combine_groups
+from mbon_utils.acoustic_index_reader import load_index_table
+from mbon_utils.effort_lift import compute_effort_lift
+
 def find_project_root():
     """Find main project root (mbon-dash-2025) by looking for data/raw folder structure"""
     current_dir = Path(__file__).parent if "__file__" in locals() else Path.cwd()
@@ -56,6 +60,9 @@ DATA_ROOT = PROJECT_ROOT / "data"
 INPUT_DIR = DATA_ROOT / "processed"  # Main project processed folder
 OUTPUT_DIR = DATA_ROOT / "processed"  # Main project processed folder
 FIGURE_DIR = DATA_ROOT / "processed" / "fresh_start_figures"  # Figures subfolder
+EFFORT_LIFT_CACHE_DIR = DATA_ROOT / "processed" / "cache" / "effort_lift"  # Out-of-fold predictions
+# 'random_forest', or 'hist' to train gradient boosting on the cached uint8 binned feature matrix
+EFFORT_LIFT_MODEL = 'random_forest'
 
 # Ensure output directories exist
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -100,7 +107,7 @@ def load_analysis_datasets():
         file_path = DATA_ROOT / "raw" / "indices" / f"Acoustic_Indices_{station}_{year}_FullBW_v2_Final.csv"
         if file_path.exists():
             try:
-                df_idx = pd.read_csv(file_path)
+                df_idx = load_index_table(file_path, DATA_ROOT / "processed" / "indices_cache")
                 df_idx['datetime'] = pd.to_datetime(df_idx['Date'], errors='coerce')
                 df_idx['station'] = station
                 indices_data[station] = df_idx
@@ -165,7 +172,7 @@ def identify_feature_categories(df_metrics, df_aligned, df_indices):
         exclude_cols = ['Date', 'Time', 'station', 'datetime', 'year', 'month', 'day', 
                        'hour', 'minute', 'second', 'File', 'Deployment ID']
         acoustic_index_features = [col for col in df_indices.columns 
-                                 if col not in exclude_cols and df_indices[col].dtype in ['float64', 'int64']]
+                                 if col not in exclude_cols and pd.api.types.is_numeric_dtype(df_indices[col])]
     
     # Community target variables (what we want to predict)
     # Include both predefined community metrics and any biological detection features
@@ -373,84 +380,37 @@ def calculate_effort_lift_analysis(df_analysis, feature_categories, results_df):
     print("5. CALCULATING EFFORT-LIFT ANALYSIS")
     print("-" * 40)
     
-    effort_results = {}
     targets = feature_categories['targets']
     effort_levels = [0.1, 0.2, 0.3, 0.4, 0.5]  # 10%, 20%, 30%, 40%, 50% effort
     
-    # Feature groups to test
-    feature_groups = {
+    # Base feature groups, defined once; combinations are built from them
+    base_groups = {
         'Baseline': ['hour_of_day', 'day_of_year', 'month'] + 
                    [col for col in df_analysis.columns if col.startswith('station_')],
         'ENV': feature_categories['environmental'],
         'SPL': feature_categories['spl'],
         'INDEX': feature_categories['acoustic_indices'],
-        'ENV+SPL': feature_categories['environmental'] + feature_categories['spl'],
-        'ENV+INDEX': feature_categories['environmental'] + feature_categories['acoustic_indices'],
-        'ALL': feature_categories['environmental'] + feature_categories['spl'] + feature_categories['acoustic_indices']
+    }
+    feature_groups = {
+        **base_groups,
+        **combine_groups(base_groups, [('ENV', 'SPL'), ('ENV', 'INDEX')]),
+        'ALL': combine_groups(base_groups, [('ENV', 'SPL', 'INDEX')])['ENV+SPL+INDEX'],
     }
     
-    for target in targets[:3]:  # Limit to top 3 targets for computational efficiency
-        if target not in df_analysis.columns:
-            continue
-            
-        print(f"\nAnalyzing effort-lift for target: {target}")
-        
-        # Prepare data
-        all_features = list(set(
-            [f for group_features in feature_groups.values() for f in group_features if f in df_analysis.columns]
-        ))
-        
-        valid_data = df_analysis[[target] + all_features].dropna()
-        if len(valid_data) < 200:
-            print(f"  ⚠️ Insufficient data: {len(valid_data)} samples")
-            continue
-        
-        y = valid_data[target].values
-        
-        target_results = {}
-        
-        for group_name, features in feature_groups.items():
-            available_features = [f for f in features if f in valid_data.columns]
-            if not available_features:
-                continue
-                
-            try:
-                X = valid_data[available_features].values
-                
-                # Train simple random forest for ranking
-                rf = RandomForestRegressor(n_estimators=50, random_state=42, n_jobs=-1)
-                rf.fit(X, y)
-                
-                # Get predictions (proxy for biological activity likelihood)
-                predictions = rf.predict(X)
-                
-                # Calculate lift at different effort levels
-                group_lift = []
-                for effort in effort_levels:
-                    # Select top effort% of predictions
-                    n_select = int(len(predictions) * effort)
-                    top_indices = np.argsort(predictions)[-n_select:]
-                    
-                    # Calculate biological activity capture rate
-                    selected_activity = y[top_indices].sum()
-                    total_activity = y.sum()
-                    
-                    capture_rate = selected_activity / total_activity if total_activity > 0 else 0
-                    lift = capture_rate / effort if effort > 0 else 0
-                    
-                    group_lift.append({
-                        'effort_level': effort,
-                        'capture_rate': capture_rate,
-                        'lift': lift
-                    })
-                
-                target_results[group_name] = group_lift
-                print(f"  ✓ {group_name}: 20% effort captures {target_results[group_name][1]['capture_rate']:.1%} of activity")
-                
-            except Exception as e:
-                print(f"  ⚠️ Error with {group_name}: {e}")
-        
-        effort_results[target] = target_results
+    # Out-of-fold predictions are fitted once per (target, group) on a process pool
+    # and cached by data and features, so every target can be analysed rather than
+    # just the first few and adding a group only fits the new (target, group) tasks
+    effort_results = compute_effort_lift(
+        df_analysis, targets, feature_groups,
+        effort_levels=effort_levels,
+        config={'model': EFFORT_LIFT_MODEL},
+        cache_dir=EFFORT_LIFT_CACHE_DIR
+    )
+    
+    for target, target_results in effort_results.items():
+        print(f"\nEffort-lift for target: {target}")
+        for group_name, group_lift in target_results.items():
+            print(f"  ✓ {group_name}: 20% effort captures {group_lift[1]['capture_rate']:.1%} of activity")
     
     print(f"\nEffort-lift analysis complete for {len(effort_results)} targets")
     print()
@@ -712,12 +672,16 @@ def create_effort_lift_curves(effort_results):
         print("⚠️ No effort results to plot")
         return None
     
-    fig, axes = plt.subplots(1, len(effort_results), figsize=(5*len(effort_results), 6))
-    if len(effort_results) == 1:
-        axes = [axes]
+    # Wrap panels onto rows of three now that every target is analysed
+    n_cols = min(3, len(effort_results))
+    n_rows = int(np.ceil(len(effort_results) / n_cols))
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(5*n_cols, 6*n_rows), squeeze=False)
+    axes = axes.ravel()
+    for ax in axes[len(effort_results):]:
+        ax.set_visible(False)
     
     for i, (target, target_data) in enumerate(effort_results.items()):
-        ax = axes[i] if len(effort_results) > 1 else axes
+        ax = axes[i]
         
         for group_name, group_data in target_data.items():
             efforts = [d['effort_level'] for d in group_data]
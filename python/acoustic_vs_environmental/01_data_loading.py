@@ -20,6 +20,8 @@ import pandas as pd
 import numpy as np
 from utils.data_utils import CleanDataLoader
 
+from mbon_utils.temporal_aggregation import aggregate_bins
+
 
 def aggregate_to_2hour(df: pd.DataFrame, datetime_col: str = 'datetime', 
                       station_col: str = 'station') -> pd.DataFrame:
@@ -34,26 +36,17 @@ def aggregate_to_2hour(df: pd.DataFrame, datetime_col: str = 'datetime',
     Returns:
         DataFrame aggregated to 2-hour intervals
     """
-    df_agg = df.copy()
-    
-    # Create 2-hour time bins (floor to even hours: 0, 2, 4, 6, etc.)
-    df_agg[datetime_col] = pd.to_datetime(df_agg[datetime_col])
-    df_agg['datetime_2h'] = df_agg[datetime_col].dt.floor('2h')
-    
-    # Group by station and 2-hour bins, aggregate numeric columns
-    numeric_cols = df_agg.select_dtypes(include=[np.number]).columns.tolist()
+    # Numeric columns are averaged per station and 2-hour bin (floored to even hours: 0, 2, 4, 6, etc.)
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     numeric_cols = [col for col in numeric_cols if col not in [station_col]]
     
     if not numeric_cols:
         print(f"⚠️  No numeric columns found for aggregation")
+        df_agg = df.copy()
+        df_agg[datetime_col] = pd.to_datetime(df_agg[datetime_col])
         return df_agg
     
-    aggregated = (df_agg.groupby([station_col, 'datetime_2h'])[numeric_cols]
-                  .mean()
-                  .reset_index())
-    
-    # Rename datetime column back
-    aggregated = aggregated.rename(columns={'datetime_2h': datetime_col})
+    aggregated = aggregate_bins(df, numeric_cols, freq='2h', group_col=station_col, time_col=datetime_col)
     
     print(f"✓ Aggregated to 2-hour intervals: {df.shape} → {aggregated.shape}")
     return aggregated
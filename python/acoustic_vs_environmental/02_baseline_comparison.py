@@ -18,14 +18,17 @@ sys.path.append(str(Path(__file__).parent))
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from sklearn.feature_selection import mutual_info_classif
-from sklearn.model_selection import cross_val_score, StratifiedKFold
+from sklearn.model_selection import StratifiedKFold
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
 import warnings
 warnings.filterwarnings('ignore')
 
+from mbon_utils.fold_scaling import FoldScaledMatrix
+from mbon_utils.mutual_information import MutualInfoScorer
+
+MI_CACHE_DIR = Path("output/phase2_baseline/mi_cache")
+
 
 def load_aligned_data():
     """Load the Phase 1 aligned dataset."""
@@ -106,8 +109,8 @@ def mutual_information_analysis(df, feature_groups, target='any_activity'):
     # Handle any remaining missing values
     X = X.fillna(X.mean())
     
-    # Calculate mutual information
-    mi_scores = mutual_info_classif(X, y, random_state=42)
+    # Calculate mutual information (cached per feature matrix and target)
+    mi_scores = MutualInfoScorer(X, random_state=42, cache_dir=MI_CACHE_DIR).score(y)
     
     # Create results dataframe
     mi_results = pd.DataFrame({
@@ -226,6 +229,12 @@ def baseline_model_comparison(df, feature_groups, selected_acoustic_indices):
     print(f"Dataset: {df.shape[0]} observations")
     print(f"Target distribution: {dict(df[target].value_counts(normalize=True).round(3))}")
     
+    # Scale the union of all feature sets once per fold (training rows only);
+    # acoustic-then-environmental order keeps every set a contiguous block
+    all_features = [f for f in dict.fromkeys(feature_sets['combined_raw']['features']) if f in df.columns]
+    X_all = df[all_features].fillna(df[all_features].mean())
+    scaled_folds = FoldScaledMatrix(X_all, df[target], cv)
+    
     for model_name, model in models.items():
         print(f"\n📈 {model_name.upper()} RESULTS:")
         print("-" * 35)
@@ -233,21 +242,14 @@ def baseline_model_comparison(df, feature_groups, selected_acoustic_indices):
         model_results = {}
         
         for set_name, set_config in feature_sets.items():
-            available_features = [f for f in set_config['features'] if f in df.columns]
+            available_features = [f for f in dict.fromkeys(set_config['features']) if f in df.columns]
             
             if len(available_features) == 0:
                 print(f"  ⚠️ No features available for {set_name}")
                 continue
             
-            X = df[available_features].fillna(df[available_features].mean())
-            y = df[target]
-            
-            # Scale features
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
-            # Cross-validation
-            cv_scores = cross_val_score(model, X_scaled, y, cv=cv, scoring='f1')
+            # Cross-validation with fold-local scaling
+            cv_scores = scaled_folds.cross_val_score(model, available_features, scoring='f1')
             
             model_results[set_name] = {
                 'mean_f1': cv_scores.mean(),
@@ -35,8 +35,12 @@ from sklearn.neighbors import KernelDensity
 from sklearn.metrics import roc_auc_score, average_precision_score
 from scipy.stats import pearsonr
 from scipy.ndimage import gaussian_filter
+from functools import partial
 import itertools
 
+from mbon_utils.station_transfer import map_splits, transfer_splits
+from mbon_utils.threshold_curves import metrics_at_effort
+
 # Set up plotting style
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
@@ -264,26 +268,30 @@ def enhance_surface_with_features(baseline_surface, df, species, station_subset,
     enhancement_grid = np.ones_like(baseline_surface)
     
     try:
-        # For each grid point, estimate enhancement factor
-        for day in range(1, 366):
-            for period in range(12):
-                # Find nearby data points
-                day_mask = (train_data['day_of_year'] >= day - 7) & (train_data['day_of_year'] <= day + 7)
-                period_mask = (train_data['period_of_day'] == period)
-                nearby_mask = day_mask & period_mask
-                
-                if nearby_mask.sum() > 5:  # Need minimum data points
-                    nearby_data = train_data[nearby_mask]
-                    nearby_detections = nearby_data[species].fillna(0).sum()
-                    nearby_total = len(nearby_data)
-                    
-                    if nearby_total > 0:
-                        local_rate = nearby_detections / nearby_total
-                        global_rate = y.mean()
-                        
-                        if global_rate > 0:
-                            enhancement_factor = local_rate / global_rate
-                            enhancement_grid[day-1, period] = min(enhancement_factor, 5.0)  # Cap enhancement
+        # Per (day, period) sample counts and detection totals, then ±7-day window
+        # sums for every grid point from cumulative sums along the day axis
+        days = train_data['day_of_year'].to_numpy(dtype=int)
+        periods = train_data['period_of_day'].to_numpy(dtype=int)
+        in_grid = (days >= 0) & (days <= 366) & (periods >= 0) & (periods < 12)
+        cells = days[in_grid] * 12 + periods[in_grid]
+        cell_counts = np.bincount(cells, minlength=367 * 12).reshape(367, 12)
+        cell_detections = np.bincount(
+            cells, weights=train_data[species].fillna(0).to_numpy()[in_grid], minlength=367 * 12
+        ).reshape(367, 12)
+        
+        cum_counts = np.vstack([np.zeros((1, 12)), np.cumsum(cell_counts, axis=0)])
+        cum_detections = np.vstack([np.zeros((1, 12)), np.cumsum(cell_detections, axis=0)])
+        grid_days = np.arange(1, 366)
+        lo = np.maximum(grid_days - 7, 0)
+        hi = np.minimum(grid_days + 7, 366) + 1
+        nearby_total = cum_counts[hi] - cum_counts[lo]
+        nearby_detections = cum_detections[hi] - cum_detections[lo]
+        
+        global_rate = y.mean()
+        if global_rate > 0:
+            # Need minimum data points; cap enhancement at 5x
+            local_rate = np.divide(nearby_detections, nearby_total, out=np.zeros_like(nearby_total), where=nearby_total > 0)
+            enhancement_grid = np.where(nearby_total > 5, np.minimum(local_rate / global_rate, 5.0), 1.0)
         
         # Apply Gaussian smoothing to enhancement grid
         enhancement_grid = gaussian_filter(enhancement_grid, sigma=2.0)
@@ -300,15 +308,40 @@ def enhance_surface_with_features(baseline_surface, df, species, station_subset,
     
     return enhanced_surface
 
-def cross_station_validation(df, species, acoustic_features, env_features):
+def fit_station_surfaces(df, species, acoustic_features, env_features, train_stations):
+    """Baseline and feature-enhanced surfaces for one set of training stations."""
+    baseline = build_2d_probability_surface(df, species, list(train_stations))
+    enhanced = enhance_surface_with_features(
+        baseline, df, species, list(train_stations), acoustic_features, env_features
+    )
+    return {'baseline': baseline, 'enhanced': enhanced}
+
+def fit_transfer_surfaces(df, species, acoustic_features, env_features):
     """
-    Perform 3-fold cross-station validation.
+    Leave-one-station-out surfaces for every station in the data.
+    
+    Surfaces for each training set are built in parallel on a process pool.
+    
+    Returns:
+        List of (train_stations, test_station, surfaces) tuples
+    """
+    stations = sorted(df['station'].dropna().unique())
+    splits = transfer_splits(stations, scheme='leave_one_out')
+    fitted = map_splits(
+        partial(fit_station_surfaces, df, species, acoustic_features, env_features), splits
+    )
+    return [(list(train), test[0], fitted[train]) for train, test in splits]
+
+def cross_station_validation(df, species, acoustic_features, env_features, transfer_surfaces=None):
+    """
+    Perform leave-one-station-out cross-station validation.
     
     Args:
         df: Full DataFrame
         species: Target species name
         acoustic_features: List of acoustic feature names
         env_features: List of environmental feature names
+        transfer_surfaces: Output of fit_transfer_surfaces (built here if None)
     
     Returns:
         Dict with validation results
@@ -317,21 +350,14 @@ def cross_station_validation(df, species, acoustic_features, env_features):
     print(f"\n🔍 CROSS-STATION VALIDATION FOR {species}")
     print("=" * 60)
     
-    stations = ['9M', '14M', '37M']
+    if transfer_surfaces is None:
+        transfer_surfaces = fit_transfer_surfaces(df, species, acoustic_features, env_features)
     results = {}
     
-    for test_station in stations:
-        train_stations = [s for s in stations if s != test_station]
-        
+    for train_stations, test_station, station_surfaces in transfer_surfaces:
         print(f"\n📊 Training on {train_stations}, testing on {test_station}")
         
-        # Build baseline surface on training stations
-        baseline_surface = build_2d_probability_surface(df, species, train_stations)
-        
-        # Enhance surface with features
-        enhanced_surface = enhance_surface_with_features(
-            baseline_surface, df, species, train_stations, acoustic_features, env_features
-        )
+        enhanced_surface = station_surfaces['enhanced']
         
         # Test on held-out station
         test_data = df[df['station'] == test_station].copy()
@@ -341,51 +367,33 @@ def cross_station_validation(df, species, acoustic_features, env_features):
             print(f"   ⚠️ Only {test_detections.sum()} detections in test data - skipping")
             continue
         
-        # Calculate priority scores for test data
-        priority_scores = []
-        actual_detections = []
-        
-        for _, row in test_data.iterrows():
-            day_idx = int(row['day_of_year']) - 1  # Convert to 0-based index
-            period_idx = int(row['period_of_day'])
-            
-            if 0 <= day_idx < 365 and 0 <= period_idx < 12:
-                baseline_score = baseline_surface[day_idx, period_idx]
-                enhanced_score = enhanced_surface[day_idx, period_idx]
-                priority_scores.append(enhanced_score)
-                actual_detections.append(int(row[species] > 0 if not pd.isna(row[species]) else 0))
+        # Calculate priority scores for test data (surface lookup by day and 2-hour period)
+        day_idx = test_data['day_of_year'].astype(int).to_numpy() - 1  # Convert to 0-based index
+        period_idx = test_data['period_of_day'].astype(int).to_numpy()
+        valid = (day_idx >= 0) & (day_idx < 365) & (period_idx >= 0) & (period_idx < 12)
         
-        if len(priority_scores) == 0:
+        if not valid.any():
             print("   ⚠️ No valid scores calculated")
             continue
         
         # Calculate validation metrics
-        priority_scores = np.array(priority_scores)
-        actual_detections = np.array(actual_detections)
+        priority_scores = enhanced_surface[day_idx[valid], period_idx[valid]]
+        actual_detections = (test_data[species].to_numpy()[valid] > 0).astype(int)
         
-        # Rank periods by priority score
-        ranked_indices = np.argsort(priority_scores)[::-1]  # High to low
-        
-        # Calculate detection efficiency at different thresholds
+        # Detection efficiency when checking the top-ranked share of periods, from one sort.
+        # Tied scores are ranked in row order (stable sort), so the top-k set is reproducible
         thresholds = [0.1, 0.2, 0.3, 0.4, 0.5]
         efficiency_results = {}
-        
-        for threshold in thresholds:
-            n_check = int(len(ranked_indices) * threshold)
-            if n_check > 0:
-                top_periods = ranked_indices[:n_check]
-                detections_found = actual_detections[top_periods].sum()
-                total_detections = actual_detections.sum()
-                
-                efficiency = detections_found / total_detections if total_detections > 0 else 0
-                time_savings = 1 - threshold  # Fraction of time saved
-                
-                efficiency_results[threshold] = {
-                    'detection_efficiency': efficiency,
-                    'time_savings': time_savings,
-                    'detections_found': detections_found,
-                    'total_detections': total_detections
-                }
+        total_detections = actual_detections.sum()
+        
+        effort_curve = metrics_at_effort(priority_scores, actual_detections, thresholds)
+        for effort in effort_curve[effort_curve['n_flagged'] > 0].itertuples(index=False):
+            efficiency_results[effort.effort_level] = {
+                'detection_efficiency': effort.capture_rate,
+                'time_savings': 1 - effort.effort_level,  # Fraction of time saved
+                'detections_found': effort.true_positives,
+                'total_detections': total_detections
+            }
         
         # AUC score if we have both classes
         if len(np.unique(actual_detections)) > 1:
@@ -776,7 +784,6 @@ def main():
     
     # Analysis results storage
     species_results = {}
-    stations = ['9M', '14M', '37M']
     
     # Process each species
     for species in target_species:
@@ -791,28 +798,21 @@ def main():
         
         print(f"   Using {len(acoustic_features)} acoustic + {len(env_features)} environmental features")
         
-        # Build surfaces for each station combination
+        # Build surfaces for each leave-one-station-out combination (once, in parallel)
+        transfer_surfaces = fit_transfer_surfaces(df, species, acoustic_features, env_features)
         surfaces = {}
-        for test_station in stations:
-            train_stations = [s for s in stations if s != test_station]
-            
-            # Build baseline surface
-            baseline = build_2d_probability_surface(df, species, train_stations)
-            
-            # Enhance with features
-            enhanced = enhance_surface_with_features(
-                baseline, df, species, train_stations, acoustic_features, env_features
-            )
-            
+        for train_stations, test_station, station_surfaces in transfer_surfaces:
             surfaces[f"train_{'+'.join(train_stations)}_test_{test_station}"] = {
-                'baseline': baseline,
-                'enhanced': enhanced,
+                'baseline': station_surfaces['baseline'],
+                'enhanced': station_surfaces['enhanced'],
                 'train_stations': train_stations,
                 'test_station': test_station
             }
         
         # Perform cross-station validation
-        validation_results = cross_station_validation(df, species, acoustic_features, env_features)
+        validation_results = cross_station_validation(
+            df, species, acoustic_features, env_features, transfer_surfaces
+        )
         
         # Store results
         species_results[species] = {
@@ -833,7 +833,7 @@ def main():
     print("=" * 50)
     print(f"✅ Analyzed {len(species_results)} species")
     print(f"✅ Generated 2D probability surfaces")
-    print(f"✅ Performed 3-fold cross-station validation")
+    print(f"✅ Performed leave-one-station-out cross-station validation")
     print(f"✅ Created visualizations and summary tables")
     
     if not overview_df.empty:
@@ -27,6 +27,10 @@ from sklearn.metrics import classification_report, confusion_matrix
 import warnings
 warnings.filterwarnings('ignore')
 
+from mbon_utils.band_matrix import band_group_features, load_band_matrix
+from mbon_utils.temporal_aggregation import aggregate_bins
+from mbon_utils.temporal_features import native_temporal_features
+
 class ImprovedTemporalAnalysis:
     """
     Systematic approach to temporal analysis of marine acoustic data.
@@ -66,6 +70,21 @@ class ImprovedTemporalAnalysis:
             print(f"✓ Loaded {station}: {df.shape}")
         
         self.indices_native = pd.concat(indices_data, ignore_index=True)
+        if 'datetime' not in self.indices_native.columns and 'Date' in self.indices_native.columns:
+            self.indices_native['datetime'] = pd.to_datetime(self.indices_native['Date'])
+        
+        # Per-band ACI (parsed by notebook 01 into aci_bands/) as low/mid/high and centroid features
+        band_dir = self.data_dir / "aci_bands"
+        band_frames = []
+        for station in self.indices_native['station'].unique():
+            if (band_dir / station / "header.json").exists():
+                band_times, band_values = load_band_matrix(band_dir, station)
+                band_frames.append(band_group_features(band_times, band_values).assign(station=station))
+        if band_frames:
+            band_features = pd.concat(band_frames, ignore_index=True).drop_duplicates(['station', 'datetime'])
+            self.indices_native['datetime'] = pd.to_datetime(self.indices_native['datetime']).astype('datetime64[ns]')
+            self.indices_native = self.indices_native.merge(band_features, on=['station', 'datetime'], how='left')
+            print(f"✓ Added per-band ACI features: {[c for c in band_features.columns if c.startswith('ACI_band')]}")
         
         # Load 2-hour detection data (ground truth)
         bio_file = self.data_dir / "02_biological_activity_features_2021.parquet"
@@ -103,7 +122,8 @@ class ImprovedTemporalAnalysis:
         print("(Not clustering-based dimensionality reduction)")
         
         # First, align acoustic indices to 2-hour resolution for initial screening
-        # Filter to only numeric acoustic index columns (exclude strings like 'Date', 'Filename', 'ACI_by_band')
+        # Filter to only numeric acoustic index columns (exclude strings like 'Date', 'Filename', 'ACI_by_band';
+        # the per-band values come in as the numeric ACI_band_* features)
         acoustic_cols = []
         for col in self.indices_native.columns:
             if col not in ['datetime', 'station', 'year', 'Date', 'Filename']:
@@ -114,17 +134,12 @@ class ImprovedTemporalAnalysis:
                 else:
                     acoustic_cols.append(col)
         
+        self.acoustic_cols = acoustic_cols
         print(f"Screening {len(acoustic_cols)} acoustic indices...")
         
         # Aggregate acoustic indices to 2-hour resolution
         self.indices_native['datetime'] = pd.to_datetime(self.indices_native['datetime'])
-        self.indices_native['datetime_2h'] = self.indices_native['datetime'].dt.floor('2h')
-        
-        indices_2h = (self.indices_native
-                     .groupby(['station', 'datetime_2h'])[acoustic_cols]
-                     .mean()
-                     .reset_index())
-        indices_2h.rename(columns={'datetime_2h': 'datetime'}, inplace=True)
+        indices_2h = aggregate_bins(self.indices_native, acoustic_cols, freq='2h')
         
         # Merge with biological data for screening
         merged_screening = indices_2h.merge(
@@ -164,76 +179,42 @@ class ImprovedTemporalAnalysis:
         
         return True
         
-    def create_fine_resolution_temporal_features(self):
+    def create_fine_resolution_temporal_features(self, indices=None):
         """
         Create temporal features at native 1-hour resolution before aggregation.
         This preserves fine-grained temporal patterns.
+        
+        By default features are built for the selected top indices; pass
+        ``indices=self.acoustic_cols`` to build them for every screened index.
         """
         print(f"\n⏰ PHASE 3: FINE-RESOLUTION TEMPORAL FEATURES")
         print("="*60)
         print("Creating temporal features at 1-hour resolution, then aggregating")
         print("(Preserves fine-grained temporal dynamics)")
         
-        # Sort by station and datetime
-        self.indices_native = self.indices_native.sort_values(['station', 'datetime'])
-        
-        temporal_features_native = []
+        indices = self.top_indices if indices is None else list(indices)
+        self.indices_native['datetime'] = pd.to_datetime(self.indices_native['datetime'])
         
-        # Process each station separately to maintain temporal order
-        for station in self.indices_native['station'].unique():
-            print(f"\nProcessing station {station}...")
-            
-            station_mask = self.indices_native['station'] == station
-            station_df = self.indices_native[station_mask].copy().reset_index(drop=True)
-            station_df['datetime'] = pd.to_datetime(station_df['datetime'])
-            station_df = station_df.sort_values('datetime')
-            
-            # Create temporal features for selected indices only
-            for idx_name in self.top_indices:
-                if idx_name in station_df.columns:
-                    # 1-3 hour lags (at native 1-hour resolution)
-                    station_df[f'{idx_name}_lag_1h'] = station_df[idx_name].shift(1)
-                    station_df[f'{idx_name}_lag_2h'] = station_df[idx_name].shift(2) 
-                    station_df[f'{idx_name}_lag_3h'] = station_df[idx_name].shift(3)
-                    
-                    # Rolling means (preserve fine structure)
-                    station_df[f'{idx_name}_mean_3h'] = station_df[idx_name].rolling(window=3, min_periods=1).mean()
-                    station_df[f'{idx_name}_mean_6h'] = station_df[idx_name].rolling(window=6, min_periods=1).mean()
-                    station_df[f'{idx_name}_mean_12h'] = station_df[idx_name].rolling(window=12, min_periods=1).mean()
-                    
-                    # Change features (trend detection)
-                    station_df[f'{idx_name}_change_2h'] = station_df[idx_name] - station_df[f'{idx_name}_lag_2h']
-                    station_df[f'{idx_name}_change_4h'] = station_df[idx_name] - station_df[idx_name].shift(4)
-            
-            temporal_features_native.append(station_df)
+        # 1-3 hour lags, 3/6/12 hour rolling means and 2/4 hour changes for all
+        # indices at once, per station in time order
+        temporal_indices = [idx_name for idx_name in indices if idx_name in self.indices_native.columns]
+        self.indices_with_temporal = native_temporal_features(self.indices_native, temporal_indices)
+        print(f"Processed {self.indices_with_temporal['station'].nunique()} stations, {len(temporal_indices)} indices")
         
-        # Combine all stations
-        self.indices_with_temporal = pd.concat(temporal_features_native, ignore_index=True)
+        # Get all feature columns (original + temporal) - only numeric ones
+        feature_cols = [col for col in self.indices_with_temporal.columns
+                        if col not in ['datetime', 'station', 'Date', 'Filename']
+                        and pd.api.types.is_numeric_dtype(self.indices_with_temporal[col])
+                        and not pd.api.types.is_bool_dtype(self.indices_with_temporal[col])]
         
         # Now aggregate to 2-hour resolution (preserving the temporal feature information)
-        self.indices_with_temporal['datetime_2h'] = self.indices_with_temporal['datetime'].dt.floor('2h')
-        
-        # Get all feature columns (original + temporal) - only numeric ones
-        feature_cols = []
-        for col in self.indices_with_temporal.columns:
-            if col not in ['datetime', 'datetime_2h', 'station', 'Date', 'Filename']:
-                if self.indices_with_temporal[col].dtype in ['float64', 'int64', 'float32', 'int32']:
-                    feature_cols.append(col)
-                elif not col.endswith('_by_band') and not isinstance(self.indices_with_temporal[col].iloc[0], str):
-                    feature_cols.append(col)
-        
-        # Aggregate to 2-hour resolution using only numeric columns
-        self.indices_aggregated = (self.indices_with_temporal
-                                  .groupby(['station', 'datetime_2h'])[feature_cols]
-                                  .mean(numeric_only=True)
-                                  .reset_index())
-        self.indices_aggregated.rename(columns={'datetime_2h': 'datetime'}, inplace=True)
+        self.indices_aggregated = aggregate_bins(self.indices_with_temporal, feature_cols, freq='2h')
         
         # Count temporal features created
         temporal_cols = [col for col in feature_cols if any(x in col for x in ['_lag_', '_mean_', '_change_'])]
         
         print(f"\n✅ Created temporal features:")
-        print(f"   Original indices: {len(self.top_indices)}")
+        print(f"   Original indices: {len(temporal_indices)}")
         print(f"   Temporal features: {len(temporal_cols)}")
         print(f"   Total features: {len(feature_cols)}")
         print(f"   Aggregated shape: {self.indices_aggregated.shape}")
@@ -0,0 +1 @@
+"""Shared analysis utilities for the acoustic index and community notebooks."""
@@ -0,0 +1,170 @@
+"""
+Feature-set ablation runner.
+
+Feature groups are defined once; combinations of groups and top-N prefixes
+of a ranking are enumerated into named feature sets. Every set is scored on
+the same CV folds with the same fold-local preprocessing
+(:class:`~mbon_utils.fold_scaling.FoldScaledMatrix`, or the codes of a
+:class:`~mbon_utils.binned_matrix.BinnedMatrix` for histogram tree models).
+Each (feature set, fold) fit is one task on a process pool whose workers
+receive the shared matrices once, and per-set fold scores are cached on
+disk under a key of the data, folds, columns, model and scoring, so adding
+a feature group only fits the sets that are new.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+
+from mbon_utils.binned_matrix import BinnedMatrix
+from mbon_utils.fold_scaling import FoldScaledMatrix
+
+
+CACHE_VERSION = 1
+
+# Matrices shared with pool workers through the initializer
+_WORKER_STATE: Dict[str, object] = {}
+
+
+def combine_groups(groups: Dict[str, List[str]], combos: Sequence[Sequence[str]], sep: str = '+') -> Dict[str, List[str]]:
+    """Feature sets for combinations of groups, named ``'ENV+SPL'`` etc., without repeated columns."""
+    feature_sets = {}
+    for combo in combos:
+        columns = [col for name in combo for col in groups[name]]
+        feature_sets[sep.join(combo)] = list(dict.fromkeys(columns))
+    return feature_sets
+
+
+def all_combinations(groups: Dict[str, List[str]], max_size: Optional[int] = None,
+                     sep: str = '+') -> Dict[str, List[str]]:
+    """Every combination of 1..``max_size`` groups (all sizes by default), in group order."""
+    names = list(groups)
+    max_size = max_size or len(names)
+    combos = [combo for size in range(1, max_size + 1) for combo in combinations(names, size)]
+    return combine_groups(groups, combos, sep)
+
+
+def top_n_sets(ranking: Sequence[str], counts: Sequence[int], prefix: str = 'top_') -> Dict[str, List[str]]:
+    """Prefixes of a feature ranking, named ``'top_5'`` etc.; counts beyond the ranking are skipped."""
+    ranking = list(ranking)
+    return {f"{prefix}{n}": ranking[:n] for n in counts if 0 < n <= len(ranking)}
+
+
+def _init_worker(scaled: FoldScaledMatrix, binned: Optional[BinnedMatrix]):
+    _WORKER_STATE['scaled'] = scaled
+    _WORKER_STATE['binned'] = binned
+
+
+def _fit_fold(task: Dict) -> float:
+    """Process-pool entry point: fit one model on one fold of one feature set and score it."""
+    scaled: FoldScaledMatrix = _WORKER_STATE['scaled']
+    fold, columns = task['fold'], task['columns']
+    if task['model_input'] == 'binned':
+        train, test = scaled.folds[fold]
+        X = _WORKER_STATE['binned'].model_input(columns)
+        X_train, X_test, y_train, y_test = X[train], X[test], scaled.y[train], scaled.y[test]
+    else:
+        X_train, X_test, y_train, y_test = scaled.fold_data(fold, columns)
+    model = clone(task['model']).fit(X_train, y_train)
+    return get_scorer(task['scoring'])(model, X_test, y_test)
+
+
+class AblationRunner:
+    """
+    Cross-validated scores of one or more models on many feature sets of one matrix.
+
+    ``X`` holds the union of all feature sets; ``cv`` is a scikit-learn
+    splitter or a list of ``(train, test)`` pairs and is split once.
+    ``binned`` (a :class:`BinnedMatrix` over the same rows and columns)
+    enables ``model_input='binned'``. Results are cached in ``cache_dir``.
+    """
+
+    def __init__(self, X: pd.DataFrame, y, cv, groups=None, binned: Optional[BinnedMatrix] = None,
+                 cache_dir=None, max_workers: Optional[int] = None):
+        self.scaled = FoldScaledMatrix(X, y, cv, groups)
+        self.binned = binned
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_workers = max_workers
+
+        digest = hashlib.sha256()
+        digest.update(self.scaled.values.tobytes())
+        digest.update(np.ascontiguousarray(self.scaled.y, dtype=np.float64).tobytes())
+        digest.update(json.dumps(self.scaled.columns).encode())
+        for train, test in self.scaled.folds:
+            digest.update(np.asarray(train, dtype=np.int64).tobytes())
+            digest.update(np.asarray(test, dtype=np.int64).tobytes())
+        self._data_key = digest.hexdigest()
+
+    def _cache_path(self, columns: List[str], model, scoring: str, model_input: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        description = json.dumps({
+            'data': self._data_key,
+            'columns': columns,
+            'model': type(model).__name__,
+            'params': model.get_params(deep=True),
+            'scoring': scoring,
+            'model_input': model_input,
+        }, sort_keys=True, default=str)
+        return self.cache_dir / f"ablation_{hashlib.sha256(description.encode()).hexdigest()[:24]}.json"
+
+    def run(self, model, feature_sets: Dict[str, List[str]], scoring: str = 'f1',
+            model_input: str = 'scaled') -> pd.DataFrame:
+        """
+        Fold scores of ``model`` on every feature set.
+
+        Returns one row per set with ``feature_set``, ``n_features``,
+        ``mean``, ``std`` and ``scores`` (per fold). Only sets missing from
+        the cache are fitted; all their folds go to the process pool at once.
+        """
+        if model_input not in ('scaled', 'binned'):
+            raise ValueError("model_input must be 'scaled' or 'binned'")
+        if model_input == 'binned' and self.binned is None:
+            raise ValueError("model_input='binned' needs a BinnedMatrix")
+
+        results: Dict[str, np.ndarray] = {}
+        pending = []
+        for name, columns in feature_sets.items():
+            columns = list(columns)
+            if not columns:
+                continue
+            cache_path = self._cache_path(columns, model, scoring, model_input)
+            if cache_path is not None and cache_path.exists():
+                with open(cache_path) as f:
+                    cached = json.load(f)
+                if cached.get('version') == CACHE_VERSION:
+                    results[name] = np.array(cached['scores'])
+                    continue
+            pending.append((name, columns, cache_path))
+
+        if pending:
+            tasks = [
+                {'fold': fold, 'columns': columns, 'model': model, 'scoring': scoring, 'model_input': model_input}
+                for _, columns, _ in pending for fold in range(self.scaled.n_folds)
+            ]
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(self.scaled, self.binned)) as executor:
+                scores = np.array(list(executor.map(_fit_fold, tasks))).reshape(len(pending), self.scaled.n_folds)
+
+            for (name, columns, cache_path), set_scores in zip(pending, scores):
+                results[name] = set_scores
+                if cache_path is not None:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(cache_path, 'w') as f:
+                        json.dump({'version': CACHE_VERSION, 'feature_set': name, 'columns': columns,
+                                   'scores': set_scores.tolist()}, f)
+
+        rows = [
+            {'feature_set': name, 'n_features': len(feature_sets[name]), 'mean': results[name].mean(),
+             'std': results[name].std(), 'scores': results[name]}
+            for name in feature_sets if name in results
+        ]
+        return pd.DataFrame(rows, columns=['feature_set', 'n_features', 'mean', 'std', 'scores'])
@@ -0,0 +1,163 @@
+"""
+Streaming reader for the ``Acoustic_Indices_*_FullBW_v2_Final.csv`` files.
+
+The CSVs are read in fixed-size chunks with dtypes declared up front: every
+index column as float32, ``Date`` parsed to datetime, ``Filename`` dropped
+and ``ACI_by_band`` either dropped or expanded into float32
+``ACI_band_<i>`` columns. Chunks are appended to a Parquet file, so each CSV
+is parsed once with bounded memory and later loads read the Parquet cache.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+DATE_COLUMN = 'Date'
+FILENAME_COLUMN = 'Filename'
+BAND_COLUMN = 'ACI_by_band'
+BAND_PREFIX = 'ACI_band_'
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def read_index_header(path) -> List[str]:
+    """Column names of an index CSV, without reading any rows."""
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def parse_band_values(values: pd.Series, n_bands: Optional[int] = None) -> np.ndarray:
+    """
+    Per-band ACI values as an (n_rows, n_bands) float32 array.
+
+    Accepts bracketed or bare lists separated by commas, semicolons or
+    whitespace. Missing entries and short rows are NaN-padded; with
+    ``n_bands`` rows are padded or truncated to that width.
+    """
+    text = values.astype('string').str.strip().str.strip('[]()').fillna('')
+    parts = text.str.split(r'[,;\s]+', regex=True, expand=True)
+    parsed = parts.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32)
+    if parsed.ndim != 2 or parsed.shape[0] != len(values):
+        parsed = np.empty((len(values), 0), dtype=np.float32)
+
+    width = n_bands if n_bands is not None else parsed.shape[1]
+    bands = np.full((len(values), width), np.nan, dtype=np.float32)
+    bands[:, :min(width, parsed.shape[1])] = parsed[:, :width]
+    return bands
+
+
+def _numeric_columns(columns: Sequence[str]) -> List[str]:
+    return [c for c in columns if c not in (DATE_COLUMN, FILENAME_COLUMN, BAND_COLUMN)]
+
+
+def iter_index_csv(path, chunksize: int = DEFAULT_CHUNKSIZE, keep_filename: bool = False,
+                   parse_bands: bool = False, n_bands: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield typed chunks of an index CSV.
+
+    Index columns are read directly as float32. If a column holds
+    non-numeric entries the file is re-read with those values coerced to
+    NaN, chunk by chunk, so memory stays bounded either way.
+    """
+    columns = read_index_header(path)
+    numeric_cols = _numeric_columns(columns)
+    usecols = [c for c in columns if c != BAND_COLUMN or parse_bands]
+    if not keep_filename:
+        usecols = [c for c in usecols if c != FILENAME_COLUMN]
+
+    def typed_chunks(numeric_dtype):
+        dtypes = {c: numeric_dtype for c in numeric_cols}
+        dtypes.update({c: 'string' for c in (FILENAME_COLUMN, BAND_COLUMN) if c in usecols})
+        if DATE_COLUMN in usecols:
+            dtypes[DATE_COLUMN] = 'string'
+        for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+            if numeric_dtype is not np.float32:
+                chunk[numeric_cols] = chunk[numeric_cols].apply(pd.to_numeric, errors='coerce').astype(np.float32)
+            yield chunk
+
+    def finish(chunk: pd.DataFrame) -> pd.DataFrame:
+        nonlocal n_bands
+        if DATE_COLUMN in chunk.columns:
+            chunk[DATE_COLUMN] = pd.to_datetime(chunk[DATE_COLUMN], errors='coerce')
+        if parse_bands and BAND_COLUMN in chunk.columns:
+            bands = parse_band_values(chunk.pop(BAND_COLUMN), n_bands)
+            # The band count is fixed by the first chunk so every chunk shares one schema
+            n_bands = bands.shape[1]
+            band_cols = [f"{BAND_PREFIX}{i}" for i in range(n_bands)]
+            chunk = pd.concat([chunk, pd.DataFrame(bands, columns=band_cols, index=chunk.index)], axis=1)
+        return chunk
+
+    yielded = 0
+    reader = typed_chunks(np.float32)
+    while True:
+        # Only the float32 read is guarded; errors from finish() or the caller propagate
+        try:
+            chunk = next(reader)
+        except StopIteration:
+            return
+        except pd.errors.ParserError:
+            raise
+        except ValueError:
+            break
+        yield finish(chunk)
+        yielded += len(chunk)
+
+    # A non-numeric entry: re-read with coercion, skipping the rows already yielded
+    skip = yielded
+    for chunk in typed_chunks(object):
+        if skip >= len(chunk):
+            skip -= len(chunk)
+            continue
+        yield finish(chunk.iloc[skip:].copy())
+        skip = 0
+
+
+def convert_index_csv(path, output_path, chunksize: int = DEFAULT_CHUNKSIZE, keep_filename: bool = False,
+                      parse_bands: bool = False, n_bands: Optional[int] = None) -> Dict[str, object]:
+    """Stream an index CSV into a float32 Parquet file; returns rows, columns and output size."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix('.parquet.tmp')
+
+    writer = None
+    rows = 0
+    try:
+        for chunk in iter_index_csv(path, chunksize, keep_filename, parse_bands, n_bands):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(table.cast(schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        raise ValueError(f"No rows in {path}")
+    tmp_path.replace(output_path)
+    return {
+        'rows': rows,
+        'columns': len(schema.names),
+        'file_size_mb': output_path.stat().st_size / (1024 * 1024),
+    }
+
+
+def load_index_table(csv_path, cache_dir, columns: Optional[Sequence[str]] = None,
+                     parse_bands: bool = False) -> pd.DataFrame:
+    """
+    Index table for ``csv_path``, converting it into ``cache_dir`` the first time.
+
+    The cached Parquet file is rebuilt when the CSV is newer than it.
+    ``columns`` limits the columns read from the cache.
+    """
+    csv_path = Path(csv_path)
+    suffix = '_bands' if parse_bands else ''
+    cache_path = Path(cache_dir) / f"{csv_path.stem}{suffix}.parquet"
+    if not cache_path.exists() or cache_path.stat().st_mtime < csv_path.stat().st_mtime:
+        convert_index_csv(csv_path, cache_path, parse_bands=parse_bands)
+    return pd.read_parquet(cache_path, columns=list(columns) if columns is not None else None)
@@ -0,0 +1,126 @@
+"""
+Per-band ACI matrices parsed from the ``ACI_by_band`` field of the index CSVs.
+
+Each station's by-band strings are parsed once, chunk by chunk, into a
+dense float32 (time x band) matrix stored as raw arrays next to a small JSON
+header, and loaded back as read-only memory maps. Band-group helpers turn
+the matrix into a few numeric features (mean ACI per frequency group and a
+spectral centroid) that join the regular index columns in feature
+reduction and modeling.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mbon_utils.acoustic_index_reader import (
+    BAND_COLUMN, DATE_COLUMN, DEFAULT_CHUNKSIZE, parse_band_values, read_index_header
+)
+
+
+def _station_dir(store_dir, station: str) -> Path:
+    return Path(store_dir) / str(station)
+
+
+def has_band_column(csv_path) -> bool:
+    """True if the index CSV has an ``ACI_by_band`` column (only the header is read)."""
+    return BAND_COLUMN in read_index_header(csv_path)
+
+
+def write_band_matrix(csv_path, store_dir, station: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Dict:
+    """
+    Parse ``ACI_by_band`` from an index CSV into ``store_dir/<station>``.
+
+    Only the ``Date`` and ``ACI_by_band`` columns are read. Rows without a
+    valid date are skipped; the band count is fixed by the first chunk.
+    Returns the stored header (rows, bands, source file). Raises
+    ``ValueError`` if the CSV has no ``ACI_by_band`` column (check with
+    :func:`has_band_column` first).
+    """
+    csv_path = Path(csv_path)
+    if not has_band_column(csv_path):
+        raise ValueError(f"No {BAND_COLUMN} column in {csv_path.name}")
+    station_dir = _station_dir(store_dir, station)
+    station_dir.mkdir(parents=True, exist_ok=True)
+
+    n_rows = 0
+    n_bands = None
+    reader = pd.read_csv(csv_path, usecols=[DATE_COLUMN, BAND_COLUMN],
+                         dtype={DATE_COLUMN: 'string', BAND_COLUMN: 'string'}, chunksize=chunksize)
+    with open(station_dir / 'bands.f32', 'wb') as band_file, open(station_dir / 'times.i8', 'wb') as time_file:
+        for chunk in reader:
+            times = pd.to_datetime(chunk[DATE_COLUMN], errors='coerce')
+            valid = times.notna().to_numpy()
+            bands = parse_band_values(chunk[BAND_COLUMN], n_bands)
+            n_bands = bands.shape[1]
+            np.ascontiguousarray(bands[valid]).tofile(band_file)
+            pd.DatetimeIndex(times[valid]).as_unit('ns').asi8.tofile(time_file)
+            n_rows += int(valid.sum())
+
+    header = {
+        'station': str(station),
+        'n_rows': n_rows,
+        'n_bands': n_bands or 0,
+        'source': csv_path.name,
+        'source_mtime': csv_path.stat().st_mtime,
+    }
+    with open(station_dir / 'header.json', 'w') as f:
+        json.dump(header, f, indent=2)
+    return header
+
+
+def band_matrix_is_current(csv_path, store_dir, station: str) -> bool:
+    """True if ``store_dir`` holds a matrix for ``station`` built from the current ``csv_path``."""
+    header_path = _station_dir(store_dir, station) / 'header.json'
+    if not header_path.exists():
+        return False
+    with open(header_path) as f:
+        header = json.load(f)
+    return header['source_mtime'] >= Path(csv_path).stat().st_mtime
+
+
+def load_band_matrix(store_dir, station: str) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """Timestamps and the read-only memory-mapped (time x band) float32 matrix for one station."""
+    station_dir = _station_dir(store_dir, station)
+    with open(station_dir / 'header.json') as f:
+        header = json.load(f)
+    shape = (header['n_rows'], header['n_bands'])
+    if header['n_rows'] == 0:
+        return pd.DatetimeIndex([], dtype='datetime64[ns]'), np.empty(shape, dtype=np.float32)
+    times = pd.DatetimeIndex(np.fromfile(station_dir / 'times.i8', dtype=np.int64).view('datetime64[ns]'))
+    bands = np.memmap(station_dir / 'bands.f32', dtype=np.float32, mode='r', shape=shape)
+    return times, bands
+
+
+def band_groups(n_bands: int, n_groups: int = 3) -> Dict[str, np.ndarray]:
+    """Contiguous, near-equal band groups; three groups are named low, mid and high."""
+    names = ['low', 'mid', 'high'] if n_groups == 3 else [f"g{i}" for i in range(n_groups)]
+    return {name: idx for name, idx in zip(names, np.array_split(np.arange(n_bands), n_groups)) if len(idx)}
+
+
+def band_group_features(times: pd.DatetimeIndex, bands: np.ndarray,
+                        groups: Optional[Dict[str, np.ndarray]] = None,
+                        prefix: str = 'ACI_band') -> pd.DataFrame:
+    """
+    Mean ACI per band group plus the band centroid, one row per timestamp.
+
+    The centroid is the ACI-weighted mean band position scaled to 0-1
+    (0 = lowest band), NaN where a row has no positive values.
+    """
+    groups = groups if groups is not None else band_groups(bands.shape[1])
+    features = {'datetime': times}
+    with np.errstate(invalid='ignore'):
+        for name, idx in groups.items():
+            group = bands[:, idx]
+            counts = (~np.isnan(group)).sum(axis=1)
+            features[f"{prefix}_{name}"] = (np.nansum(group, axis=1) / np.where(counts > 0, counts, np.nan)).astype(np.float32)
+
+        weights = np.clip(np.nan_to_num(bands), 0, None)
+        positions = np.linspace(0, 1, bands.shape[1], dtype=np.float32)
+        totals = weights.sum(axis=1)
+        centroid = (weights @ positions) / np.where(totals > 0, totals, np.nan)
+    features[f"{prefix}_centroid"] = centroid.astype(np.float32)
+    return pd.DataFrame(features)
@@ -0,0 +1,190 @@
+"""
+Quantile-binned uint8 feature matrices for histogram tree models.
+
+Tree models only use the order of feature values, so a feature matrix can
+be reduced to at most 255 quantile bins per column and stored as uint8
+(8x smaller than float64) without changing what a histogram-based learner
+can split on. The codes are built once per dataset version and cached on
+disk (raw codes plus a JSON header with the bin edges), then loaded as a
+read-only memory map by every experiment that trains on that data.
+
+Missing values get their own code, :data:`MISSING_CODE`; :meth:`model_input`
+turns it back into NaN when a column has missing values so that
+``HistGradientBoosting*`` and XGBoost can learn a missing-value direction.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+MAX_BINS = 255
+MISSING_CODE = 255
+CACHE_VERSION = 1
+
+
+def quantile_edges(values: np.ndarray, max_bins: int = MAX_BINS) -> np.ndarray:
+    """
+    Upper bin edges for one column (NaNs ignored).
+
+    Columns with at most ``max_bins`` distinct values get one bin per value
+    (edges at midpoints); others get quantile edges.
+    """
+    values = values[~np.isnan(values)]
+    distinct = np.unique(values)
+    if len(distinct) <= max_bins:
+        return (distinct[:-1] + distinct[1:]) / 2
+    quantiles = np.percentile(values, np.linspace(0, 100, max_bins + 1)[1:-1], method='midpoint')
+    return np.unique(quantiles)
+
+
+def encode_column(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Bin codes of ``values`` for ``edges``, with :data:`MISSING_CODE` for NaN."""
+    codes = np.searchsorted(edges, values, side='left').astype(np.uint8)
+    codes[np.isnan(values)] = MISSING_CODE
+    return codes
+
+
+class BinnedMatrix:
+    """
+    uint8 codes of a feature matrix plus the bin edges that produced them.
+
+    Build with :meth:`fit` (in memory) or :func:`build_binned_matrix`
+    (cached on disk); :meth:`transform` encodes new rows with the same edges.
+    """
+
+    def __init__(self, codes: np.ndarray, columns: Sequence[str], edges: List[np.ndarray],
+                 version: Optional[str] = None):
+        self.codes = codes
+        self.columns = list(columns)
+        self.edges = edges
+        self.version = version
+        self._position = {col: i for i, col in enumerate(self.columns)}
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, columns: Sequence[str], max_bins: int = MAX_BINS,
+            version: Optional[str] = None) -> "BinnedMatrix":
+        if not 2 <= max_bins <= MAX_BINS:
+            raise ValueError(f"max_bins must be between 2 and {MAX_BINS}")
+        columns = list(columns)
+        values = df[columns].to_numpy(dtype=np.float64)
+        edges = [quantile_edges(values[:, j], max_bins) for j in range(len(columns))]
+        codes = np.empty(values.shape, dtype=np.uint8, order='F')
+        for j, column_edges in enumerate(edges):
+            codes[:, j] = encode_column(values[:, j], column_edges)
+        return cls(codes, columns, edges, version)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Codes for the rows of ``df`` using the stored edges."""
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        codes = np.empty(values.shape, dtype=np.uint8, order='F')
+        for j, column_edges in enumerate(self.edges):
+            codes[:, j] = encode_column(values[:, j], column_edges)
+        return codes
+
+    def select(self, columns: Optional[Sequence[str]] = None, rows=None) -> np.ndarray:
+        """Codes for a subset of columns (and optionally rows)."""
+        codes = self.codes if rows is None else self.codes[rows]
+        if columns is None:
+            return codes
+        return codes[:, [self._position[col] for col in columns]]
+
+    def model_input(self, columns: Optional[Sequence[str]] = None, rows=None) -> np.ndarray:
+        """
+        Training input for a histogram tree model.
+
+        The uint8 codes themselves when the selection has no missing
+        values, otherwise float32 codes with NaN in place of
+        :data:`MISSING_CODE`.
+        """
+        codes = self.select(columns, rows)
+        missing = codes == MISSING_CODE
+        if not missing.any():
+            return codes
+        values = codes.astype(np.float32)
+        values[missing] = np.nan
+        return values
+
+    def save(self, store_dir) -> Path:
+        store_dir = Path(store_dir)
+        store_dir.mkdir(parents=True, exist_ok=True)
+        np.asfortranarray(self.codes).T.tofile(store_dir / 'codes.u8')
+        header = {
+            'cache_version': CACHE_VERSION,
+            'version': self.version,
+            'n_rows': int(self.codes.shape[0]),
+            'columns': self.columns,
+            'edges': [column_edges.tolist() for column_edges in self.edges],
+        }
+        with open(store_dir / 'header.json', 'w') as f:
+            json.dump(header, f)
+        return store_dir
+
+    @classmethod
+    def load(cls, store_dir) -> "BinnedMatrix":
+        """Load a saved matrix; codes are a read-only memory map (column-major)."""
+        store_dir = Path(store_dir)
+        with open(store_dir / 'header.json') as f:
+            header = json.load(f)
+        shape = (len(header['columns']), header['n_rows'])
+        codes = np.memmap(store_dir / 'codes.u8', dtype=np.uint8, mode='r', shape=shape).T
+        edges = [np.asarray(column_edges, dtype=np.float64) for column_edges in header['edges']]
+        return cls(codes, header['columns'], edges, header['version'])
+
+
+def dataset_version(df: pd.DataFrame, columns: Sequence[str], max_bins: int = MAX_BINS) -> str:
+    """Hash of the feature values, column names and bin count."""
+    columns = list(columns)
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(df[columns].to_numpy(dtype=np.float64)).tobytes())
+    digest.update(json.dumps({'columns': columns, 'max_bins': max_bins}).encode())
+    return digest.hexdigest()[:20]
+
+
+def build_binned_matrix(df: pd.DataFrame, columns: Sequence[str], cache_dir,
+                        max_bins: int = MAX_BINS, version: Optional[str] = None) -> BinnedMatrix:
+    """
+    Binned codes for ``df[columns]``, read from ``cache_dir/binned_<version>`` when present.
+
+    ``version`` names the dataset version (e.g. a processed-data release);
+    by default it is a hash of the values, so edited data gets new codes.
+    """
+    version = version or dataset_version(df, columns, max_bins)
+    store_dir = Path(cache_dir) / f"binned_{version}"
+    if (store_dir / 'header.json').exists():
+        with open(store_dir / 'header.json') as f:
+            header = json.load(f)
+        if header.get('cache_version') == CACHE_VERSION and header['columns'] == list(columns) \
+                and header['n_rows'] == len(df):
+            return BinnedMatrix.load(store_dir)
+    matrix = BinnedMatrix.fit(df, columns, max_bins, version)
+    matrix.save(store_dir)
+    return matrix
+
+
+def hist_tree_model(task: str = 'classifier', backend: str = 'sklearn', random_state: int = 42, **params):
+    """
+    Histogram gradient-boosting model for binned inputs.
+
+    ``backend='sklearn'`` gives ``HistGradientBoosting{Classifier,Regressor}``;
+    ``backend='xgboost'`` gives ``XGB{Classifier,Regressor}`` with
+    ``tree_method='hist'`` (requires the optional ``xgboost`` package).
+    """
+    if task not in ('classifier', 'regressor'):
+        raise ValueError("task must be 'classifier' or 'regressor'")
+    if backend == 'sklearn':
+        from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+        estimator = HistGradientBoostingClassifier if task == 'classifier' else HistGradientBoostingRegressor
+        return estimator(max_bins=MAX_BINS, random_state=random_state, **params)
+    if backend == 'xgboost':
+        try:
+            from xgboost import XGBClassifier, XGBRegressor
+        except ImportError as e:
+            raise ImportError("backend='xgboost' requires the xgboost package") from e
+        estimator = XGBClassifier if task == 'classifier' else XGBRegressor
+        return estimator(tree_method='hist', max_bin=MAX_BINS + 1, random_state=random_state, **params)
+    raise ValueError("backend must be 'sklearn' or 'xgboost'")
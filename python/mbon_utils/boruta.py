@@ -0,0 +1,165 @@
+"""
+Multi-target Boruta feature selection.
+
+A built-in replacement for ``BorutaPy`` that evaluates several targets
+from one shadow permutation per iteration. As in BorutaPy, each target's
+forest only sees the shadows of its own undecided and confirmed features,
+so every target competes against as many shadows as it has real
+features. Each iteration draws its shadow
+permutation from its own seeded RNG and each forest gets a seed derived from
+(iteration, target), so forests can be fitted in parallel while results stay
+identical from run to run. A target stops once all of its features are
+decided; the whole selector stops when every target has.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.ensemble import RandomForestClassifier
+from statsmodels.stats.multitest import fdrcorrection
+
+
+UNDECIDED, CONFIRMED, REJECTED = 0, 1, -1
+
+
+class MultiTargetBoruta:
+    """
+    Boruta all-relevant feature selection for one or more binary targets.
+
+    After :meth:`fit`, ``support_``, ``support_weak_`` and ``ranking_`` are
+    dicts keyed by target name holding the same arrays ``BorutaPy`` exposes.
+    Results do not depend on ``n_jobs``.
+    """
+
+    def __init__(self, n_estimators: Union[int, str] = 'auto', max_depth: Optional[int] = 8,
+                 max_iter: int = 100, alpha: float = 0.05, two_step: bool = True,
+                 random_state: int = 42, n_jobs: Optional[int] = None):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.max_iter = max_iter
+        self.alpha = alpha
+        self.two_step = two_step
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+
+    def _tree_count(self, n_features: int) -> int:
+        """Number of trees for ``n_features`` real + shadow columns (BorutaPy's 'auto' rule)."""
+        if self.n_estimators != 'auto':
+            return int(self.n_estimators)
+        depth = self.max_depth or 10
+        multi = (n_features * 2) / (np.sqrt(n_features * 2) * depth)
+        return int(multi * 100)
+
+    def _forest_seed(self, iteration: int, target_idx: int) -> int:
+        return int(np.random.SeedSequence([self.random_state, iteration, target_idx]).generate_state(1)[0])
+
+    def _fit_importances(self, X_real: np.ndarray, X_shadow: np.ndarray, y: np.ndarray,
+                         seed: int) -> np.ndarray:
+        X_combined = np.hstack([X_real, X_shadow])
+        forest = RandomForestClassifier(
+            n_estimators=self._tree_count(X_real.shape[1]),
+            max_depth=self.max_depth,
+            random_state=seed,
+            n_jobs=1
+        )
+        forest.fit(X_combined, y)
+        return forest.feature_importances_
+
+    def _do_tests(self, decisions: np.ndarray, hits: np.ndarray, iteration: int) -> np.ndarray:
+        """Binomial tests on hit counts, as in BorutaPy (FDR then Bonferroni when two-step)."""
+        undecided = np.flatnonzero(decisions == UNDECIDED)
+        if not len(undecided):
+            return decisions
+
+        accept_p = stats.binom.sf(hits[undecided] - 1, iteration, 0.5)
+        reject_p = stats.binom.cdf(hits[undecided], iteration, 0.5)
+
+        if self.two_step:
+            to_accept = fdrcorrection(accept_p, alpha=self.alpha)[0] & (accept_p <= self.alpha / iteration)
+            to_reject = fdrcorrection(reject_p, alpha=self.alpha)[0] & (reject_p <= self.alpha / iteration)
+        else:
+            to_accept = accept_p <= self.alpha / len(decisions)
+            to_reject = reject_p <= self.alpha / len(decisions)
+
+        decisions = decisions.copy()
+        decisions[undecided[to_accept]] = CONFIRMED
+        decisions[undecided[to_reject]] = REJECTED
+        return decisions
+
+    def fit(self, X, targets: Union[pd.DataFrame, Dict[str, np.ndarray]]) -> "MultiTargetBoruta":
+        """Run Boruta for every target column against the shared feature matrix ``X``."""
+        X = np.asarray(X, dtype=float)
+        if isinstance(targets, pd.DataFrame):
+            targets = {name: targets[name].to_numpy() for name in targets.columns}
+        target_names: List[str] = list(targets.keys())
+        Y = [np.asarray(targets[name]) for name in target_names]
+
+        n_features = X.shape[1]
+        decisions = np.zeros((len(target_names), n_features), dtype=int)
+        hits = np.zeros((len(target_names), n_features), dtype=int)
+        importance_history = [[] for _ in target_names]
+        shadow_max_history = [[] for _ in target_names]
+        iterations = np.zeros(len(target_names), dtype=int)
+
+        # Tree building releases the GIL, so threads parallelise the forests without copying X
+        max_workers = os.cpu_count() if self.n_jobs in (None, -1) else self.n_jobs
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for iteration in range(1, self.max_iter + 1):
+                active_targets = np.flatnonzero((decisions == UNDECIDED).any(axis=1))
+                if not len(active_targets):
+                    break
+
+                # One shadow permutation per iteration over every target's candidates; each
+                # target takes the shadow columns of its own non-rejected features
+                candidate = (decisions[active_targets] != REJECTED).any(axis=0)
+                rng = np.random.default_rng([self.random_state, iteration])
+                X_shadow = np.full_like(X, np.nan)
+                X_shadow[:, candidate] = rng.permuted(X[:, candidate], axis=0)
+
+                jobs = []
+                for t in active_targets:
+                    real_cols = np.flatnonzero(decisions[t] != REJECTED)
+                    jobs.append(executor.submit(
+                        self._fit_importances, X[:, real_cols], X_shadow[:, real_cols], Y[t],
+                        self._forest_seed(iteration, t)
+                    ))
+
+                for t, job in zip(active_targets, jobs):
+                    importances = job.result()
+                    real_cols = np.flatnonzero(decisions[t] != REJECTED)
+                    real_imp = np.full(n_features, np.nan)
+                    real_imp[real_cols] = importances[:len(real_cols)]
+                    shadow_max = importances[len(real_cols):].max()
+
+                    hits[t] += np.nan_to_num(real_imp, nan=-np.inf) > shadow_max
+                    importance_history[t].append(real_imp)
+                    shadow_max_history[t].append(shadow_max)
+                    iterations[t] = iteration
+                    decisions[t] = self._do_tests(decisions[t], hits[t], iteration)
+
+        self.target_names_ = target_names
+        self.n_iter_ = dict(zip(target_names, iterations.tolist()))
+        self.support_, self.support_weak_, self.ranking_ = {}, {}, {}
+        for t, name in enumerate(target_names):
+            history = np.vstack(importance_history[t])
+            median_importance = np.nanmedian(history, axis=0)
+
+            confirmed = decisions[t] == CONFIRMED
+            # Tentative features are kept as weak support if their median importance beats the shadows
+            tentative = (decisions[t] == UNDECIDED) & (median_importance > np.median(shadow_max_history[t]))
+
+            ranking = np.ones(n_features, dtype=int)
+            ranking[decisions[t] == UNDECIDED] = 2
+            rejected = np.flatnonzero(decisions[t] == REJECTED)
+            order = rejected[np.argsort(-median_importance[rejected], kind='stable')]
+            ranking[order] = np.arange(3, 3 + len(order))
+
+            self.support_[name] = confirmed
+            self.support_weak_[name] = tentative
+            self.ranking_[name] = ranking
+
+        return self
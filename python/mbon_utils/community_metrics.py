@@ -0,0 +1,346 @@
+"""
+Single-pass community metrics builder.
+
+Turns detection data into community-level targets (intensity sums, species
+richness, percentile activity flags and calendar features). Each chunk is
+reduced in one pass over a contiguous species matrix, and percentile
+thresholds come from streaming quantile sketches, so multi-year archives can
+be processed chunk by chunk and thresholds can be pooled, per station or per
+month.
+
+:func:`community_kernel` is the shared per-row reduction: total, number of
+active species, maximum and activity diversity of a species block, read one
+column at a time. :class:`CommunityDefinition` names a community's species
+and output columns (fish, marine or any custom grouping), and
+:func:`build_community_metrics` turns a frame into that community's metrics
+and binary screening targets.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mbon_utils.quantile_sketch import GroupedQuantileSketch
+
+
+# Index 0 unused so months (1-12) index directly
+SEASON_BY_MONTH = np.array([
+    None, 'Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer',
+    'Summer', 'Summer', 'Fall', 'Fall', 'Fall', 'Winter'
+], dtype=object)
+
+POOLED = 'all'
+
+# Per-row metrics of a species block, in the order community_kernel returns them
+KERNEL_METRICS = ('total', 'n_active', 'max', 'diversity')
+
+
+def community_kernel(block: np.ndarray, fill_value: Optional[float] = None,
+                     diversity_offset: float = 0.01) -> Dict[str, np.ndarray]:
+    """
+    Row-wise community metrics of a (rows, species) block in one pass over its columns.
+
+    Returns ``total`` (sum), ``n_active`` (species > 0), ``max`` and
+    ``diversity`` (sample standard deviation over mean + ``diversity_offset``,
+    a coefficient of variation). Missing values are skipped, as pandas'
+    ``sum/max/std/mean(axis=1)`` skip them, unless ``fill_value`` replaces
+    them; rows with no values get a zero total and a NaN maximum.
+    """
+    block = np.asfortranarray(block, dtype=np.float64)
+    n_rows = block.shape[0]
+    total = np.zeros(n_rows)
+    sum_sq = np.zeros(n_rows)
+    maximum = np.full(n_rows, -np.inf)
+    n_active = np.zeros(n_rows, dtype=np.int64)
+    n_valid = np.zeros(n_rows, dtype=np.int64)
+
+    # Column-major block: each species column is contiguous and read once
+    for j in range(block.shape[1]):
+        column = block[:, j]
+        missing = np.isnan(column)
+        if fill_value is not None:
+            column = np.where(missing, fill_value, column)
+            missing = np.zeros(n_rows, dtype=bool)
+        values = np.where(missing, 0.0, column)
+        total += values
+        sum_sq += values * values
+        n_active += values > 0
+        n_valid += ~missing
+        np.fmax(maximum, column, out=maximum)
+
+    has_values = n_valid > 0
+    maximum[~has_values] = np.nan
+    mean = np.divide(total, n_valid, out=np.full(n_rows, np.nan), where=has_values)
+    # Sample variance (ddof=1) from the running sums; undefined for fewer than two values
+    spread = np.maximum(sum_sq - total * np.nan_to_num(mean), 0.0)
+    variance = np.divide(spread, n_valid - 1, out=np.full(n_rows, np.nan), where=n_valid > 1)
+    diversity = np.sqrt(variance) / (mean + diversity_offset)
+
+    return {'total': total, 'n_active': n_active, 'max': maximum, 'diversity': diversity}
+
+
+def _percentile_key(q: float) -> str:
+    return f"high_{int(round(q * 100))}th"
+
+
+class CommunityDefinition:
+    """
+    Species block and output column names of one community.
+
+    ``columns`` maps kernel metrics (:data:`KERNEL_METRICS`) and targets to
+    output names, in output order; anything not named is not produced.
+    Targets are ``'any'`` (total > 0), ``'multi'`` (at least ``min_active``
+    species active) and one ``'high_75th'``-style flag per quantile (total
+    at or above that percentile). ``presence`` maps further target names to
+    species columns flagged when > 0.
+    """
+
+    def __init__(self, name: str, species: Sequence[str], columns: Dict[str, str],
+                 quantiles: Sequence[float] = (0.75, 0.90), min_active: int = 2,
+                 presence: Optional[Dict[str, str]] = None, fill_value: Optional[float] = None):
+        self.name = name
+        self.species = list(species)
+        self.columns = dict(columns)
+        self.quantiles = list(quantiles)
+        self.min_active = min_active
+        self.presence = dict(presence or {})
+        self.fill_value = fill_value
+
+        unknown = set(self.columns) - set(KERNEL_METRICS) - {'any', 'multi'} \
+            - {_percentile_key(q) for q in self.quantiles}
+        if unknown:
+            raise ValueError(f"Unknown community columns {sorted(unknown)}")
+        missing = [col for col in self.presence.values() if col not in self.species]
+        if missing:
+            raise ValueError(f"Presence columns {missing} are not species of '{name}'")
+
+    @property
+    def targets(self) -> List[str]:
+        """Names of the binary target columns."""
+        metrics = [self.columns[key] for key in KERNEL_METRICS if key in self.columns]
+        return [col for col in self.columns.values() if col not in metrics] + list(self.presence)
+
+
+def fish_community(species: Sequence[str]) -> CommunityDefinition:
+    """Fish-only community with the notebook 06 column names."""
+    return CommunityDefinition('fish', species, {
+        'total': 'total_fish_activity',
+        'n_active': 'num_active_species',
+        'max': 'max_species_activity',
+        'diversity': 'activity_diversity',
+        'high_75th': 'high_activity_75th',
+        'high_90th': 'high_activity_90th',
+        'any': 'any_activity',
+        'multi': 'multi_species_active',
+    })
+
+
+def marine_community(fish_species: Sequence[str], dolphin_column: str = 'dolphin_intensity') -> CommunityDefinition:
+    """Fish plus dolphin community with the notebook 06 column names; dolphins count as one species."""
+    return CommunityDefinition('marine', list(fish_species) + [dolphin_column], {
+        'total': 'total_marine_activity',
+        'n_active': 'num_active_marine_species',
+        'max': 'max_marine_activity',
+        'diversity': 'marine_activity_diversity',
+        'high_75th': 'high_marine_activity_75th',
+        'high_90th': 'high_marine_activity_90th',
+        'any': 'any_marine_activity',
+        'multi': 'multi_marine_species_active',
+    }, presence={'dolphin_present': dolphin_column})
+
+
+def build_community_metrics(df: pd.DataFrame, community: CommunityDefinition,
+                            thresholds: Optional[Dict[str, float]] = None,
+                            observed_only: bool = False) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """
+    Metrics and binary targets of ``community`` for every row of ``df``.
+
+    Species missing from ``df`` count as missing values. Percentile
+    thresholds are pooled over ``df`` unless given (keyed ``'high_75th'``
+    etc.); with ``observed_only`` rows without any species value (e.g. no
+    detections after a left merge, which still get a zero total) are left
+    out of them. Returns the metrics (indexed like ``df``, columns named by
+    the definition) and the thresholds used.
+    """
+    block = df.reindex(columns=community.species).to_numpy(dtype=np.float64)
+    kernel = community_kernel(block, community.fill_value)
+    total = kernel['total']
+
+    if thresholds is None:
+        # Without a fill value, rows with no species values are the ones with no maximum
+        pooled = total[~np.isnan(kernel['max'])] if observed_only else total
+        thresholds = {_percentile_key(q): float(np.quantile(pooled, q)) if len(pooled) else np.nan
+                      for q in community.quantiles}
+
+    values = dict(kernel)
+    values['any'] = (total > 0).astype(int)
+    values['multi'] = (kernel['n_active'] >= community.min_active).astype(int)
+    for q in community.quantiles:
+        key = _percentile_key(q)
+        values[key] = (total >= thresholds[key]).astype(int)
+
+    metrics = pd.DataFrame({name: values[key] for key, name in community.columns.items()}, index=df.index)
+    for name, species in community.presence.items():
+        metrics[name] = (np.nan_to_num(block[:, community.species.index(species)]) > 0).astype(int)
+    return metrics, thresholds
+
+
+class CommunityMetricsBuilder:
+    """
+    Accumulate community metrics over chunks of an aligned detection dataset.
+
+    ``threshold_by`` selects the grouping for the percentile thresholds:
+    ``None`` pools all rows (the original behaviour), ``['station']`` or
+    ``['station', 'month']`` give local thresholds.
+
+    Thresholds are only known once every chunk has been seen, so each
+    chunk's per-row metrics are kept until the end. By default they stay in
+    memory and :meth:`finalize` returns one frame. With ``spill_dir`` set,
+    every chunk is written there as a Parquet part instead, and
+    :meth:`write_parquet` flags and writes one part at a time, so memory
+    stays bounded by the chunk size.
+    """
+
+    def __init__(self, fish_species: List[str], dolphin_species: List[str], unknown_bio: List[str],
+                 threshold_by: Optional[Sequence[str]] = None,
+                 quantiles: Sequence[float] = (0.75, 0.90), max_centroids: int = 1000,
+                 spill_dir=None):
+        self.fish_species = list(fish_species)
+        self.dolphin_species = list(dolphin_species)
+        self.unknown_bio = list(unknown_bio)
+        self.threshold_by = list(threshold_by) if threshold_by else None
+        self.quantiles = list(quantiles)
+
+        # Contiguous column layout: fish | dolphin | unknown biological
+        self.species_columns = self.fish_species + self.dolphin_species + self.unknown_bio
+        n_fish, n_dolphin = len(self.fish_species), len(self.dolphin_species)
+        self._blocks = (slice(0, n_fish), slice(n_fish, n_fish + n_dolphin), slice(n_fish + n_dolphin, None))
+
+        self._sketch = GroupedQuantileSketch(max_centroids)
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        # In-memory metric frames, or Parquet part paths when spilling
+        self._chunks: List = []
+
+    def update(self, chunk: pd.DataFrame) -> "CommunityMetricsBuilder":
+        """Reduce one chunk of detections to per-row metrics."""
+        matrix = np.asfortranarray(
+            chunk.reindex(columns=self.species_columns).to_numpy(dtype=float)
+        )
+
+        # Fish, dolphin and unknown biological columns are adjacent blocks of one matrix
+        fish, dolphin, unknown = (community_kernel(matrix[:, block], fill_value=0.0) for block in self._blocks)
+
+        timestamps = pd.DatetimeIndex(chunk['datetime'])
+        month = timestamps.month.to_numpy()
+
+        metrics = pd.DataFrame({
+            'datetime': timestamps,
+            'station': chunk['station'].to_numpy(),
+            'total_fish_intensity': fish['total'],
+            'fish_species_richness': fish['n_active'],
+            'total_dolphin_activity': dolphin['total'],
+            'total_biological_activity': fish['total'] + dolphin['total'] + unknown['total'],
+            'hour_of_day': timestamps.hour.to_numpy(),
+            'day_of_year': timestamps.dayofyear.to_numpy(),
+            'month': month,
+            'season': SEASON_BY_MONTH[month],
+        })
+
+        self._sketch.update(self._group_keys(metrics), metrics['total_fish_intensity'].to_numpy())
+        if self.spill_dir is None:
+            self._chunks.append(metrics)
+        else:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            part = self.spill_dir / f"metrics_{len(self._chunks):05d}.parquet"
+            metrics.to_parquet(part, index=False)
+            self._chunks.append(part)
+        return self
+
+    def _iter_chunks(self) -> Iterator[pd.DataFrame]:
+        for chunk in self._chunks:
+            yield pd.read_parquet(chunk) if isinstance(chunk, Path) else chunk
+
+    def _group_keys(self, metrics: pd.DataFrame) -> pd.Index:
+        if self.threshold_by is None:
+            return pd.Index(np.full(len(metrics), POOLED, dtype=object))
+        if len(self.threshold_by) == 1:
+            return pd.Index(metrics[self.threshold_by[0]])
+        return pd.MultiIndex.from_frame(metrics[self.threshold_by])
+
+    @property
+    def thresholds(self) -> Dict:
+        """Percentile thresholds per group, keyed by group then ``'75th'``-style labels."""
+        labels = [f"{int(round(q * 100))}th" for q in self.quantiles]
+        return {
+            key: dict(zip(labels, (float(v) for v in values)))
+            for key, values in self._sketch.quantiles(self.quantiles).items()
+        }
+
+    def _apply_thresholds(self, df_metrics: pd.DataFrame, group_thresholds: Dict) -> pd.DataFrame:
+        fish_intensity = df_metrics['total_fish_intensity'].to_numpy()
+
+        # Look up each row's group thresholds in one indexer pass
+        group_index = pd.Index(list(group_thresholds.keys()), tupleize_cols=True)
+        threshold_matrix = np.vstack(list(group_thresholds.values()) + [np.full(len(self.quantiles), np.nan)])
+        # Rows without a group (indexer -1) pick up the trailing NaN row and are never flagged
+        row_thresholds = threshold_matrix[group_index.get_indexer(self._group_keys(df_metrics))]
+
+        has_fish = len(self.fish_species) > 0
+        flags = {'any_fish_activity': (fish_intensity > 0) & has_fish}
+        for i, q in enumerate(self.quantiles):
+            flags[f"fish_activity_{int(round(q * 100))}th"] = (fish_intensity >= row_thresholds[:, i]) & has_fish
+
+        position = df_metrics.columns.get_loc('total_biological_activity') + 1
+        for offset, (name, values) in enumerate(flags.items()):
+            df_metrics.insert(position + offset, name, values.astype(int))
+
+        return df_metrics
+
+    def finalize(self) -> pd.DataFrame:
+        """Concatenate the chunks in memory and apply the activity thresholds."""
+        if not self._chunks:
+            raise ValueError("No chunks have been added")
+
+        df_metrics = pd.concat(list(self._iter_chunks()), ignore_index=True)
+        return self._apply_thresholds(df_metrics, self._sketch.quantiles(self.quantiles))
+
+    def write_parquet(self, path) -> int:
+        """
+        Apply the activity thresholds chunk by chunk and write the metrics to
+        one Parquet file, without holding more than one chunk in memory.
+
+        Returns the number of rows written.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._chunks:
+            raise ValueError("No chunks have been added")
+
+        group_thresholds = self._sketch.quantiles(self.quantiles)
+        n_rows = 0
+        writer = None
+        try:
+            for chunk in self._iter_chunks():
+                table = pa.Table.from_pandas(self._apply_thresholds(chunk.copy(), group_thresholds),
+                                             preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                n_rows += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return n_rows
+
+
+def iter_parquet_chunks(path, columns: Optional[List[str]] = None,
+                        batch_size: int = 100_000) -> Iterator[pd.DataFrame]:
+    """Yield a Parquet file as DataFrames of at most ``batch_size`` rows."""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
@@ -0,0 +1,216 @@
+"""
+Run-length index of data availability per station and data stream.
+
+Each (station, stream) timeline is compressed into sorted half-open
+intervals ``[start, end)``: consecutive timestamps closer than
+``tolerance`` sampling steps belong to the same run, and each sample is
+taken to cover one sampling step. A year of 20-minute temperature readings
+becomes a handful of intervals, from which coverage summaries, gaps and
+multi-stream overlap windows are computed directly.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+INTERVAL_COLUMNS = ['station', 'stream', 'start', 'end', 'n_points', 'step']
+
+
+def _merge_stream_intervals(intervals: pd.DataFrame) -> pd.DataFrame:
+    """Union of each (station, stream)'s intervals; expects them sorted by station, stream and start."""
+    if intervals.empty:
+        return intervals
+    keys = [intervals['station'], intervals['stream']]
+    # Furthest end reached by earlier intervals of the same stream
+    reached = intervals['end'].groupby(keys).cummax().groupby(keys).shift()
+    new_run = reached.isna() | (intervals['start'] > reached)
+    return intervals.groupby(new_run.cumsum().to_numpy()).agg(
+        station=('station', 'first'), stream=('stream', 'first'), start=('start', 'min'), end=('end', 'max')
+    ).reset_index(drop=True)
+
+
+class CoverageIndex:
+    """Sorted availability intervals for every (station, stream) pair."""
+
+    def __init__(self, tolerance: float = 1.5):
+        self.tolerance = tolerance
+        self._parts: List[pd.DataFrame] = []
+        self._intervals: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_intervals(cls, intervals: pd.DataFrame, tolerance: float = 1.5) -> "CoverageIndex":
+        """Rebuild an index from a saved :attr:`intervals` frame."""
+        index = cls(tolerance)
+        index._parts.append(intervals[INTERVAL_COLUMNS].copy())
+        return index
+
+    def add(self, station: str, stream: str, timestamps: Iterable, step=None) -> "CoverageIndex":
+        """
+        Add one stream's timestamps (unparseable values and NaT are ignored).
+
+        ``step`` is the nominal sampling interval (e.g. ``'2h'``); by default
+        the median spacing of the timestamps is used.
+        """
+        times = pd.DatetimeIndex(pd.to_datetime(pd.Series(timestamps), errors='coerce').dropna())
+        values = np.unique(times.as_unit('ns').asi8)
+        if not len(values):
+            return self
+
+        diffs = np.diff(values)
+        if step is not None:
+            step_ns = pd.Timedelta(step).value
+        else:
+            step_ns = int(np.median(diffs)) if len(diffs) else 0
+
+        # A new run starts wherever the spacing exceeds the tolerated step
+        breaks = np.flatnonzero(diffs > step_ns * self.tolerance)
+        first = np.concatenate([[0], breaks + 1])
+        last = np.concatenate([breaks, [len(values) - 1]])
+
+        self._parts.append(pd.DataFrame({
+            'station': station,
+            'stream': stream,
+            'start': pd.to_datetime(values[first]),
+            'end': pd.to_datetime(values[last] + step_ns),
+            'n_points': last - first + 1,
+            'step': pd.Timedelta(step_ns),
+        }))
+        self._intervals = None
+        return self
+
+    @property
+    def intervals(self) -> pd.DataFrame:
+        """All intervals, sorted by station, stream and start."""
+        if self._intervals is None:
+            if self._parts:
+                intervals = pd.concat(self._parts, ignore_index=True)
+            else:
+                intervals = pd.DataFrame(columns=INTERVAL_COLUMNS)
+            self._intervals = intervals.sort_values(['station', 'stream', 'start'], ignore_index=True)
+        return self._intervals
+
+    @property
+    def stations(self) -> List[str]:
+        return list(pd.unique(self.intervals['station']))
+
+    def streams(self, station: Optional[str] = None) -> List[str]:
+        """Streams in the order they were added (optionally for one station)."""
+        intervals = pd.concat(self._parts, ignore_index=True) if self._parts else self.intervals
+        if station is not None:
+            intervals = intervals[intervals['station'] == station]
+        return list(pd.unique(intervals['stream']))
+
+    def gaps(self, min_hours: float = 0) -> pd.DataFrame:
+        """Gaps between consecutive runs of each stream that last longer than ``min_hours``."""
+        intervals = self.intervals
+        same_stream = (
+            (intervals['station'] == intervals['station'].shift())
+            & (intervals['stream'] == intervals['stream'].shift())
+        )
+        gaps = pd.DataFrame({
+            'station': intervals['station'],
+            'stream': intervals['stream'],
+            'gap_start': intervals['end'].shift(),
+            'gap_end': intervals['start'],
+        })[same_stream]
+        gaps['hours'] = (gaps['gap_end'] - gaps['gap_start']) / pd.Timedelta(hours=1)
+        return gaps[gaps['hours'] > min_hours].reset_index(drop=True)
+
+    def overlap(self, streams: Optional[List[str]] = None, station: Optional[str] = None,
+                start=None, end=None) -> pd.DataFrame:
+        """
+        Windows where all ``streams`` (default: every stream) have data at the same time.
+
+        Computed per station with a sweep over interval boundaries, then
+        clipped to ``[start, end)`` when given. Overlapping intervals of one
+        stream (e.g. the same stream added twice) are merged first, so each
+        stream counts at most once at any instant.
+        """
+        intervals = self.intervals
+        streams = streams if streams is not None else self.streams()
+        intervals = intervals[intervals['stream'].isin(streams)]
+        if station is not None:
+            intervals = intervals[intervals['station'] == station]
+        intervals = _merge_stream_intervals(intervals)
+
+        # +1 at each start, -1 at each end; ends sort first so touching intervals don't overlap
+        events = pd.concat([
+            pd.DataFrame({'station': intervals['station'], 'time': intervals['start'], 'delta': 1}),
+            pd.DataFrame({'station': intervals['station'], 'time': intervals['end'], 'delta': -1}),
+        ]).sort_values(['station', 'time', 'delta'], ignore_index=True)
+        events['active'] = events.groupby('station')['delta'].cumsum()
+        events['next_time'] = events.groupby('station')['time'].shift(-1)
+
+        windows = events[(events['active'] == len(set(streams))) & events['next_time'].notna()]
+        windows = pd.DataFrame({
+            'station': windows['station'],
+            'start': windows['time'],
+            'end': windows['next_time'],
+        })
+        if start is not None:
+            windows['start'] = windows['start'].clip(lower=pd.Timestamp(start))
+        if end is not None:
+            windows['end'] = windows['end'].clip(upper=pd.Timestamp(end))
+        windows = windows[windows['end'] > windows['start']]
+
+        # Merge windows that touch (a stream ending and another starting at the same instant)
+        new_window = (windows['station'] != windows['station'].shift()) | (windows['start'] != windows['end'].shift())
+        windows = windows.groupby(new_window.cumsum().to_numpy()).agg(
+            station=('station', 'first'), start=('start', 'min'), end=('end', 'max')
+        ).reset_index(drop=True)
+        windows['hours'] = (windows['end'] - windows['start']) / pd.Timedelta(hours=1)
+        return windows
+
+    def summary(self) -> pd.DataFrame:
+        """Per (station, stream): points, runs, time span, covered hours and longest gap."""
+        intervals = self.intervals.assign(
+            covered_hours=lambda df: (df['end'] - df['start']) / pd.Timedelta(hours=1)
+        )
+        summary = intervals.groupby(['station', 'stream'], sort=False).agg(
+            n_points=('n_points', 'sum'),
+            n_runs=('start', 'size'),
+            first=('start', 'min'),
+            last=('end', 'max'),
+            covered_hours=('covered_hours', 'sum'),
+        )
+        summary['span_hours'] = (summary['last'] - summary['first']) / pd.Timedelta(hours=1)
+        summary['coverage_fraction'] = summary['covered_hours'] / summary['span_hours']
+        gaps = self.gaps()
+        summary['longest_gap_hours'] = gaps.groupby(['station', 'stream'])['hours'].max().reindex(summary.index).fillna(0)
+        return summary.reset_index()
+
+    def to_records(self, min_gap_hours: float = 0) -> Dict[str, list]:
+        """JSON-ready intervals, gaps, all-stream overlap windows and summary (timestamps as ISO strings)."""
+        def records(df: pd.DataFrame) -> list:
+            df = df.copy()
+            for col in df.columns:
+                if pd.api.types.is_datetime64_any_dtype(df[col]):
+                    df[col] = df[col].dt.strftime('%Y-%m-%dT%H:%M:%S')
+                elif pd.api.types.is_timedelta64_dtype(df[col]):
+                    df[col] = df[col] / pd.Timedelta(hours=1)
+            return df.to_dict(orient='records')
+
+        return {
+            'intervals': records(self.intervals.rename(columns={'step': 'step_hours'})),
+            'gaps': records(self.gaps(min_gap_hours)),
+            'overlap': records(self.overlap()),
+            'summary': records(self.summary()),
+        }
+
+    def plot(self, ax, station: str):
+        """Draw one bar per stream for a station, one segment per interval."""
+        import matplotlib.dates as mdates
+
+        station_intervals = self.intervals[self.intervals['station'] == station]
+        streams = self.streams(station)
+        for j, stream in enumerate(streams):
+            stream_intervals = station_intervals[station_intervals['stream'] == stream]
+            starts = mdates.date2num(stream_intervals['start'])
+            widths = mdates.date2num(stream_intervals['end']) - starts
+            ax.broken_barh(list(zip(starts, widths)), (j - 0.4, 0.8), alpha=0.7)
+        ax.set_yticks(range(len(streams)))
+        ax.set_yticklabels(streams)
+        ax.xaxis_date()
+        return ax
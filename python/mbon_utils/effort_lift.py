@@ -0,0 +1,177 @@
+"""
+Effort-lift utilities shared by the community analysis scripts.
+
+Fits one model per (target, feature group) on a process pool, caches the
+out-of-fold predictions on disk, and derives capture-rate curves for any
+number of effort levels from a single sort of the predictions. With
+``config['model'] = 'hist'`` every task trains a histogram gradient-boosting
+model on slices of one cached uint8 binned matrix instead of a random
+forest on float64 copies.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold
+
+from mbon_utils.binned_matrix import BinnedMatrix, build_binned_matrix, hist_tree_model
+from mbon_utils.threshold_curves import metrics_at_effort
+
+
+DEFAULT_EFFORT_LEVELS = [0.1, 0.2, 0.3, 0.4, 0.5]
+
+DEFAULT_MODEL_CONFIG = {
+    'n_estimators': 50,
+    'random_state': 42,
+    'n_splits': 5,
+}
+
+# Model families for config['model']; 'random_forest' is the default
+MODELS = ('random_forest', 'hist')
+
+
+def capture_rate_curve(scores: np.ndarray, y: np.ndarray,
+                       effort_levels: Sequence[float] = DEFAULT_EFFORT_LEVELS) -> List[Dict]:
+    """
+    Capture rate and lift at every effort level from one sort.
+
+    Samples are reviewed in order of decreasing score; the capture rate at an
+    effort level is the share of total activity found in the top
+    ``int(n * effort)`` samples.
+    """
+    y = np.asarray(y, dtype=float)
+    curve = metrics_at_effort(scores, y > 0, effort_levels, activity=y)
+
+    return [
+        {'effort_level': float(effort), 'capture_rate': float(rate), 'lift': float(lift)}
+        for effort, rate, lift in zip(curve['effort_level'], curve['capture_rate'], curve['lift'])
+    ]
+
+
+def out_of_fold_predictions(X: np.ndarray, y: np.ndarray, config: Dict) -> np.ndarray:
+    """
+    Out-of-fold predictions for one (target, group) task.
+
+    Folds are contiguous blocks (no shuffling) so that rows ordered in time are
+    never predicted by a model that saw their immediate neighbours.
+    """
+    predictions = np.empty(len(y), dtype=float)
+    kfold = KFold(n_splits=config['n_splits'])
+
+    for train_idx, test_idx in kfold.split(X):
+        if config.get('model', 'random_forest') == 'hist':
+            model = hist_tree_model('regressor', random_state=config['random_state'])
+        else:
+            # n_jobs=1: parallelism comes from the process pool, one task per worker
+            model = RandomForestRegressor(
+                n_estimators=config['n_estimators'],
+                random_state=config['random_state'],
+                n_jobs=1
+            )
+        model.fit(X[train_idx], y[train_idx])
+        predictions[test_idx] = model.predict(X[test_idx])
+
+    return predictions
+
+
+def _cache_key(X: np.ndarray, y: np.ndarray, features: List[str], config: Dict) -> str:
+    """Hash of the data and model configuration for one task."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=float).tobytes())
+    digest.update(json.dumps({'features': features, **config}, sort_keys=True).encode())
+    return digest.hexdigest()[:32]
+
+
+def _run_task(task: Dict) -> np.ndarray:
+    """Process-pool entry point: load cached predictions or fit and cache them."""
+    cache_file = task['cache_file']
+    if cache_file is not None and cache_file.exists():
+        return np.load(cache_file)
+
+    predictions = out_of_fold_predictions(task['X'], task['y'], task['config'])
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        np.save(cache_file, predictions)
+    return predictions
+
+
+def compute_effort_lift(df: pd.DataFrame, targets: List[str], feature_groups: Dict[str, List[str]],
+                        effort_levels: Sequence[float] = DEFAULT_EFFORT_LEVELS,
+                        config: Optional[Dict] = None, cache_dir: Optional[Path] = None,
+                        max_workers: Optional[int] = None, min_samples: int = 200) -> Dict:
+    """
+    Effort-lift curves for every target and feature group.
+
+    Returns ``{target: {group: [{'effort_level', 'capture_rate', 'lift'}, ...]}}``,
+    the same structure the effort-lift JSON and plots already use.
+    """
+    config = {**DEFAULT_MODEL_CONFIG, **(config or {})}
+    if config.get('model', 'random_forest') not in MODELS:
+        raise ValueError(f"Unknown model '{config['model']}'; expected one of {MODELS}")
+    if config.get('model') == 'random_forest':
+        # Default model stays out of the config so existing cache keys remain valid
+        del config['model']
+    cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+    all_features = sorted({f for features in feature_groups.values() for f in features if f in df.columns})
+
+    # One binned matrix over every feature, sliced per task
+    binned = None
+    if config.get('model') == 'hist':
+        if cache_dir is not None:
+            binned = build_binned_matrix(df, all_features, cache_dir / "binned")
+        else:
+            binned = BinnedMatrix.fit(df, all_features)
+
+    tasks = []
+    labels = {}
+    for target in targets:
+        if target not in df.columns:
+            continue
+
+        valid_mask = df[[target] + [f for f in all_features if f != target]].notna().all(axis=1).to_numpy()
+        valid_data = df[valid_mask]
+        if len(valid_data) < min_samples:
+            print(f"  ⚠️ {target}: insufficient data ({len(valid_data)} samples)")
+            continue
+
+        y = valid_data[target].to_numpy(dtype=float)
+        labels[target] = y
+
+        for group_name, features in feature_groups.items():
+            available_features = [f for f in features if f in valid_data.columns and f != target]
+            if not available_features:
+                continue
+
+            if binned is not None:
+                X = binned.select(available_features, valid_mask)
+            else:
+                X = valid_data[available_features].to_numpy(dtype=float)
+            key = _cache_key(X, y, available_features, config)
+            tasks.append({
+                'target': target,
+                'group': group_name,
+                'X': X,
+                'y': y,
+                'config': config,
+                'cache_file': cache_dir / f"{key}.npy" if cache_dir is not None else None,
+            })
+
+    print(f"  Fitting {len(tasks)} (target, group) models on a process pool")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        all_predictions = list(executor.map(_run_task, tasks))
+
+    effort_results = {}
+    for task, predictions in zip(tasks, all_predictions):
+        curve = capture_rate_curve(predictions, labels[task['target']], effort_levels)
+        effort_results.setdefault(task['target'], {})[task['group']] = curve
+
+    return effort_results
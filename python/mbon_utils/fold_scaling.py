@@ -0,0 +1,94 @@
+"""
+Fold-local standardization shared across feature-set comparisons.
+
+Comparing models on several feature sets used to mean scaling the full X
+once per set (so test folds leaked into the scaling statistics) and then
+cross-validating the scaled copy. :class:`FoldScaledMatrix` standardizes
+the superset of columns once per fold, with statistics from that fold's
+training rows only, and serves any feature subset from those per-fold
+matrices. Subsets that are a contiguous run of superset columns (e.g.
+acoustic, environmental, or acoustic + environmental when the superset is
+ordered that way) are returned as views; other subsets are gathered.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+
+
+def _standardize(values: np.ndarray, fit_rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean and scale of ``values[fit_rows]`` as ``StandardScaler`` computes them (zero variance -> 1)."""
+    fit = values[fit_rows]
+    mean = fit.mean(axis=0)
+    scale = fit.std(axis=0)
+    scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+    return mean, scale
+
+
+class FoldScaledMatrix:
+    """
+    One feature matrix, its CV folds and per-fold standardized train/test blocks.
+
+    ``X`` holds the union of all feature sets to compare; ``cv`` is any
+    scikit-learn splitter (or a list of ``(train, test)`` index pairs).
+    Blocks for a fold are computed on first use and kept.
+    """
+
+    def __init__(self, X: pd.DataFrame, y, cv, groups=None):
+        self.columns = list(X.columns)
+        self._position = {col: i for i, col in enumerate(self.columns)}
+        self.values = np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+        self.y = np.asarray(y)
+        if hasattr(cv, 'split'):
+            self.folds = [(np.asarray(train), np.asarray(test)) for train, test in cv.split(self.values, self.y, groups)]
+        else:
+            self.folds = [(np.asarray(train), np.asarray(test)) for train, test in cv]
+        self._blocks: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._full: Optional[np.ndarray] = None
+
+    @property
+    def n_folds(self) -> int:
+        return len(self.folds)
+
+    def _columns(self, columns: Optional[Sequence[str]]) -> Union[slice, np.ndarray]:
+        """Column selector for ``columns``: a slice when they are a contiguous run of the superset."""
+        if columns is None:
+            return slice(None)
+        positions = np.array([self._position[col] for col in columns], dtype=int)
+        if len(positions) and np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions))):
+            return slice(positions[0], positions[0] + len(positions))
+        return positions
+
+    def _fold_blocks(self, fold: int) -> Tuple[np.ndarray, np.ndarray]:
+        if fold not in self._blocks:
+            train, test = self.folds[fold]
+            mean, scale = _standardize(self.values, train)
+            self._blocks[fold] = ((self.values[train] - mean) / scale, (self.values[test] - mean) / scale)
+        return self._blocks[fold]
+
+    def fold_data(self, fold: int, columns: Optional[Sequence[str]] = None):
+        """``X_train, X_test, y_train, y_test`` for one fold, scaled with that fold's training statistics."""
+        train, test = self.folds[fold]
+        X_train, X_test = self._fold_blocks(fold)
+        selector = self._columns(columns)
+        return X_train[:, selector], X_test[:, selector], self.y[train], self.y[test]
+
+    def scaled(self, columns: Optional[Sequence[str]] = None) -> np.ndarray:
+        """All rows scaled with statistics from all rows, for a final fit after cross-validation."""
+        if self._full is None:
+            mean, scale = _standardize(self.values, np.arange(len(self.values)))
+            self._full = (self.values - mean) / scale
+        return self._full[:, self._columns(columns)]
+
+    def cross_val_score(self, model, columns: Optional[Sequence[str]] = None, scoring: str = 'f1') -> np.ndarray:
+        """Per-fold scores of a fresh clone of ``model`` on ``columns``, like ``cross_val_score`` with fold-local scaling."""
+        scorer = get_scorer(scoring)
+        scores: List[float] = []
+        for fold in range(self.n_folds):
+            X_train, X_test, y_train, y_test = self.fold_data(fold, columns)
+            fitted = clone(model).fit(X_train, y_train)
+            scores.append(scorer(fitted, X_test, y_test))
+        return np.array(scores)
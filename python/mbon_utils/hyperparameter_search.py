@@ -0,0 +1,245 @@
+"""
+Successive-halving hyperparameter search for the community screening models.
+
+A full grid over every (community, target, model) is too slow to run inside
+a notebook, so the screening models used fixed settings. This module runs
+``HalvingRandomSearchCV`` instead: many sampled configurations are scored on
+a small budget (a subsample of rows, or few trees for forests) and only the
+best third advance to the next, larger budget. Folds are time-blocked
+(``TimeSeriesSplit`` on rows in time order), so a configuration is always
+scored on data later than it was trained on.
+
+Every (target, model) search is one task on a process pool, so all targets
+of a community are tuned concurrently. The best configurations are merged
+into a versioned JSON file that the notebooks read through
+:func:`load_tuned_configs`, falling back to their fixed settings for
+anything that has not been tuned or was tuned on other feature columns.
+Each search is stored with its feature names, so a notebook whose matrix
+has different columns (e.g. lag features) saves its own search under its
+own key rather than reusing another notebook's.
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import HalvingRandomSearchCV, TimeSeriesSplit
+from sklearn.tree import DecisionTreeClassifier
+
+
+SCHEMA_VERSION = 2
+
+# Base estimators; n_jobs=1 because parallelism comes from the process pool
+ESTIMATORS = {
+    'logistic_regression': LogisticRegression(max_iter=1000),
+    'decision_tree': DecisionTreeClassifier(),
+    'random_forest': RandomForestClassifier(n_jobs=1),
+}
+
+SEARCH_SPACES = {
+    'logistic_regression': {
+        'C': [0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0],
+        'class_weight': [None, 'balanced'],
+    },
+    'decision_tree': {
+        'max_depth': [3, 4, 5, 6, 8, 10, 12, None],
+        'min_samples_leaf': [1, 2, 5, 10, 20, 50],
+        'class_weight': [None, 'balanced'],
+    },
+    'random_forest': {
+        'max_depth': [4, 5, 6, 8, 10, 12, None],
+        'min_samples_leaf': [1, 2, 5, 10, 20],
+        'max_features': ['sqrt', 'log2', 0.5],
+        'class_weight': [None, 'balanced', 'balanced_subsample'],
+    },
+}
+
+# Budget each halving iteration grows: (resource, min_resources, max_resources).
+# Forests grow their tree count (25 -> 75 -> 225 with factor 3); other models their rows.
+RESOURCES = {
+    'random_forest': ('n_estimators', 25, 225),
+}
+
+
+def model_key(name: str) -> str:
+    """Search-space key for a display name, so ``'Random Forest'`` maps to ``'random_forest'``."""
+    return name.strip().lower().replace(' ', '_')
+
+
+def _json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _search_task(task: Dict) -> Dict:
+    """Process-pool entry point: successive-halving search for one (target, model)."""
+    model = task['model']
+    resource, min_resources, max_resources = RESOURCES.get(model, ('n_samples', 'exhaust', 'auto'))
+    search = HalvingRandomSearchCV(
+        clone(ESTIMATORS[model]).set_params(random_state=task['random_state']),
+        SEARCH_SPACES[model],
+        n_candidates=task['n_candidates'],
+        factor=task['factor'],
+        resource=resource,
+        min_resources=min_resources,
+        max_resources=max_resources,
+        cv=TimeSeriesSplit(n_splits=task['n_splits']),
+        scoring=task['scoring'],
+        random_state=task['random_state'],
+        n_jobs=1,
+    )
+    search.fit(task['X'], task['y'])
+
+    params = {key: _json_value(value) for key, value in search.best_params_.items()}
+    return {
+        'params': params,
+        'score': float(search.best_score_),
+        'n_candidates': int(search.n_candidates_[0]),
+        'n_iterations': int(search.n_iterations_),
+    }
+
+
+def tune_targets(X, Y: pd.DataFrame, models: Optional[Sequence[str]] = None, times=None,
+                 scoring: str = 'f1', n_splits: int = 5, n_candidates: int = 27, factor: int = 3,
+                 random_state: int = 42, max_workers: Optional[int] = None) -> Dict[str, Dict[str, Dict]]:
+    """
+    Best configuration of every model for every binary target column of ``Y``.
+
+    ``models`` are keys of :data:`SEARCH_SPACES` (all by default). ``times``
+    gives each row's timestamp; rows are put in time order before the
+    time-blocked folds are cut (pass ``None`` if ``X`` is already ordered).
+    Returns ``{target: {model: {'params', 'score', 'n_candidates',
+    'n_iterations'}}}``; targets without both classes are skipped.
+    """
+    models = list(models) if models is not None else list(SEARCH_SPACES)
+    unknown = [model for model in models if model not in SEARCH_SPACES]
+    if unknown:
+        raise ValueError(f"No search space for {unknown}; expected some of {list(SEARCH_SPACES)}")
+
+    X = np.asarray(X, dtype=np.float64)
+    order = np.argsort(np.asarray(times), kind='stable') if times is not None else np.arange(len(X))
+    X = X[order]
+
+    tasks = []
+    for target in Y.columns:
+        y = Y[target].to_numpy()[order]
+        if len(np.unique(y)) < 2:
+            continue
+        for model in models:
+            tasks.append({
+                'target': target, 'model': model, 'X': X, 'y': y, 'scoring': scoring,
+                'n_splits': n_splits, 'n_candidates': n_candidates, 'factor': factor,
+                'random_state': random_state,
+            })
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        found = list(executor.map(_search_task, tasks))
+
+    results: Dict[str, Dict[str, Dict]] = {}
+    for task, best in zip(tasks, found):
+        results.setdefault(task['target'], {})[task['model']] = best
+    return results
+
+
+def save_tuned_configs(path, community: str, results: Dict[str, Dict[str, Dict]],
+                       features: Sequence[str], search: Optional[Dict] = None) -> int:
+    """
+    Merge one community's search results into the JSON file at ``path``.
+
+    ``community`` is the key the results are stored under; other keys
+    already in the file are kept. ``features`` names the columns of the
+    searched matrix and ``search`` records the search settings. Every save
+    increments the file's ``version``, which is returned.
+    """
+    path = Path(path)
+    configs = {'schema_version': SCHEMA_VERSION, 'version': 0, 'communities': {}}
+    if path.exists():
+        with open(path) as f:
+            existing = json.load(f)
+        if existing.get('schema_version') == SCHEMA_VERSION:
+            configs = existing
+
+    configs['version'] += 1
+    configs['updated'] = datetime.now().isoformat(timespec='seconds')
+    configs['communities'][community] = {
+        'features': list(features),
+        'search': search or {},
+        'targets': results,
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(configs, f, indent=2)
+    return configs['version']
+
+
+class TunedConfigs:
+    """
+    Tuned model settings read from a :func:`save_tuned_configs` file.
+
+    A missing file or an unknown schema gives an empty set, so every lookup
+    falls back to the caller's defaults. Lookups take the caller's feature
+    names; a community searched on other feature columns also falls back to
+    the defaults, with a printed warning. Targets that were not searched
+    keep the defaults too.
+    """
+
+    def __init__(self, configs: Optional[Dict] = None):
+        configs = configs or {}
+        self.version: int = configs.get('version', 0)
+        self.communities: Dict[str, Dict] = configs.get('communities', {})
+        self._warned = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.communities)
+
+    def _targets(self, community: str, features: Sequence[str]) -> Dict:
+        """Tuned targets of ``community``, or empty if they were searched on other feature columns."""
+        config = self.communities.get(community, {})
+        targets = config.get('targets', {})
+        searched = set(config.get('features', []))
+        if targets and searched != set(features):
+            if community not in self._warned:
+                self._warned.add(community)
+                print(f"⚠️ Tuned configurations for '{community}' were searched on other features "
+                      f"({len(searched - set(features))} missing here, {len(set(features) - searched)} new); "
+                      f"using default settings")
+            return {}
+        return targets
+
+    def has(self, community: str, features: Sequence[str], target: Optional[str] = None) -> bool:
+        """True if ``community`` (or one of its targets) was searched on these feature columns."""
+        targets = self._targets(community, features)
+        return target in targets if target is not None else bool(targets)
+
+    def params(self, model: str, community: str, target: str, default: Optional[Dict] = None, *,
+               features: Sequence[str]) -> Dict:
+        """``default`` updated with the tuned parameters of ``model`` for one community target."""
+        targets = self._targets(community, features)
+        tuned = targets.get(target, {}).get(model_key(model), {}).get('params', {})
+        return {**(default or {}), **tuned}
+
+    def models(self, models: Dict, community: str, target: str, *, features: Sequence[str]) -> Dict:
+        """Copies of ``models`` (display name -> estimator) with the tuned parameters of one target applied."""
+        return {
+            name: clone(model).set_params(**self.params(name, community, target, features=features))
+            for name, model in models.items()
+        }
+
+
+def load_tuned_configs(path) -> TunedConfigs:
+    path = Path(path)
+    if not path.exists():
+        return TunedConfigs()
+    with open(path) as f:
+        configs = json.load(f)
+    if configs.get('schema_version') != SCHEMA_VERSION:
+        return TunedConfigs()
+    return TunedConfigs(configs)
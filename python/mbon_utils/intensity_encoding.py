@@ -0,0 +1,121 @@
+"""
+Ordinal intensity encoding for detection counts.
+
+Turns raw count columns (e.g. combined dolphin echolocation, burst pulse and
+whistle counts) into 0-3 style intensity levels: 0 for no activity, then one
+level per percentile band of the non-zero counts. Thresholds can be pooled
+or computed per group (e.g. station and season) in one grouped-quantile
+pass, and are exposed as JSON-ready metadata.
+"""
+
+import json
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_PERCENTILES = (33, 67)
+FALLBACK_THRESHOLDS = (1, 3)
+
+
+class IntensityEncoder:
+    """
+    Percentile-based intensity levels for one or more count columns.
+
+    With the default ``percentiles=(33, 67)`` a count maps to 0 (absent),
+    1 (below the 33rd percentile of non-zero counts), 2 (below the 67th) or
+    3 (at or above it). Thresholds are rounded up to whole counts. Groups
+    with fewer than ``min_nonzero`` non-zero counts use the pooled
+    thresholds, and ``fallback`` is used when there is no activity at all.
+    """
+
+    def __init__(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                 by: Optional[Sequence[str]] = None, min_nonzero: int = 10,
+                 fallback: Sequence[float] = FALLBACK_THRESHOLDS):
+        self.percentiles = list(percentiles)
+        self.by = list(by) if by else None
+        self.min_nonzero = min_nonzero
+        self.fallback = list(fallback)
+
+    def _group_keys(self, df: pd.DataFrame) -> pd.Index:
+        if len(self.by) == 1:
+            return pd.Index(df[self.by[0]])
+        return pd.MultiIndex.from_frame(df[self.by])
+
+    def fit(self, df: pd.DataFrame, count_cols: Sequence[str]) -> "IntensityEncoder":
+        """Compute thresholds for every column in ``count_cols``."""
+        self.count_cols_: List[str] = list(count_cols)
+        quantiles = [p / 100 for p in self.percentiles]
+        nonzero = df[self.count_cols_].astype(float)
+        nonzero = nonzero.where(nonzero > 0)
+
+        pooled = np.ceil(nonzero.quantile(quantiles).to_numpy())
+        self.pooled_thresholds_: Dict[str, np.ndarray] = {}
+        for i, col in enumerate(self.count_cols_):
+            has_activity = nonzero[col].notna().any()
+            self.pooled_thresholds_[col] = pooled[:, i] if has_activity else np.asarray(self.fallback, dtype=float)
+
+        self.thresholds_: Dict[str, pd.DataFrame] = {}
+        if self.by is None:
+            return self
+
+        # One grouped quantile pass over every column
+        grouped = nonzero.groupby([df[key] for key in self.by], sort=True, observed=True)
+        group_quantiles = np.ceil(grouped.quantile(quantiles))
+        group_counts = grouped.count()
+
+        labels = [f"p{p:g}" for p in self.percentiles]
+        for col in self.count_cols_:
+            table = group_quantiles[col].unstack(-1)
+            table.columns = labels
+            too_sparse = group_counts[col].reindex(table.index) < self.min_nonzero
+            table.loc[too_sparse] = self.pooled_thresholds_[col]
+            self.thresholds_[col] = table
+        return self
+
+    def _row_thresholds(self, df: pd.DataFrame, col: str) -> np.ndarray:
+        pooled = self.pooled_thresholds_[col]
+        if self.by is None:
+            return np.broadcast_to(pooled, (len(df), len(pooled)))
+        table = self.thresholds_[col]
+        # Rows from groups not seen in fit (indexer -1) pick up the trailing pooled row
+        lookup = np.vstack([table.to_numpy(dtype=float), pooled])
+        return lookup[table.index.get_indexer(self._group_keys(df))]
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Intensity levels (int8) for each fitted count column."""
+        levels = {}
+        for col in self.count_cols_:
+            counts = df[col].fillna(0).to_numpy(dtype=float)
+            row_thresholds = self._row_thresholds(df, col)
+
+            # Rows sharing a threshold set are binned together with np.digitize;
+            # the first bin edge separates zero from any positive count
+            unique_thresholds, inverse = np.unique(row_thresholds, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            col_levels = np.zeros(len(df), dtype=np.int8)
+            for g, thresholds in enumerate(unique_thresholds):
+                rows = inverse == g
+                bins = np.concatenate([[np.nextafter(0, 1)], thresholds])
+                col_levels[rows] = np.digitize(counts[rows], bins)
+            levels[col] = col_levels
+        return pd.DataFrame(levels, index=df.index)
+
+    def fit_transform(self, df: pd.DataFrame, count_cols: Sequence[str]) -> pd.DataFrame:
+        return self.fit(df, count_cols).transform(df)
+
+    def metadata(self) -> Dict:
+        """Thresholds and settings as a JSON-serializable dict."""
+        columns = {}
+        for col in self.count_cols_:
+            entry = {'pooled': self.pooled_thresholds_[col].tolist()}
+            if self.by is not None:
+                entry['groups'] = json.loads(self.thresholds_[col].reset_index().to_json(orient='records'))
+            columns[col] = entry
+        return {
+            'percentiles': self.percentiles,
+            'by': self.by,
+            'min_nonzero': self.min_nonzero,
+            'columns': columns,
+        }
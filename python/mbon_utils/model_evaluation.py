@@ -0,0 +1,193 @@
+"""
+Cross-validation helpers for the community screening models.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, cohen_kappa_score, f1_score, precision_score, recall_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.utils import get_tags
+
+from mbon_utils.fold_scaling import FoldScaledMatrix
+
+
+def cross_val_oof(model, X, y, cv) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Out-of-fold positive-class probabilities and per-fold F1 scores.
+
+    Fits the same folds ``cross_val_score(model, X, y, cv=cv, scoring='f1')``
+    would, so the fold scores are unchanged while every sample also gets a
+    probability from a model that never saw it.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    oof_prob = np.full(len(y), np.nan, dtype=np.float32)
+    fold_f1 = []
+
+    for train_idx, test_idx in cv.split(X, y):
+        fold_model = clone(model).fit(X[train_idx], y[train_idx])
+        fold_pred = fold_model.predict(X[test_idx])
+        if hasattr(fold_model, 'predict_proba'):
+            oof_prob[test_idx] = fold_model.predict_proba(X[test_idx])[:, 1]
+        else:
+            oof_prob[test_idx] = fold_pred
+        fold_f1.append(f1_score(y[test_idx], fold_pred, zero_division=0))
+
+    return oof_prob, np.array(fold_f1)
+
+
+def _joint_strata(Y: np.ndarray, min_count: int) -> np.ndarray:
+    """
+    One stratum per combination of target labels.
+
+    Combinations seen fewer than ``min_count`` times are pooled, and the
+    pool joins the largest stratum if it is still too small.
+    """
+    _, codes, counts = np.unique(Y, axis=0, return_inverse=True, return_counts=True)
+    codes = codes.ravel()
+    rare = counts[codes] < min_count
+    if rare.any():
+        codes = np.where(rare, -1, codes)
+        if rare.sum() < min_count:
+            codes[rare] = np.bincount(codes[~rare]).argmax()
+    return codes
+
+
+def _positive_proba(proba: np.ndarray, classes: np.ndarray) -> np.ndarray:
+    """Probability of the positive class (label 1), zero if it was absent from training."""
+    positive = np.flatnonzero(classes == 1)
+    return proba[:, positive[0]] if len(positive) else np.zeros(len(proba))
+
+
+def _fit_predict(model, X_train, Y_train, X_test,
+                 multi_output: bool = True) -> Tuple[object, np.ndarray, np.ndarray]:
+    """
+    Fit ``model`` on every target column and predict ``X_test``.
+
+    With ``multi_output``, estimators that support multi-output targets
+    (trees, forests) are fitted once; otherwise, and for other estimators,
+    one model is fitted per target. Returns the fitted model (a list of
+    per-target models in the second case), predictions and positive-class
+    probabilities, both (n_test, n_targets).
+    """
+    n_targets = Y_train.shape[1]
+    if multi_output and get_tags(model).target_tags.multi_output and n_targets > 1:
+        fitted = clone(model).fit(X_train, Y_train)
+        pred = fitted.predict(X_test).reshape(len(X_test), n_targets)
+        if hasattr(fitted, 'predict_proba'):
+            proba = fitted.predict_proba(X_test)
+            prob = np.column_stack([_positive_proba(p, c) for p, c in zip(proba, fitted.classes_)])
+        else:
+            prob = pred.astype(float)
+        return fitted, pred, prob
+
+    fitted = [clone(model).fit(X_train, Y_train[:, t]) for t in range(n_targets)]
+    pred = np.column_stack([m.predict(X_test) for m in fitted])
+    prob = np.column_stack([
+        _positive_proba(m.predict_proba(X_test), m.classes_) if hasattr(m, 'predict_proba') else pred[:, t]
+        for t, m in enumerate(fitted)
+    ])
+    return (fitted[0] if n_targets == 1 else fitted), pred, prob
+
+
+def _target_model(fitted, t: int):
+    return fitted[t] if isinstance(fitted, list) else fitted
+
+
+def _split_features(X: np.ndarray, splits: List[Tuple[np.ndarray, np.ndarray]],
+                    scaled: Optional[FoldScaledMatrix], i: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Train and test features of split ``i``, standardized on its training rows when ``scaled`` is given."""
+    if scaled is not None:
+        X_train, X_test, _, _ = scaled.fold_data(i)
+        return X_train, X_test
+    train, test = splits[i]
+    return X[train], X[test]
+
+
+def train_community_models(models: Dict, X, Y: pd.DataFrame, community_type: str,
+                           shared_split: bool = False, test_size: float = 0.3,
+                           random_state: int = 42, n_splits: int = 5,
+                           scale: bool = False) -> Dict[str, Dict[str, Dict]]:
+    """
+    Train every model on every binary target column of ``Y``.
+
+    Returns ``{target: {model_name: result}}`` with the result keys used by
+    the community notebooks (``model``, test-split metrics, ``cv_f1_mean``
+    and ``cv_f1_std``, ``y_test``/``y_pred``/``y_prob`` and ``oof_prob``).
+
+    By default each target gets its own stratified split and folds, as when
+    the targets are trained one at a time. With ``shared_split`` all targets
+    share one train/test split and one set of CV folds, both stratified on
+    the joint label combination, so every target is scored on the same rows.
+    Multi-output estimators are fitted once per CV fold for all targets.
+    They choose splits on the impurity averaged over targets, which can cost
+    recall on rare targets (e.g. the 90th-percentile flag), so only the CV
+    scores and out-of-fold probabilities come from them: the ``model``
+    entry, its feature importances and the test-split metrics always come
+    from a single-target model fitted on the shared training rows. The mode
+    is for comparable splits, not speed; with the per-target final fits the
+    total training time is close to the default mode.
+
+    With ``scale``, ``X`` holds unscaled features and the train/test split
+    and every CV fold are standardized with statistics from their own
+    training rows (:class:`~mbon_utils.fold_scaling.FoldScaledMatrix`), so
+    no test rows leak into the scaling; the ``model`` entry then expects
+    features scaled like the training split.
+    """
+    X = np.asarray(X, dtype=np.float64) if scale else np.asarray(X)
+    targets: Sequence[str] = list(Y.columns)
+    Y_values = Y.to_numpy()
+    if not shared_split:
+        results = {}
+        for target in targets:
+            results.update(train_community_models(models, X, Y[[target]], community_type, True,
+                                                  test_size, random_state, n_splits, scale))
+        return results
+
+    strata = _joint_strata(Y_values, n_splits) if len(targets) > 1 else Y_values[:, 0]
+    train_idx, test_idx = train_test_split(np.arange(len(X)), test_size=test_size,
+                                           random_state=random_state, stratify=strata)
+    folds = list(StratifiedKFold(n_splits).split(X, strata))
+    # Split 0 is the train/test split, then the CV folds; scaled blocks are shared by every model
+    splits = [(train_idx, test_idx)] + folds
+    scaled = FoldScaledMatrix(pd.DataFrame(X), Y_values, splits) if scale else None
+
+    results = {target: {} for target in targets}
+    for model_name, model in models.items():
+        X_train, X_test = _split_features(X, splits, scaled, 0)
+        fitted, y_pred, y_prob = _fit_predict(model, X_train, Y_values[train_idx], X_test,
+                                              multi_output=False)
+
+        # Cross-validation - the same folds also give out-of-fold probabilities for every sample
+        oof_prob = np.full(Y_values.shape, np.nan, dtype=np.float32)
+        fold_f1 = []
+        for fold, (fold_train, fold_test) in enumerate(folds, start=1):
+            X_fold_train, X_fold_test = _split_features(X, splits, scaled, fold)
+            _, fold_pred, fold_prob = _fit_predict(model, X_fold_train, Y_values[fold_train], X_fold_test)
+            oof_prob[fold_test] = fold_prob
+            fold_f1.append([f1_score(Y_values[fold_test, t], fold_pred[:, t], zero_division=0)
+                            for t in range(len(targets))])
+        fold_f1 = np.array(fold_f1)
+
+        for t, target in enumerate(targets):
+            y_test = Y[target].iloc[test_idx]
+            pred = y_pred[:, t]
+            results[target][model_name] = {
+                'model': _target_model(fitted, t),
+                'accuracy': accuracy_score(y_test, pred),
+                'precision': precision_score(y_test, pred, average='binary', zero_division=0),
+                'recall': recall_score(y_test, pred, average='binary', zero_division=0),
+                'f1': f1_score(y_test, pred, average='binary', zero_division=0),
+                'kappa': cohen_kappa_score(y_test, pred),
+                'cv_f1_mean': fold_f1[:, t].mean(),
+                'cv_f1_std': fold_f1[:, t].std(),
+                'y_test': y_test,
+                'y_pred': pred,
+                'y_prob': y_prob[:, t],
+                'oof_prob': oof_prob[:, t],
+                'community_type': community_type,
+            }
+    return results
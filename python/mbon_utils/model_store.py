@@ -0,0 +1,138 @@
+"""
+On-disk store for the community screening models.
+
+Replaces a single pickle of every fitted model with a layout where each
+piece can be read on its own:
+
+    index.json                                  communities, targets, models, metrics
+    models/<community>/<target>/<model>.pkl     fitted estimator (loaded on demand)
+    arrays/<community>/rows.npy                 modeling row labels
+    arrays/<community>/<target>/<model>/<name>.npy   predictions (memory-mapped)
+
+Reading metrics only touches ``index.json``.
+"""
+
+import json
+import pickle
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+INDEX_FILE = "index.json"
+
+# Result entries saved as memory-mappable arrays rather than index metrics
+ARRAY_KEYS = ('y_test', 'y_pred', 'y_prob', 'oof_prob')
+
+
+def save_model_store(results: Dict, store_dir, rows: Optional[Dict] = None) -> Path:
+    """
+    Write nested ``{community: {target: {model: result}}}`` results to ``store_dir``.
+
+    Each result dict may hold a fitted estimator under ``'model'``, arrays
+    under :data:`ARRAY_KEYS` and scalar metrics under any other key.
+    ``rows`` optionally maps community to the row labels the arrays refer to.
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    index = {'communities': {}}
+
+    for community, community_results in results.items():
+        community_entry = {'rows': None, 'targets': {}}
+        if rows is not None and community in rows:
+            rows_path = Path("arrays") / community / "rows.npy"
+            _save_array(store_dir / rows_path, rows[community])
+            community_entry['rows'] = rows_path.as_posix()
+
+        for target, target_models in community_results.items():
+            target_entry = {}
+            for model_name, result in target_models.items():
+                entry = {'metrics': {}, 'arrays': {}, 'artifact': None}
+
+                for key, value in result.items():
+                    if key == 'model':
+                        artifact_path = Path("models") / community / target / f"{model_name}.pkl"
+                        (store_dir / artifact_path).parent.mkdir(parents=True, exist_ok=True)
+                        with open(store_dir / artifact_path, 'wb') as f:
+                            pickle.dump(value, f)
+                        entry['artifact'] = artifact_path.as_posix()
+                    elif key in ARRAY_KEYS:
+                        array_path = Path("arrays") / community / target / model_name / f"{key}.npy"
+                        _save_array(store_dir / array_path, value)
+                        entry['arrays'][key] = array_path.as_posix()
+                    else:
+                        entry['metrics'][key] = value.item() if isinstance(value, np.generic) else value
+
+                target_entry[model_name] = entry
+            community_entry['targets'][target] = target_entry
+        index['communities'][community] = community_entry
+
+    with open(store_dir / INDEX_FILE, 'w') as f:
+        json.dump(index, f, indent=2)
+    return store_dir
+
+
+def _save_array(path: Path, values):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, np.asarray(values), allow_pickle=False)
+
+
+class ModelStore:
+    """Read access to a store written by :func:`save_model_store`."""
+
+    def __init__(self, store_dir):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / INDEX_FILE, 'r') as f:
+            self.index = json.load(f)
+        self._models = {}
+
+    @property
+    def communities(self):
+        return list(self.index['communities'].keys())
+
+    def _entry(self, community: str, target: str, model_name: str) -> Dict:
+        return self.index['communities'][community]['targets'][target][model_name]
+
+    def results(self, community: str) -> Dict[str, Dict[str, Dict]]:
+        """Metrics as ``{target: {model: {metric: value}}}``, the shape the pickle used to have."""
+        targets = self.index['communities'][community]['targets']
+        return {
+            target: {model_name: dict(entry['metrics']) for model_name, entry in models.items()}
+            for target, models in targets.items()
+        }
+
+    def metrics(self) -> pd.DataFrame:
+        """One row per community, target and model with every stored metric."""
+        records = [
+            {'community': community, 'target': target, 'model': model_name, **entry['metrics']}
+            for community, community_entry in self.index['communities'].items()
+            for target, models in community_entry['targets'].items()
+            for model_name, entry in models.items()
+        ]
+        return pd.DataFrame(records)
+
+    def best_model(self, community: str, target: str, metric: str = 'f1') -> str:
+        """Name of the model with the highest ``metric`` for a target."""
+        models = self.index['communities'][community]['targets'][target]
+        return max(models.keys(), key=lambda name: models[name]['metrics'][metric])
+
+    def rows(self, community: str) -> Optional[np.ndarray]:
+        """Row labels of the modeling dataset the community's arrays refer to."""
+        rows_path = self.index['communities'][community]['rows']
+        return None if rows_path is None else np.load(self.store_dir / rows_path, mmap_mode='r')
+
+    def array(self, community: str, target: str, model_name: str, name: str = 'oof_prob') -> np.ndarray:
+        """A stored prediction array, memory-mapped read-only."""
+        array_path = self._entry(community, target, model_name)['arrays'][name]
+        return np.load(self.store_dir / array_path, mmap_mode='r')
+
+    def load_model(self, community: str, target: str, model_name: str):
+        """Unpickle one fitted estimator (cached after the first load)."""
+        key = (community, target, model_name)
+        if key not in self._models:
+            artifact_path = self._entry(community, target, model_name)['artifact']
+            with open(self.store_dir / artifact_path, 'rb') as f:
+                self._models[key] = pickle.load(f)
+        return self._models[key]
@@ -0,0 +1,195 @@
+"""
+Cached mutual-information scoring for binary (or other discrete) targets.
+
+Same estimator as ``sklearn.feature_selection.mutual_info_classif`` with
+continuous features (Ross 2014, k-nearest neighbours): features are scaled
+to unit variance and jittered with the same seeded noise, so scores agree
+with scikit-learn for the same ``random_state``. The work that does not
+depend on the target is done once per feature matrix: because each
+feature is one-dimensional, its neighbour structure is just its sort
+order, and every target reuses it. Class-conditional k-th neighbour
+distances come from a window of ``k`` sorted neighbours on each side, and
+radius counts from binary searches on the sorted values.
+
+Scores are memoized on disk in a JSON file per feature matrix (keyed by a
+hash of the data, feature names, seed and ``n_neighbors``), with one entry
+per target hash, so re-running a notebook reuses earlier rankings.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.special import digamma
+
+
+CACHE_VERSION = 1
+
+
+def _hash_array(values: np.ndarray) -> str:
+    values = np.ascontiguousarray(values)
+    digest = hashlib.sha1(str((values.dtype, values.shape)).encode())
+    digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def prepare_features(X: np.ndarray, random_state: int = 42) -> np.ndarray:
+    """Features scaled to unit variance plus the small seeded noise ``mutual_info_classif`` adds."""
+    X = np.array(X, dtype=np.float64)
+    if np.isnan(X).any():
+        raise ValueError("Features contain NaN; impute or drop missing values first")
+    scale = X.std(axis=0)
+    X /= np.where(scale > 10 * np.finfo(scale.dtype).eps, scale, 1.0)
+    rng = np.random.RandomState(random_state)
+    means = np.maximum(1, np.mean(np.abs(X), axis=0))
+    X += 1e-10 * means * rng.standard_normal(size=X.shape)
+    return X
+
+
+def _window_counts(values: np.ndarray, centers: np.ndarray, radius: np.ndarray) -> np.ndarray:
+    """Number of ``values`` (sorted) within ``radius`` of each center, matching the KD-tree's squared-distance test."""
+    limit = radius ** 2
+    lo = np.searchsorted(values, centers - radius, side='left')
+    hi = np.searchsorted(values, centers + radius, side='right')
+    # Settle the rounding at both ends of each window
+    n = len(values)
+    while True:
+        widen = (lo > 0) & ((values[np.maximum(lo - 1, 0)] - centers) ** 2 <= limit)
+        shrink = ~widen & (lo < hi) & ((values[np.minimum(lo, n - 1)] - centers) ** 2 > limit)
+        if not (widen.any() or shrink.any()):
+            break
+        lo = lo - widen + shrink
+    while True:
+        widen = (hi < n) & ((values[np.minimum(hi, n - 1)] - centers) ** 2 <= limit)
+        shrink = ~widen & (hi > lo) & ((values[np.maximum(hi - 1, 0)] - centers) ** 2 > limit)
+        if not (widen.any() or shrink.any()):
+            break
+        hi = hi + widen - shrink
+    return hi - lo
+
+
+def _kth_neighbor_distance(values: np.ndarray, k: int) -> np.ndarray:
+    """Distance from each row of ``values`` (sorted along axis 0) to its k-th nearest other row, per column."""
+    n = len(values)
+    padded = np.pad(values, ((k, k), (0, 0)), constant_values=np.nan)
+    candidates = []
+    for offset in [*range(-k, 0), *range(1, k + 1)]:
+        diff = padded[k + offset:k + offset + n] - values
+        candidates.append(np.where(np.isnan(diff), np.inf, np.sqrt(diff * diff)))
+    return np.partition(np.stack(candidates), k - 1, axis=0)[k - 1]
+
+
+def mi_scores(sorted_values: np.ndarray, order: np.ndarray, y: np.ndarray, n_neighbors: int = 3) -> np.ndarray:
+    """
+    Mutual information of every feature with a discrete target.
+
+    ``sorted_values``/``order`` are the prepared features sorted along
+    axis 0 and the sorting indices, as held by :class:`MutualInfoScorer`.
+    """
+    y = np.asarray(y)
+    labels, label_counts = np.unique(y, return_counts=True)
+    y_sorted = y[order]
+    n_features = sorted_values.shape[1]
+
+    # Points whose label occurs only once are ignored, as in scikit-learn
+    keep = np.isin(y_sorted, labels[label_counts > 1])
+    n_samples = int(keep[:, 0].sum())
+    if n_samples == 0:
+        return np.zeros(n_features)
+
+    radius = np.zeros(sorted_values.shape)
+    k_all = np.zeros(sorted_values.shape)
+    counts = np.zeros(sorted_values.shape)
+    for label, count in zip(labels, label_counts):
+        if count < 2:
+            continue
+        k = min(n_neighbors, count - 1)
+        in_class = (y_sorted == label).T
+        class_values = sorted_values.T[in_class].reshape(n_features, count).T
+        radius.T[in_class] = np.nextafter(_kth_neighbor_distance(class_values, k), 0).T.ravel()
+        k_all.T[in_class] = k
+        counts.T[in_class] = count
+
+    scores = np.empty(n_features)
+    for j in range(n_features):
+        rows = keep[:, j]
+        values = sorted_values[rows, j]
+        m_all = _window_counts(values, values, radius[rows, j])
+        scores[j] = (digamma(n_samples) + np.mean(digamma(k_all[rows, j]))
+                     - np.mean(digamma(counts[rows, j])) - np.mean(digamma(m_all)))
+    return np.maximum(scores, 0)
+
+
+class MutualInfoScorer:
+    """
+    Mutual-information rankings of one feature matrix against any number of targets.
+
+    ``X`` may be a DataFrame (feature names from its columns) or an array.
+    With ``cache_dir`` scores are read from and written to
+    ``cache_dir/mi_<hash>.json``. Features are prepared and sorted only
+    when a target is not already cached.
+    """
+
+    def __init__(self, X, feature_names: Optional[Sequence[str]] = None, random_state: int = 42,
+                 n_neighbors: int = 3, cache_dir=None):
+        if feature_names is None:
+            feature_names = list(X.columns) if isinstance(X, pd.DataFrame) else [f"x{i}" for i in range(np.shape(X)[1])]
+        self.X = np.asarray(X, dtype=np.float64)
+        self.feature_names = list(feature_names)
+        self.random_state = random_state
+        self.n_neighbors = n_neighbors
+        self._sorted = None
+
+        self.cache_path = None
+        self._cache = {}
+        if cache_dir is not None:
+            key = hashlib.sha1('|'.join([
+                _hash_array(self.X), json.dumps(self.feature_names), str(random_state), str(n_neighbors),
+            ]).encode()).hexdigest()[:20]
+            self.cache_path = Path(cache_dir) / f"mi_{key}.json"
+            if self.cache_path.exists():
+                with open(self.cache_path) as f:
+                    cached = json.load(f)
+                if cached.get('version') == CACHE_VERSION:
+                    self._cache = cached['scores']
+
+    def _prepared(self):
+        if self._sorted is None:
+            prepared = prepare_features(self.X, self.random_state)
+            order = np.argsort(prepared, axis=0, kind='stable')
+            self._sorted = (np.take_along_axis(prepared, order, axis=0), order)
+        return self._sorted
+
+    def score(self, y) -> np.ndarray:
+        """MI of each feature with target ``y``, in feature order."""
+        y = np.asarray(y)
+        key = _hash_array(y)
+        if key not in self._cache:
+            sorted_values, order = self._prepared()
+            self._cache[key] = mi_scores(sorted_values, order, y, self.n_neighbors).tolist()
+            self._save()
+        return np.array(self._cache[key])
+
+    def score_targets(self, targets) -> pd.DataFrame:
+        """MI for several targets (a DataFrame or a mapping of name to labels): one column per target."""
+        items = targets.items() if isinstance(targets, (pd.DataFrame, Mapping)) else targets
+        scores: Dict[str, np.ndarray] = {}
+        for name, y in items:
+            scores[name] = self.score(y)
+        return pd.DataFrame(scores, index=pd.Index(self.feature_names, name='feature'))
+
+    def _save(self):
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_path, 'w') as f:
+            json.dump({
+                'version': CACHE_VERSION,
+                'feature_names': self.feature_names,
+                'random_state': self.random_state,
+                'n_neighbors': self.n_neighbors,
+                'scores': self._cache,
+            }, f)
@@ -0,0 +1,200 @@
+"""
+Catalog of Parquet datasets built from file footers.
+
+Row counts, schemas, sizes, null counts, date ranges and the station/year
+values of each file are taken from the Parquet footer and row-group
+statistics, without loading the data. Distinct values come straight from
+the statistics when every row group holds a single value; otherwise only
+that one column is read, dictionary-encoded. The catalog is persisted as
+JSON and entries are reused while a file's size and modification time are
+unchanged, so pipeline stages and the dashboard can discover datasets
+without opening them.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+
+CATALOG_VERSION = 1
+
+
+def _column_stats(metadata, column_index: int):
+    """Per-row-group statistics for one column (None where a row group has none)."""
+    return [metadata.row_group(rg).column(column_index).statistics for rg in range(metadata.num_row_groups)]
+
+
+def _to_json_value(value):
+    if hasattr(value, 'isoformat'):
+        return pd.Timestamp(value).isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _distinct_values(path, parquet_file, column: str, column_index: int, sources: Dict[str, str]) -> List:
+    """
+    Sorted distinct non-null values, from statistics if each row group is single-valued.
+
+    Otherwise string columns are read dictionary-encoded and the values come
+    from the dictionaries; other types are read and de-duplicated.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    stats = _column_stats(parquet_file.metadata, column_index)
+    if stats and all(s is not None and s.has_min_max and s.min == s.max for s in stats):
+        sources[column] = 'statistics'
+        return sorted({_to_json_value(s.min) for s in stats})
+
+    sources[column] = 'column'
+    field_type = parquet_file.schema_arrow.field(column).type
+    if pa.types.is_string(field_type) or pa.types.is_large_string(field_type):
+        values = pq.ParquetFile(path, read_dictionary=[column]).read(columns=[column]).column(column)
+        distinct = set()
+        for chunk in values.chunks:
+            distinct.update(chunk.dictionary.to_pylist() if pa.types.is_dictionary(chunk.type) else chunk.to_pylist())
+    else:
+        distinct = set(pc.unique(parquet_file.read(columns=[column]).column(column)).to_pylist())
+    return sorted(_to_json_value(v) for v in distinct if v is not None)
+
+
+def _value_range(parquet_file, column: str, column_index: int, sources: Dict[str, str]):
+    """(min, max) of a column from statistics, reading the column only if statistics are missing."""
+    stats = _column_stats(parquet_file.metadata, column_index)
+    if stats and all(s is not None and s.has_min_max for s in stats):
+        sources[column] = 'statistics'
+        return min(s.min for s in stats), max(s.max for s in stats)
+
+    sources[column] = 'column'
+    values = parquet_file.read(columns=[column]).column(column).to_pandas().dropna()
+    if values.empty:
+        return None, None
+    return values.min(), values.max()
+
+
+def describe_parquet(path) -> Dict:
+    """
+    Catalog entry for one Parquet file.
+
+    Keys: ``rows``, ``columns``, ``dtypes``, ``row_groups``, ``file_size``,
+    ``uncompressed_size``, ``missing_values``, and where matching columns
+    exist ``date_range``, ``stations`` and ``years``. ``sources`` records
+    whether each of those came from statistics or from reading the column.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    parquet_file = pq.ParquetFile(path)
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    columns = [name for name in schema.names if not name.startswith('__index_level_')]
+
+    # Leaf column positions in the footer, keyed by top-level column name
+    column_index = {}
+    for i in range(metadata.num_columns):
+        column_index.setdefault(metadata.schema.column(i).path.split('.')[0], i)
+
+    missing_values = {}
+    for column in columns:
+        stats = _column_stats(metadata, column_index[column])
+        if all(s is not None and s.has_null_count for s in stats):
+            missing_values[column] = int(sum(s.null_count for s in stats))
+        else:
+            missing_values[column] = int(parquet_file.read(columns=[column]).column(column).null_count)
+
+    entry = {
+        'file_name': path.name,
+        'file_path': str(path),
+        'file_size': path.stat().st_size,
+        'modified': path.stat().st_mtime,
+        'rows': metadata.num_rows,
+        'columns': columns,
+        'dtypes': {column: str(schema.field(column).type) for column in columns},
+        'row_groups': metadata.num_row_groups,
+        'uncompressed_size': sum(metadata.row_group(rg).total_byte_size for rg in range(metadata.num_row_groups)),
+        'missing_values': missing_values,
+        'sources': {},
+    }
+
+    # Same column conventions as the per-file analysis: first date-like, station-like and year-like column
+    date_cols = [c for c in columns if 'date' in c.lower() and pa.types.is_timestamp(schema.field(c).type)]
+    if date_cols:
+        start, end = _value_range(parquet_file, date_cols[0], column_index[date_cols[0]], entry['sources'])
+        if start is not None:
+            entry['date_range'] = {'start': _to_json_value(start), 'end': _to_json_value(end), 'column': date_cols[0]}
+
+    station_cols = [c for c in columns if 'station' in c.lower()]
+    if station_cols:
+        entry['stations'] = _distinct_values(path, parquet_file, station_cols[0], column_index[station_cols[0]], entry['sources'])
+
+    year_cols = [c for c in columns if 'year' in c.lower()]
+    if year_cols:
+        entry['years'] = _distinct_values(path, parquet_file, year_cols[0], column_index[year_cols[0]], entry['sources'])
+
+    return entry
+
+
+def build_catalog(paths: Iterable, catalog_path=None, root=None) -> Dict[str, Dict]:
+    """
+    Catalog entries for ``paths``, keyed by path relative to ``root`` (or file name).
+
+    When ``catalog_path`` exists, entries for files whose size and
+    modification time are unchanged are reused; the updated catalog is
+    written back to ``catalog_path``. Files that cannot be read get an
+    ``error`` entry.
+    """
+    previous = load_catalog(catalog_path) if catalog_path is not None and Path(catalog_path).exists() else {}
+
+    catalog = {}
+    for path in sorted(Path(p) for p in paths):
+        key = str(path.relative_to(root)) if root is not None else path.name
+        cached = previous.get(key)
+        stat = path.stat()
+        if cached and 'error' not in cached and cached['file_size'] == stat.st_size and cached['modified'] == stat.st_mtime:
+            catalog[key] = cached
+            continue
+        try:
+            catalog[key] = describe_parquet(path)
+        except Exception as e:
+            catalog[key] = {'file_name': path.name, 'file_path': str(path), 'error': str(e)}
+
+    if catalog_path is not None:
+        with open(catalog_path, 'w') as f:
+            json.dump({'version': CATALOG_VERSION, 'files': catalog}, f, indent=2)
+    return catalog
+
+
+def load_catalog(catalog_path) -> Dict[str, Dict]:
+    """Entries of a catalog written by :func:`build_catalog` (empty if the format changed)."""
+    with open(catalog_path) as f:
+        catalog = json.load(f)
+    if catalog.get('version') != CATALOG_VERSION:
+        return {}
+    return catalog['files']
+
+
+def catalog_frame(catalog: Dict[str, Dict]) -> pd.DataFrame:
+    """One row per cataloged file: rows, column count, sizes, date range, stations and years."""
+    records = []
+    for key, entry in catalog.items():
+        if 'error' in entry:
+            records.append({'dataset': key, 'error': entry['error']})
+            continue
+        date_range = entry.get('date_range') or {}
+        records.append({
+            'dataset': key,
+            'rows': entry['rows'],
+            'n_columns': len(entry['columns']),
+            'file_size': entry['file_size'],
+            'uncompressed_size': entry['uncompressed_size'],
+            'start': date_range.get('start'),
+            'end': date_range.get('end'),
+            'stations': entry.get('stations'),
+            'years': entry.get('years'),
+        })
+    return pd.DataFrame(records)
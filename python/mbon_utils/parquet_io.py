@@ -0,0 +1,32 @@
+"""
+Parquet helpers that keep analysis metadata alongside the data.
+"""
+
+import json
+from typing import Dict
+
+import pandas as pd
+
+
+def write_parquet_with_metadata(df: pd.DataFrame, path, metadata: Dict[str, object]):
+    """Write ``df`` to Parquet with each ``metadata`` entry stored as JSON in the schema metadata."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    for key, value in metadata.items():
+        schema_metadata[key.encode()] = json.dumps(value).encode()
+    pq.write_table(table.replace_schema_metadata(schema_metadata), path)
+
+
+def read_parquet_metadata(path) -> Dict[str, object]:
+    """Read back the JSON metadata entries written by :func:`write_parquet_with_metadata`."""
+    import pyarrow.parquet as pq
+
+    schema_metadata = pq.read_schema(path).metadata or {}
+    return {
+        key.decode(): json.loads(value)
+        for key, value in schema_metadata.items()
+        if key != b'pandas'
+    }
@@ -0,0 +1,116 @@
+"""
+Hive-partitioned Parquet datasets (``station=.../year=.../part-0.parquet``).
+
+Aligned outputs are written once per station and year, and reads push the
+station, year and datetime filters down to pyarrow so only the matching
+partitions and row groups are opened. A per-station analysis therefore
+costs the same however many years have been added to the dataset.
+"""
+
+from pathlib import Path
+from typing import Optional, Sequence
+
+import pandas as pd
+
+
+PARTITION_COLUMNS = ('station', 'year')
+
+
+def _partitioning(partition_cols: Sequence[str]):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    types = {'station': pa.string(), 'year': pa.int64()}
+    schema = pa.schema([(col, types.get(col, pa.string())) for col in partition_cols])
+    return ds.partitioning(schema, flavor='hive')
+
+
+def write_partitioned(df: pd.DataFrame, root, partition_cols: Sequence[str] = PARTITION_COLUMNS,
+                      datetime_col: str = 'datetime'):
+    """
+    Write ``df`` under ``root`` partitioned by ``partition_cols``.
+
+    A missing ``year`` column is derived from ``datetime_col``. Partitions
+    present in ``df`` replace any existing files for the same station and
+    year; other partitions are left untouched, so years can be added one
+    at a time.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partition_cols = list(partition_cols)
+    if 'year' in partition_cols and 'year' not in df.columns:
+        df = df.assign(year=pd.to_datetime(df[datetime_col]).dt.year)
+    df = df.astype({col: 'int64' if col == 'year' else 'string' for col in partition_cols})
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table,
+        Path(root),
+        format='parquet',
+        partitioning=_partitioning(partition_cols),
+        basename_template='part-{i}.parquet',
+        existing_data_behavior='delete_matching',
+    )
+
+
+def read_partitioned(root, stations: Optional[Sequence[str]] = None,
+                     years: Optional[Sequence[int]] = None, start=None, end=None,
+                     columns: Optional[Sequence[str]] = None,
+                     partition_cols: Sequence[str] = PARTITION_COLUMNS,
+                     datetime_col: str = 'datetime') -> pd.DataFrame:
+    """
+    Read a partitioned dataset, keeping only the requested stations, years and ``[start, end)`` window.
+
+    When only ``start``/``end`` are given, the years they span are also
+    used to prune ``year`` partitions. ``columns`` limits the columns read
+    (partition columns are always included).
+    """
+    import pyarrow.dataset as ds
+
+    partition_cols = list(partition_cols)
+    dataset = ds.dataset(Path(root), format='parquet', partitioning=_partitioning(partition_cols))
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    if years is None and 'year' in partition_cols and (start is not None or end is not None):
+        first_year = start.year if start is not None else None
+        last_year = end.year if end is not None else None
+    else:
+        first_year = last_year = None
+
+    conditions = []
+    if stations is not None:
+        conditions.append(ds.field('station').isin([str(s) for s in stations]))
+    if years is not None:
+        conditions.append(ds.field('year').isin([int(y) for y in years]))
+    if first_year is not None:
+        conditions.append(ds.field('year') >= first_year)
+    if last_year is not None:
+        conditions.append(ds.field('year') <= last_year)
+    if start is not None:
+        conditions.append(ds.field(datetime_col) >= start.to_pydatetime())
+    if end is not None:
+        conditions.append(ds.field(datetime_col) < end.to_pydatetime())
+
+    row_filter = None
+    for condition in conditions:
+        row_filter = condition if row_filter is None else row_filter & condition
+
+    if columns is not None:
+        columns = list(dict.fromkeys([*columns, *partition_cols]))
+    df = dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+    df = df.astype({col: object for col in partition_cols if col != 'year'})
+
+    # Identifier columns first, as in the single-file outputs
+    leading = [col for col in (datetime_col, *partition_cols) if col in df.columns]
+    return df[leading + [col for col in df.columns if col not in leading]]
+
+
+def list_partitions(root, partition_cols: Sequence[str] = PARTITION_COLUMNS) -> pd.DataFrame:
+    """Partition values present under ``root``, one row per partition directory."""
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(Path(root), format='parquet', partitioning=_partitioning(partition_cols))
+    records = [ds.get_partition_keys(fragment.partition_expression) for fragment in dataset.get_fragments()]
+    return pd.DataFrame(records, columns=list(partition_cols)).drop_duplicates().reset_index(drop=True)
@@ -0,0 +1,169 @@
+"""
+Grouped permutation importance on blocked time-series folds.
+
+For each fold the model is fitted once and its baseline test score is kept;
+every (group, repeat) then only re-predicts the test block with that
+group's columns permuted together (one shared row permutation, so the lags
+and rolling means of an index move as a unit and the group's internal
+structure is preserved). Repeats run on a thread pool; each (fold, group,
+repeat) draws its permutation from its own ``SeedSequence``, so results do
+not depend on the number of workers. Scores can be memoized on disk per
+data, groups and configuration.
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import TimeSeriesSplit
+
+
+CACHE_VERSION = 1
+
+# Suffixes added by the temporal feature builders (c_lag_1h, c_mean_6h, c_rolling_mean_6h, ...)
+TEMPORAL_SUFFIX = re.compile(r'(_(lag|mean|change|rolling|std))+_?\d+h?$')
+
+
+def temporal_base_name(column: str, pattern=TEMPORAL_SUFFIX) -> str:
+    """``column`` with every trailing temporal suffix removed (``ACI_mean_6h_lag_2h`` -> ``ACI``)."""
+    while True:
+        stripped = re.sub(pattern, '', column)
+        if stripped == column or not stripped:
+            return column
+        column = stripped
+
+
+def group_temporal_features(columns: Sequence[str], pattern=TEMPORAL_SUFFIX) -> Dict[str, List[str]]:
+    """Columns grouped by base name, so ``ACI``, ``ACI_lag_1h`` and ``ACI_mean_6h`` form one group ``ACI``."""
+    groups: Dict[str, List[str]] = {}
+    for column in columns:
+        groups.setdefault(temporal_base_name(column, pattern), []).append(column)
+    return groups
+
+
+def _score(scorer, model, X_test: np.ndarray, y_test: np.ndarray, y_pred: np.ndarray) -> float:
+    """Score ``model`` on one test block, from ``y_pred`` when the scorer only needs predicted labels."""
+    if scorer._response_method == 'predict':
+        return scorer._sign * scorer._score_func(y_test, y_pred, **scorer._kwargs)
+    return scorer(model, X_test, y_test)
+
+
+class GroupedPermutationImportance:
+    """
+    Drop in score when each feature group is permuted, per fold and repeat.
+
+    ``cv`` defaults to ``TimeSeriesSplit(n_splits)`` (train on the past,
+    test on the next block). After :meth:`fit`, ``baseline_scores_`` holds
+    one score per fold, ``baseline_predictions_`` the unpermuted test
+    predictions, and ``importances_`` a (group, fold, repeat) array of
+    score drops.
+    """
+
+    def __init__(self, model, groups: Dict[str, List[str]], n_repeats: int = 5, scoring: str = 'f1',
+                 cv=None, n_splits: int = 5, random_state: int = 42, n_jobs: Optional[int] = None,
+                 cache_dir=None):
+        self.model = model
+        self.groups = {name: list(columns) for name, columns in groups.items()}
+        self.n_repeats = n_repeats
+        self.scoring = scoring
+        self.cv = cv if cv is not None else TimeSeriesSplit(n_splits=n_splits)
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+    def _cache_path(self, X: pd.DataFrame, y: np.ndarray, folds) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+        digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+        for train, test in folds:
+            digest.update(np.asarray(train, dtype=np.int64).tobytes())
+            digest.update(np.asarray(test, dtype=np.int64).tobytes())
+        digest.update(json.dumps({
+            'columns': list(X.columns), 'groups': self.groups, 'n_repeats': self.n_repeats,
+            'scoring': self.scoring, 'random_state': self.random_state, 'model': repr(self.model),
+        }, sort_keys=True).encode())
+        return self.cache_dir / f"permutation_{digest.hexdigest()[:20]}.json"
+
+    def _seed(self, fold: int, group: int, repeat: int) -> np.random.Generator:
+        return np.random.default_rng(np.random.SeedSequence([self.random_state, fold, group, repeat]))
+
+    def fit(self, X: pd.DataFrame, y) -> "GroupedPermutationImportance":
+        y = np.asarray(y)
+        folds = [(np.asarray(train), np.asarray(test)) for train, test in self.cv.split(X, y)]
+        group_names = list(self.groups)
+        cache_path = self._cache_path(X, y, folds)
+
+        if cache_path is not None and cache_path.exists():
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached.get('version') == CACHE_VERSION:
+                self.group_names_ = cached['groups']
+                self.baseline_scores_ = np.array(cached['baseline_scores'])
+                self.baseline_predictions_ = None
+                self.importances_ = np.array(cached['importances'])
+                return self
+
+        values = X.to_numpy(dtype=np.float64)
+        positions = {col: i for i, col in enumerate(X.columns)}
+        group_cols = [np.array([positions[col] for col in self.groups[name]]) for name in group_names]
+        scorer = get_scorer(self.scoring)
+
+        # Fit once per fold and keep the baseline predictions and score
+        fitted = []
+        self.baseline_predictions_ = []
+        baseline_scores = []
+        for train, test in folds:
+            model = clone(self.model).fit(values[train], y[train])
+            fitted.append(model)
+            self.baseline_predictions_.append(model.predict(values[test]))
+            baseline_scores.append(_score(scorer, model, values[test], y[test], self.baseline_predictions_[-1]))
+        self.baseline_scores_ = np.array(baseline_scores)
+
+        def permuted_score(fold: int, g: int, repeat: int) -> float:
+            _, test = folds[fold]
+            X_test = values[test].copy()
+            order = self._seed(fold, g, repeat).permutation(len(test))
+            X_test[:, group_cols[g]] = X_test[order][:, group_cols[g]]
+            return scorer(fitted[fold], X_test, y[test])
+
+        jobs = [(fold, g, repeat) for fold in range(len(folds))
+                for g in range(len(group_names)) for repeat in range(self.n_repeats)]
+        # Prediction releases the GIL for tree ensembles, so threads share the fitted models
+        max_workers = os.cpu_count() if self.n_jobs in (None, -1) else self.n_jobs
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            scores = list(executor.map(lambda job: permuted_score(*job), jobs))
+
+        permuted = np.array(scores).reshape(len(folds), len(group_names), self.n_repeats)
+        self.group_names_ = group_names
+        self.importances_ = (self.baseline_scores_[:, None, None] - permuted).transpose(1, 0, 2)
+
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'w') as f:
+                json.dump({
+                    'version': CACHE_VERSION,
+                    'groups': group_names,
+                    'baseline_scores': self.baseline_scores_.tolist(),
+                    'importances': self.importances_.tolist(),
+                }, f)
+        return self
+
+    def summary(self) -> pd.DataFrame:
+        """Mean and standard deviation of the score drop per group (over folds and repeats), largest first."""
+        flat = self.importances_.reshape(len(self.group_names_), -1)
+        return pd.DataFrame({
+            'group': self.group_names_,
+            'n_features': [len(self.groups.get(name, [])) for name in self.group_names_],
+            'importance_mean': flat.mean(axis=1),
+            'importance_std': flat.std(axis=1),
+        }).sort_values('importance_mean', ascending=False, ignore_index=True)
@@ -0,0 +1,123 @@
+"""
+Streaming quantile sketches for chunked threshold estimation.
+
+A compact, mergeable t-digest style sketch: values are stored as weighted
+centroids, exact while the number of distinct values stays below
+``max_centroids`` (always the case for detection counts) and compressed
+with the t-digest arcsine scale function otherwise.
+"""
+
+from typing import Dict, Hashable, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch over a stream of numeric values."""
+
+    def __init__(self, max_centroids: int = 1000):
+        self.max_centroids = max_centroids
+        self.means = np.empty(0, dtype=float)
+        self.weights = np.empty(0, dtype=float)
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: Iterable[float]) -> "QuantileSketch":
+        """Add a chunk of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._absorb(values, np.ones(len(values)))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch into this one."""
+        if len(other.means):
+            self._absorb(other.means, other.weights)
+        return self
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+
+        # Collapse identical values first - this keeps discrete data exact
+        unique_means, inverse = np.unique(means, return_inverse=True)
+        unique_weights = np.bincount(inverse, weights=weights)
+
+        if len(unique_means) > self.max_centroids:
+            unique_means, unique_weights = self._compress(unique_means, unique_weights)
+
+        self.means, self.weights = unique_means, unique_weights
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Merge sorted centroids into buckets of equal width on the t-digest k1 scale."""
+        delta = self.max_centroids
+        q_left = (np.cumsum(weights) - weights) / weights.sum()
+        k = delta / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        bucket = np.floor(k - k[0]).astype(int)
+
+        bucket_weights = np.bincount(bucket, weights=weights)
+        bucket_means = np.bincount(bucket, weights=means * weights)
+        keep = bucket_weights > 0
+        return bucket_means[keep] / bucket_weights[keep], bucket_weights[keep]
+
+    def quantile(self, q):
+        """
+        Quantile(s) with pandas' default linear interpolation.
+
+        Matches ``pd.Series.quantile`` exactly while the sketch is uncompressed.
+        """
+        q_arr = np.atleast_1d(np.asarray(q, dtype=float))
+        if not len(self.means):
+            result = np.full(len(q_arr), np.nan)
+        else:
+            cumulative = np.cumsum(self.weights)
+            position = (cumulative[-1] - 1) * q_arr
+            lower = np.floor(position)
+            frac = position - lower
+
+            # Value at sorted position i is the centroid whose cumulative weight exceeds i
+            last = len(self.means) - 1
+            lower_idx = np.minimum(np.searchsorted(cumulative, lower, side='right'), last)
+            upper_idx = np.minimum(np.searchsorted(cumulative, lower + 1, side='right'), last)
+            result = self.means[lower_idx] + frac * (self.means[upper_idx] - self.means[lower_idx])
+
+        return float(result[0]) if np.ndim(q) == 0 else result
+
+
+class GroupedQuantileSketch:
+    """One :class:`QuantileSketch` per group key, updated chunk by chunk."""
+
+    def __init__(self, max_centroids: int = 1000):
+        self.max_centroids = max_centroids
+        self.sketches: Dict[Hashable, QuantileSketch] = {}
+
+    def update(self, keys: Sequence[Hashable], values: Iterable[float]) -> "GroupedQuantileSketch":
+        """Add values, routing each to the sketch of its group key."""
+        values = np.asarray(values, dtype=float)
+        codes, uniques = pd.factorize(pd.Index(keys))
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+
+        for block in np.split(order, boundaries):
+            # Rows with a missing key (code -1) have no group
+            if not len(block) or codes[block[0]] < 0:
+                continue
+            key = uniques[codes[block[0]]]
+            sketch = self.sketches.setdefault(key, QuantileSketch(self.max_centroids))
+            sketch.update(values[block])
+        return self
+
+    def quantiles(self, q: Sequence[float]) -> Dict[Hashable, np.ndarray]:
+        """Quantiles ``q`` for every group seen so far."""
+        return {key: sketch.quantile(np.asarray(q, dtype=float)) for key, sketch in self.sketches.items()}
+
+    def pooled(self) -> QuantileSketch:
+        """A sketch over all groups combined."""
+        pooled = QuantileSketch(self.max_centroids)
+        for sketch in self.sketches.values():
+            pooled.merge(sketch)
+        return pooled
@@ -0,0 +1,80 @@
+"""
+Batched Spearman correlation matrices over many row subsets.
+
+Columns are grouped by their missing-value pattern, so each group is ranked
+once per subset on its pairwise-complete rows and every correlation in the
+group comes out of a single matrix product. The values match
+``scipy.stats.spearmanr`` on each pair's complete rows.
+"""
+
+from itertools import product
+from typing import Dict, Hashable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+
+def _missing_pattern_groups(values: np.ndarray):
+    """Column indices grouped by identical NaN pattern, with each group's valid-row mask."""
+    missing = np.isnan(values)
+    if not missing.any():
+        return [(np.arange(values.shape[1]), np.ones(values.shape[0], dtype=bool))]
+    patterns, inverse = np.unique(missing.T, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    return [(np.flatnonzero(inverse == g), ~patterns[g]) for g in range(len(patterns))]
+
+
+def _centered_ranks(values: np.ndarray) -> np.ndarray:
+    """Average ranks per column, centered and scaled to unit norm (NaN for constant columns)."""
+    ranks = rankdata(values, axis=0)
+    ranks -= ranks.mean(axis=0)
+    norms = np.sqrt((ranks ** 2).sum(axis=0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ranks / np.where(norms > 0, norms, np.nan)
+
+
+def spearman_matrix(X: pd.DataFrame, Y: pd.DataFrame,
+                    strata: Optional[Mapping[Hashable, np.ndarray]] = None,
+                    min_samples: int = 11) -> Dict[Hashable, pd.DataFrame]:
+    """
+    Spearman correlation of every ``X`` column with every ``Y`` column, per stratum.
+
+    ``strata`` maps a name to a boolean row mask (default: all rows). Pairs
+    with fewer than ``min_samples`` complete rows in a stratum are NaN.
+    Returns one DataFrame per stratum, indexed by ``X`` columns with ``Y``
+    columns as columns.
+    """
+    X_values = X.to_numpy(dtype=float)
+    Y_values = Y.to_numpy(dtype=float)
+    if strata is None:
+        strata = {'all': np.ones(len(X), dtype=bool)}
+
+    x_groups = _missing_pattern_groups(X_values)
+    y_groups = _missing_pattern_groups(Y_values)
+
+    results = {}
+    for name, stratum in strata.items():
+        stratum = np.asarray(stratum, dtype=bool)
+        corr = np.full((X_values.shape[1], Y_values.shape[1]), np.nan)
+
+        for (x_cols, x_valid), (y_cols, y_valid) in product(x_groups, y_groups):
+            rows = stratum & x_valid & y_valid
+            if rows.sum() < min_samples:
+                continue
+            x_ranks = _centered_ranks(X_values[np.ix_(rows, x_cols)])
+            y_ranks = _centered_ranks(Y_values[np.ix_(rows, y_cols)])
+            corr[np.ix_(x_cols, y_cols)] = x_ranks.T @ y_ranks
+
+        results[name] = pd.DataFrame(corr, index=X.columns, columns=Y.columns)
+    return results
+
+
+def boolean_strata(df: pd.DataFrame, by: Sequence[str]) -> Dict[Hashable, np.ndarray]:
+    """Row masks for every observed combination of the ``by`` columns."""
+    masks = {}
+    for name, positions in df.groupby(list(by), sort=True, observed=True).indices.items():
+        mask = np.zeros(len(df), dtype=bool)
+        mask[positions] = True
+        masks[name] = mask
+    return masks
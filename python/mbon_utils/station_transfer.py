@@ -0,0 +1,171 @@
+"""
+Cross-station transfer evaluation.
+
+Trains one model per set of training stations and scores it on held-out
+stations, for any number of stations. Models are fitted on a process pool
+(one task per training split) and pickled to a cache keyed by the training
+data, stations, features and model configuration, so re-runs only fit new
+splits. Each model predicts all of its test stations in one batch and
+per-station metrics come from grouped confusion counts.
+"""
+
+import hashlib
+import json
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+
+SCHEMES = ('single', 'leave_one_out')
+
+DEFAULT_MODEL_CONFIG = {
+    'n_estimators': 50,
+    'max_depth': 6,
+    'random_state': 42,
+}
+
+
+def transfer_splits(stations: Sequence[str], scheme: str = 'single') -> List[Tuple[Tuple[str, ...], List[str]]]:
+    """
+    ``(train_stations, test_stations)`` pairs over ``stations``.
+
+    ``'single'`` trains on each station and tests on every other one;
+    ``'leave_one_out'`` trains on all stations but one and tests on it.
+    """
+    stations = list(stations)
+    if scheme == 'single':
+        return [((station,), [s for s in stations if s != station]) for station in stations]
+    if scheme == 'leave_one_out':
+        return [(tuple(s for s in stations if s != station), [station]) for station in stations]
+    raise ValueError(f"Unknown scheme '{scheme}'; expected one of {SCHEMES}")
+
+
+def map_splits(fit: Callable, splits: Sequence[Tuple[Tuple[str, ...], List[str]]],
+               max_workers: Optional[int] = None) -> Dict[Tuple[str, ...], object]:
+    """
+    ``{train_stations: fit(train_stations)}`` for every split, on a process pool.
+
+    ``fit`` must be picklable (a module-level function or a
+    ``functools.partial`` of one); use it for models that are not
+    scikit-learn estimators, such as probability surfaces.
+    """
+    train_sets = list(dict.fromkeys(tuple(train) for train, _ in splits))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        fitted = list(executor.map(fit, train_sets))
+    return dict(zip(train_sets, fitted))
+
+
+def _cache_key(X: np.ndarray, y: np.ndarray, train_stations: Tuple[str, ...],
+               features: List[str], config: Dict) -> str:
+    """Hash of the training data, stations, features and model configuration."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=float).tobytes())
+    digest.update(json.dumps({'stations': list(train_stations), 'features': features, **config},
+                             sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:32]
+
+
+def _fit_task(task: Dict):
+    """Process-pool entry point: load a cached model or fit and cache one."""
+    cache_file = task['cache_file']
+    if cache_file is not None and cache_file.exists():
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+
+    # n_jobs=1: parallelism comes from the process pool, one task per worker
+    model = make_pipeline(StandardScaler(), RandomForestClassifier(**task['config'], n_jobs=1))
+    model.fit(task['X'], task['y'])
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'wb') as f:
+            pickle.dump(model, f)
+    return model
+
+
+def grouped_binary_metrics(y_true, y_pred, groups) -> pd.DataFrame:
+    """Precision, recall and F1 of binary predictions within each group, from one pass of counts."""
+    codes, uniques = pd.factorize(np.asarray(groups), sort=True)
+    y_true = np.asarray(y_true).astype(bool)
+    y_pred = np.asarray(y_pred).astype(bool)
+    n_groups = len(uniques)
+
+    n = np.bincount(codes, minlength=n_groups)
+    tp = np.bincount(codes, weights=y_true & y_pred, minlength=n_groups)
+    predicted = np.bincount(codes, weights=y_pred, minlength=n_groups)
+    actual = np.bincount(codes, weights=y_true, minlength=n_groups)
+
+    precision = np.divide(tp, predicted, out=np.zeros(n_groups), where=predicted > 0)
+    recall = np.divide(tp, actual, out=np.zeros(n_groups), where=actual > 0)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros(n_groups), where=denom > 0)
+    return pd.DataFrame({'group': uniques, 'n': n, 'precision': precision, 'recall': recall, 'f1': f1})
+
+
+def evaluate_transfer(df: pd.DataFrame, features: List[str], target: str, station_col: str = 'station',
+                      scheme: str = 'single', stations: Optional[Sequence[str]] = None,
+                      config: Optional[Dict] = None, cache_dir: Optional[Path] = None,
+                      max_workers: Optional[int] = None, min_train: int = 200,
+                      min_test: int = 50) -> pd.DataFrame:
+    """
+    Transfer performance of a standardized random forest between stations.
+
+    ``stations`` defaults to every station in ``df``. Training sets with at
+    most ``min_train`` rows and test stations with at most ``min_test`` rows
+    are skipped. Returns one row per (training set, test station) with
+    ``train_stations`` (joined with ``+``), ``test_station``, ``n_train``,
+    ``n_test``, ``precision``, ``recall`` and ``f1``.
+    """
+    config = {**DEFAULT_MODEL_CONFIG, **(config or {})}
+    cache_dir = Path(cache_dir) if cache_dir is not None else None
+    features = list(features)
+
+    station_values = df[station_col].to_numpy()
+    if stations is None:
+        stations = sorted(pd.unique(station_values))
+    X = df[features].to_numpy(dtype=float)
+    y = df[target].to_numpy()
+
+    splits = []
+    tasks = []
+    for train_stations, test_stations in transfer_splits(stations, scheme):
+        train_rows = np.isin(station_values, train_stations)
+        if train_rows.sum() <= min_train:
+            continue
+        test_stations = [s for s in test_stations if (station_values == s).sum() > min_test]
+        if not test_stations:
+            continue
+
+        key = _cache_key(X[train_rows], y[train_rows], train_stations, features, config)
+        splits.append((train_stations, test_stations, int(train_rows.sum())))
+        tasks.append({
+            'X': X[train_rows],
+            'y': y[train_rows],
+            'config': config,
+            'cache_file': cache_dir / f"transfer_{key}.pkl" if cache_dir is not None else None,
+        })
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        models = list(executor.map(_fit_task, tasks))
+
+    frames = []
+    for (train_stations, test_stations, n_train), model in zip(splits, models):
+        # One prediction call covers every test station of this model
+        test_rows = np.isin(station_values, test_stations)
+        predictions = model.predict(X[test_rows])
+        metrics = grouped_binary_metrics(y[test_rows], predictions, station_values[test_rows])
+        metrics = metrics.rename(columns={'group': 'test_station', 'n': 'n_test'})
+        metrics.insert(0, 'n_train', n_train)
+        metrics.insert(0, 'train_stations', '+'.join(map(str, train_stations)))
+        frames.append(metrics)
+
+    columns = ['train_stations', 'n_train', 'test_station', 'n_test', 'precision', 'recall', 'f1']
+    return pd.concat(frames, ignore_index=True)[columns] if frames else pd.DataFrame(columns=columns)
@@ -0,0 +1,132 @@
+"""
+Grouped two-sample comparisons across strata.
+
+Compares rows where a binary split column is 1 against rows where it is 0
+(e.g. vessel present vs absent), for many value columns at once and within
+every combination of stratum columns (season, diel period, month, ...).
+Group sizes and means come from one ``groupby`` aggregation; Mann-Whitney U
+tests for every column and stratum come from a single within-stratum
+ranking, followed by Benjamini-Hochberg FDR correction.
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from statsmodels.stats.multitest import fdrcorrection
+
+
+def _stratum_codes(data: pd.DataFrame, by: List[str]):
+    """Integer stratum code per row and the matching stratum index."""
+    if not by:
+        return np.zeros(len(data), dtype=int), pd.Index(['all'], name='stratum')
+    grouped = data.groupby(by, sort=True, observed=True)
+    return grouped.ngroup().to_numpy(), grouped.size().index
+
+
+def _split_matrix(frame: pd.DataFrame, n_strata: int, split: int) -> np.ndarray:
+    """(stratum, column) matrix for one side of the split, from a (code, split) indexed frame."""
+    index = pd.MultiIndex.from_product([range(n_strata), [split]])
+    return frame.reindex(index).to_numpy(dtype=float)
+
+
+def stratum_summary(df: pd.DataFrame, value_cols: Sequence[str], split_col: str,
+                    by: Sequence[str]) -> pd.DataFrame:
+    """
+    Per-stratum split rate, group sizes and mean of the per-column means.
+
+    Columns: ``rate`` (share of rows with split 1), ``n_1``, ``n_0``,
+    ``mean_1`` and ``mean_0`` (NaN when a side of the split is empty).
+    """
+    grouped = df.groupby(list(by) + [split_col], sort=True, observed=True)
+    sizes = grouped.size().unstack(split_col).reindex(columns=[1, 0]).fillna(0)
+    means = grouped[list(value_cols)].mean().mean(axis=1).unstack(split_col).reindex(columns=[1, 0])
+
+    return pd.DataFrame({
+        'rate': sizes[1] / sizes.sum(axis=1),
+        'n_1': sizes[1].astype(int),
+        'n_0': sizes[0].astype(int),
+        'mean_1': means[1],
+        'mean_0': means[0],
+    })
+
+
+def compare_groups(df: pd.DataFrame, value_cols: Sequence[str], split_col: str,
+                   by: Optional[Sequence[str]] = None, min_samples: int = 11,
+                   alpha: float = 0.05) -> pd.DataFrame:
+    """
+    Two-sided Mann-Whitney U test of split 1 vs split 0 for every column in every stratum.
+
+    Matches ``scipy.stats.mannwhitneyu(x1, x0, alternative='two-sided')`` on
+    each column's non-missing values (asymptotic p-value with tie and
+    continuity correction). Tests with fewer than ``min_samples`` values on
+    either side are NaN and left out of the FDR correction. Returns one row
+    per stratum and column.
+    """
+    by = list(by) if by else []
+    value_cols = list(value_cols)
+    data = df[by + [split_col] + value_cols]
+    if by:
+        data = data.dropna(subset=by)
+    data = data[data[split_col].isin([0, 1])]
+
+    codes, strata = _stratum_codes(data, by)
+    split = data[split_col].to_numpy().astype(int)
+    values = data[value_cols].astype(float)
+
+    # Average ranks within each stratum; NaNs stay unranked, as with a per-column dropna
+    ranks = values.groupby(codes).rank()
+    rank_sums = ranks.groupby([codes, split]).sum()
+    counts = values.groupby([codes, split]).count()
+    means = values.groupby([codes, split]).mean()
+
+    n_strata = len(strata)
+    r_1 = _split_matrix(rank_sums, n_strata, 1)
+    n_1 = np.nan_to_num(_split_matrix(counts, n_strata, 1))
+    n_0 = np.nan_to_num(_split_matrix(counts, n_strata, 0))
+    n = n_1 + n_0
+
+    # Tie correction: sum of t^3 - t over runs of equal values per stratum and column
+    long_values = pd.DataFrame({
+        'stratum': np.repeat(codes, len(value_cols)),
+        'column': np.tile(np.arange(len(value_cols)), len(codes)),
+        'value': values.to_numpy().ravel(),
+    }).dropna()
+    tie_counts = long_values.groupby(['stratum', 'column', 'value']).size()
+    tie_sum = np.zeros((n_strata, len(value_cols)))
+    np.add.at(tie_sum, (tie_counts.index.get_level_values('stratum'), tie_counts.index.get_level_values('column')),
+              tie_counts.to_numpy(dtype=float) ** 3 - tie_counts.to_numpy(dtype=float))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        u_1 = r_1 - n_1 * (n_1 + 1) / 2
+        u = np.maximum(u_1, n_1 * n_0 - u_1)
+        mu = n_1 * n_0 / 2
+        sigma = np.sqrt(n_1 * n_0 / 12 * ((n + 1) - tie_sum / (n * (n - 1))))
+        z = (u - mu - 0.5) / sigma
+        # A column with a single repeated value has no spread to test (scipy returns NaN)
+        p_value = np.where(sigma > 0, np.clip(2 * norm.sf(z), 0, 1), np.nan)
+
+    testable = (n_1 >= min_samples) & (n_0 >= min_samples)
+    u_1[~testable] = np.nan
+    p_value[~testable] = np.nan
+
+    p_fdr = np.full(p_value.shape, np.nan)
+    significant = np.zeros(p_value.shape, dtype=bool)
+    tested = testable & ~np.isnan(p_value)
+    if tested.any():
+        significant[tested], p_fdr[tested] = fdrcorrection(p_value[tested], alpha=alpha)
+
+    results = pd.DataFrame({
+        'variable': np.tile(value_cols, n_strata),
+        'n_1': n_1.ravel().astype(int),
+        'n_0': n_0.ravel().astype(int),
+        'mean_1': _split_matrix(means, n_strata, 1).ravel(),
+        'mean_0': _split_matrix(means, n_strata, 0).ravel(),
+        'u_statistic': u_1.ravel(),
+        'p_value': p_value.ravel(),
+        'p_value_fdr': p_fdr.ravel(),
+        'significant': significant.ravel(),
+    })
+    stratum_frame = strata.repeat(len(value_cols)).to_frame(index=False)
+    return pd.concat([stratum_frame, results], axis=1)
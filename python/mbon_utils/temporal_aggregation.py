@@ -0,0 +1,119 @@
+"""
+Shared time-bin aggregation kernel.
+
+Every stage that brings a data stream to the analysis resolution (hourly
+indices, 20-minute temperature, hourly depth and SPL, 2-hour detections)
+floors timestamps to a bin and averages per station and bin. This module
+does that in one sorted pass for any bin width and several statistics at
+once: rows are ordered by (group, bin) so each bin is a contiguous run,
+and sums, counts, extremes and squared deviations come from
+``np.*.reduceat`` over the run boundaries. The result can be aligned to a
+target time grid (e.g. the detection timestamps) in the same call.
+"""
+
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+STATISTICS = ('mean', 'max', 'min', 'sum', 'count', 'std')
+
+
+def aggregate_bins(df: pd.DataFrame, value_cols: Sequence[str], freq: str = '2h',
+                   stats: Union[str, Sequence[str]] = 'mean', group_col: Optional[str] = 'station',
+                   time_col: str = 'datetime', grid=None) -> pd.DataFrame:
+    """
+    Statistics of ``value_cols`` per group and ``freq`` time bin, ignoring NaNs.
+
+    ``freq`` is any pandas offset alias (``'1h'``, ``'2h'``, ``'6h'``,
+    ``'1D'``). With a single statistic the output keeps the column names;
+    with a list of statistics columns are named ``<col>_<stat>``. ``std`` is
+    the sample standard deviation, as in pandas. Rows without a timestamp
+    (or group) are dropped. Use ``group_col=None`` for a single station.
+
+    ``grid`` aligns the result to target bins: a sequence of timestamps, or
+    with ``group_col`` a frame holding ``group_col`` and ``time_col``. The
+    output then has one row per grid row, in grid order, with NaN (0 for
+    ``count``) where a bin has no data.
+    """
+    single = isinstance(stats, str)
+    stats = [stats] if single else list(stats)
+    unknown = [stat for stat in stats if stat not in STATISTICS]
+    if unknown:
+        raise ValueError(f"Unknown statistics {unknown}; expected any of {STATISTICS}")
+    value_cols = list(value_cols)
+    key_cols = [group_col, time_col] if group_col is not None else [time_col]
+
+    bins = pd.to_datetime(df[time_col]).dt.floor(freq)
+    keep = bins.notna().to_numpy().copy()
+    if group_col is not None:
+        keep &= df[group_col].notna().to_numpy()
+    bins = bins.to_numpy()[keep]
+    values = df[value_cols].to_numpy(dtype=float)[keep]
+    if group_col is not None:
+        groups = df[group_col].to_numpy()[keep]
+        order = np.lexsort((bins, groups))
+        groups = groups[order]
+    else:
+        order = np.argsort(bins, kind='stable')
+    bins = bins[order]
+    values = values[order]
+
+    boundary = np.ones(len(order), dtype=bool)
+    boundary[1:] = bins[1:] != bins[:-1]
+    if group_col is not None:
+        boundary[1:] |= groups[1:] != groups[:-1]
+    starts = np.flatnonzero(boundary)
+
+    columns = {}
+    count_cols = [col if single else f"{col}_count" for col in value_cols] if 'count' in stats else []
+    if len(starts):
+        valid = ~np.isnan(values)
+        counts = np.add.reduceat(valid.astype(np.int64), starts, axis=0)
+        sums = np.add.reduceat(np.where(valid, values, 0), starts, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums / counts, np.nan)
+            for stat in stats:
+                if stat == 'mean':
+                    result = means
+                elif stat == 'sum':
+                    result = sums
+                elif stat == 'count':
+                    result = counts
+                elif stat == 'max':
+                    result = np.fmax.reduceat(values, starts, axis=0)
+                elif stat == 'min':
+                    result = np.fmin.reduceat(values, starts, axis=0)
+                else:
+                    # Two-pass variance: squared deviations from each bin's mean
+                    deviations = np.where(valid, values - np.repeat(means, np.diff(np.append(starts, len(order))), axis=0), 0)
+                    squares = np.add.reduceat(deviations ** 2, starts, axis=0)
+                    result = np.where(counts > 1, np.sqrt(squares / np.maximum(counts - 1, 1)), np.nan)
+                for i, col in enumerate(value_cols):
+                    columns[col if single else f"{col}_{stat}"] = result[:, i]
+    else:
+        for stat in stats:
+            for col in value_cols:
+                columns[col if single else f"{col}_{stat}"] = np.array([], dtype=np.int64 if stat == 'count' else float)
+
+    aggregated = pd.DataFrame(columns)
+    aggregated.insert(0, time_col, pd.to_datetime(bins[starts]))
+    if group_col is not None:
+        aggregated.insert(0, group_col, groups[starts])
+
+    if grid is None:
+        return aggregated
+
+    if isinstance(grid, pd.DataFrame):
+        target = grid[key_cols].reset_index(drop=True)
+    elif group_col is None:
+        target = pd.DataFrame({time_col: np.asarray(pd.to_datetime(grid))})
+    else:
+        raise ValueError(f"A grid for grouped data needs '{group_col}' and '{time_col}' columns")
+    target[time_col] = pd.to_datetime(target[time_col])
+    aggregated[time_col] = aggregated[time_col].astype(target[time_col].dtype)
+    aligned = target.merge(aggregated, on=key_cols, how='left')
+    if count_cols:
+        aligned[count_cols] = aligned[count_cols].fillna(0).astype(np.int64)
+    return aligned
@@ -0,0 +1,87 @@
+"""
+Block temporal features at native resolution.
+
+Lags, rolling means and changes are computed for many columns at once on a
+station-sorted (rows x columns) array: shifts are offsets into that array
+masked by each row's position within its station, and rolling means come
+from NaN-aware cumulative sums. Results match the per-station pandas
+``shift``/``rolling(min_periods=1)`` equivalents; aggregation to coarser
+bins is done with :mod:`mbon_utils.temporal_aggregation`.
+"""
+
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+LAG_STEPS = (1, 2, 3)
+ROLLING_WINDOWS = (3, 6, 12)
+CHANGE_STEPS = (2, 4)
+
+
+def _sorted_groups(df: pd.DataFrame, group_col: str, time_col: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    """``df`` sorted by group and time, with each row's position within its group."""
+    df = df.sort_values([group_col, time_col], kind='stable').reset_index(drop=True)
+    groups = df[group_col].to_numpy()
+    new_group = np.ones(len(df), dtype=bool)
+    new_group[1:] = groups[1:] != groups[:-1]
+    starts = np.flatnonzero(new_group)
+    group_start = np.repeat(starts, np.diff(np.append(starts, len(df))))
+    return df, np.arange(len(df)) - group_start
+
+
+def grouped_shift(values: np.ndarray, position: np.ndarray, step: int) -> np.ndarray:
+    """Values ``step`` rows earlier within the same group (NaN for the first ``step`` rows)."""
+    shifted = np.full(values.shape, np.nan)
+    if step < len(values):
+        shifted[step:] = values[:len(values) - step]
+    shifted[position < step] = np.nan
+    return shifted
+
+
+def grouped_rolling_mean(values: np.ndarray, position: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over up to ``window`` rows within each group, ignoring NaNs (``min_periods=1``)."""
+    valid = ~np.isnan(values)
+    sums = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(np.where(valid, values, 0), axis=0)])
+    counts = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(valid, axis=0)])
+
+    rows = np.arange(len(values))
+    start = rows - np.minimum(position, window - 1)
+    window_sum = sums[rows + 1] - sums[start]
+    window_count = counts[rows + 1] - counts[start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_count > 0, window_sum / window_count, np.nan)
+
+
+def native_temporal_features(df: pd.DataFrame, value_cols: Sequence[str], group_col: str = 'station',
+                             time_col: str = 'datetime', lags: Sequence[int] = LAG_STEPS,
+                             windows: Sequence[int] = ROLLING_WINDOWS,
+                             changes: Sequence[int] = CHANGE_STEPS) -> pd.DataFrame:
+    """
+    ``df`` sorted by group and time, with lag, rolling-mean and change columns for ``value_cols``.
+
+    For each column ``c`` adds ``c_lag_<k>h``, ``c_mean_<w>h`` and
+    ``c_change_<k>h`` (value minus the value ``k`` rows earlier), in that
+    order per column. Steps are in rows, i.e. hours for hourly data.
+    """
+    df, position = _sorted_groups(df, group_col, time_col)
+    value_cols = list(value_cols)
+    values = df[value_cols].to_numpy(dtype=float)
+
+    blocks = {}
+    for step in lags:
+        blocks[f"lag_{step}h"] = grouped_shift(values, position, step)
+    for window in windows:
+        blocks[f"mean_{window}h"] = grouped_rolling_mean(values, position, window)
+    for step in changes:
+        previous = blocks.get(f"lag_{step}h")
+        blocks[f"change_{step}h"] = values - (previous if previous is not None else grouped_shift(values, position, step))
+
+    # Interleave as c_lag_1h, c_lag_2h, ..., c_change_4h for each column in turn
+    names = list(blocks)
+    stacked = np.stack([blocks[name] for name in names], axis=2).reshape(len(df), -1)
+    feature_cols = [f"{col}_{name}" for col in value_cols for name in names]
+    features = pd.DataFrame(stacked, columns=feature_cols, index=df.index)
+    return pd.concat([df, features], axis=1)
+
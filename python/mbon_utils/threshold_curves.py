@@ -0,0 +1,168 @@
+"""
+Exact screening metrics at every decision threshold.
+
+Sorting the scores once and taking cumulative sums of the labels gives the
+true/false positive counts for every possible threshold, so precision,
+recall, F1, effort reduction and capture rate are exact rather than
+estimated. The same sorted sums answer both "flag everything scoring at
+least t" (thresholds) and "review the top x% of periods" (effort levels).
+
+Score matrices (one column per model or target) are sorted column-wise in
+one call, and grouped evaluation (e.g. per station) reuses that for each
+group's rows.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def _as_columns(values, n_columns: Optional[int] = None) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    if n_columns is not None and values.shape[1] == 1 and n_columns > 1:
+        values = np.repeat(values, n_columns, axis=1)
+    return values
+
+
+def _sorted_counts(scores: np.ndarray, labels: np.ndarray, activity: Optional[np.ndarray] = None):
+    """
+    Per column: scores in descending order with cumulative positives and activity.
+
+    Row ``k`` of the cumulative arrays is the total over the top ``k``
+    flagged samples. Activity defaults to the labels.
+    """
+    order = np.argsort(-scores, axis=0, kind='stable')
+    sorted_scores = np.take_along_axis(scores, order, axis=0)
+    zeros = np.zeros((1, scores.shape[1]))
+    cum_positives = np.vstack([zeros, np.cumsum(np.take_along_axis(labels, order, axis=0), axis=0)])
+    if activity is None:
+        return sorted_scores, cum_positives, cum_positives
+    cum_activity = np.vstack([zeros, np.cumsum(np.take_along_axis(activity, order, axis=0), axis=0)])
+    return sorted_scores, cum_positives, cum_activity
+
+
+def _metrics_frame(thresholds, n_flagged, true_pos, n_samples, n_positive,
+                   captured=None, total_activity=None) -> pd.DataFrame:
+    true_pos = np.asarray(true_pos, dtype=float)
+    n_flagged = np.asarray(n_flagged, dtype=float)
+    false_pos = n_flagged - true_pos
+    precision = np.divide(true_pos, n_flagged, out=np.zeros_like(true_pos), where=n_flagged > 0)
+    recall = true_pos / n_positive if n_positive > 0 else np.zeros_like(true_pos)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(denom), where=denom > 0)
+    if captured is None:
+        capture_rate = recall
+    else:
+        capture_rate = np.asarray(captured, dtype=float) / total_activity if total_activity > 0 else np.zeros_like(true_pos)
+
+    return pd.DataFrame({
+        'threshold': thresholds,
+        'n_flagged': n_flagged.astype(int),
+        'true_positives': true_pos.astype(int),
+        'false_positives': false_pos.astype(int),
+        'precision': precision,
+        'recall': recall,
+        'f1_score': f1,
+        'effort_reduction': 1 - n_flagged / n_samples if n_samples > 0 else np.zeros_like(n_flagged),
+        'detection_rate': recall,
+        'capture_rate': capture_rate,
+    })
+
+
+def threshold_curve(scores, labels, activity=None) -> pd.DataFrame:
+    """
+    Exact metrics at every distinct score, from the highest threshold down.
+
+    Row ``k`` flags every sample scoring at least its ``threshold``; the
+    last row flags everything.
+    """
+    frame = score_matrix_metrics(scores, labels, activity=activity)
+    return frame.drop(columns='curve')
+
+
+def metrics_at_effort(scores, labels, effort_levels: Sequence[float], activity=None) -> pd.DataFrame:
+    """
+    Exact metrics when the top ``int(n * effort)`` samples by score are reviewed.
+
+    Adds ``effort_level`` and ``lift`` (capture rate per unit effort); the
+    ``threshold`` column holds the lowest reviewed score (NaN if none).
+    """
+    frame = score_matrix_metrics(scores, labels, effort_levels=effort_levels, activity=activity)
+    return frame.drop(columns='curve')
+
+
+def score_matrix_metrics(scores, labels, thresholds: Optional[Sequence[float]] = None,
+                         effort_levels: Optional[Sequence[float]] = None, activity=None,
+                         names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Metrics for every column of a score matrix at thresholds or effort levels.
+
+    ``scores`` is (n_samples,) or (n_samples, n_curves); ``labels`` and
+    ``activity`` are either one column shared by every curve or one column
+    per curve. All columns are sorted in one call. With neither
+    ``thresholds`` nor ``effort_levels`` every distinct score of a column
+    is a threshold. Returns one row per curve and threshold (or effort
+    level) with a ``curve`` column holding ``names`` (default: column
+    position).
+    """
+    if thresholds is not None and effort_levels is not None:
+        raise ValueError("Pass at most one of thresholds or effort_levels")
+    scores = _as_columns(scores)
+    n_samples, n_curves = scores.shape
+    labels = _as_columns(labels, n_curves)
+    activity = _as_columns(activity, n_curves) if activity is not None else None
+    names = list(names) if names is not None else list(range(n_curves))
+    sorted_scores, cum_positives, cum_activity = _sorted_counts(scores, labels, activity)
+
+    frames = []
+    for j in range(n_curves):
+        if thresholds is not None:
+            cuts = np.asarray(thresholds, dtype=float)
+            # Number of scores >= t, via the ascending view of the negated descending scores
+            n_flagged = np.searchsorted(-sorted_scores[:, j], -cuts, side='right')
+            at = cuts
+        elif effort_levels is None:
+            # Last position of each run of tied scores: flagging stops between distinct scores
+            cut = np.append(np.flatnonzero(np.diff(sorted_scores[:, j]) != 0), n_samples - 1) if n_samples else np.array([], dtype=int)
+            n_flagged = cut + 1
+            at = sorted_scores[cut, j]
+        else:
+            efforts = np.asarray(effort_levels, dtype=float)
+            n_flagged = (n_samples * efforts).astype(int)
+            at = np.where(n_flagged > 0, sorted_scores[np.maximum(n_flagged - 1, 0), j], np.nan) if n_samples else np.full(len(efforts), np.nan)
+
+        frame = _metrics_frame(at, n_flagged, cum_positives[n_flagged, j], n_samples, cum_positives[-1, j],
+                               cum_activity[n_flagged, j], cum_activity[-1, j])
+        if effort_levels is not None:
+            frame.insert(0, 'effort_level', efforts)
+            frame['lift'] = np.divide(frame['capture_rate'].to_numpy(), efforts,
+                                      out=np.zeros_like(efforts), where=efforts > 0)
+        frame.insert(0, 'curve', names[j])
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def grouped_metrics(scores, labels, groups, thresholds: Optional[Sequence[float]] = None,
+                    effort_levels: Optional[Sequence[float]] = None, activity=None,
+                    names: Optional[Sequence[str]] = None, group_name: str = 'group') -> pd.DataFrame:
+    """
+    :func:`score_matrix_metrics` within each group (e.g. station) of the rows.
+
+    ``groups`` holds one group label per row; the result gains a
+    ``group_name`` column.
+    """
+    scores = _as_columns(scores)
+    labels = _as_columns(labels, scores.shape[1])
+    activity = _as_columns(activity, scores.shape[1]) if activity is not None else None
+    groups = pd.Series(np.asarray(groups))
+
+    frames = []
+    for group, rows in groups.groupby(groups, sort=True).indices.items():
+        frame = score_matrix_metrics(scores[rows], labels[rows], thresholds, effort_levels,
+                                     activity[rows] if activity is not None else None, names)
+        frame.insert(0, group_name, group)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -5,60 +5,16 @@ Parquet File Analysis Script
 This script analyzes all parquet files in the data/processed directory,
 extracts their column names, shapes, and basic statistics, then generates
 documentation for updating DATA-FILE-NAMING.md.
+
+File metadata comes from the Parquet footers (see mbon_utils.parquet_catalog)
+and is cached in data/processed/parquet_catalog.json, so files are not loaded.
 """
 
-import pandas as pd
 from pathlib import Path
 import sys
 from collections import defaultdict
 
-def analyze_parquet_file(file_path):
-    """Analyze a single parquet file and return metadata."""
-    try:
-        df = pd.read_parquet(file_path)
-        
-        # Basic info
-        info = {
-            'file_path': str(file_path),
-            'file_name': file_path.name,
-            'shape': df.shape,
-            'columns': list(df.columns),
-            'dtypes': df.dtypes.to_dict(),
-            'memory_usage': df.memory_usage(deep=True).sum(),
-            'missing_values': df.isnull().sum().to_dict(),
-        }
-        
-        # Date range if datetime column exists
-        datetime_cols = [col for col in df.columns if 'datetime' in col.lower() or 'date' in col.lower()]
-        if datetime_cols:
-            date_col = datetime_cols[0]
-            if pd.api.types.is_datetime64_any_dtype(df[date_col]):
-                info['date_range'] = {
-                    'start': df[date_col].min(),
-                    'end': df[date_col].max(),
-                    'column': date_col
-                }
-        
-        # Station info if station column exists
-        station_cols = [col for col in df.columns if 'station' in col.lower()]
-        if station_cols:
-            station_col = station_cols[0]
-            info['stations'] = sorted(df[station_col].unique().tolist())
-        
-        # Year info if year column exists
-        year_cols = [col for col in df.columns if 'year' in col.lower()]
-        if year_cols:
-            year_col = year_cols[0]
-            info['years'] = sorted(df[year_col].unique().tolist())
-            
-        return info
-        
-    except Exception as e:
-        return {
-            'file_path': str(file_path),
-            'file_name': file_path.name,
-            'error': str(e)
-        }
+from mbon_utils.parquet_catalog import build_catalog
 
 def categorize_columns(columns):
     """Categorize columns by type for better documentation."""
@@ -130,17 +86,22 @@ def main():
     print(f"Found {len(parquet_files)} parquet files")
     print("=" * 60)
     
-    # Analyze each file
+    # Catalog each file from its footer (unchanged files are reused from the saved catalog)
+    catalog_file = data_dir / "parquet_catalog.json"
+    catalog = build_catalog(parquet_files, catalog_path=catalog_file, root=data_dir)
+    
     file_info = {}
-    for file_path in sorted(parquet_files):
-        print(f"Analyzing: {file_path.name}")
-        info = analyze_parquet_file(file_path)
-        file_info[file_path.name] = info
+    for key, info in catalog.items():
+        print(f"Analyzing: {key}")
+        if 'error' not in info:
+            info['shape'] = (info['rows'], len(info['columns']))
+        file_info[info['file_name']] = info
         
         if 'error' in info:
             print(f"  ❌ Error: {info['error']}")
         else:
             print(f"  ✅ Shape: {info['shape']}, Columns: {len(info['columns'])}")
+    print(f"Catalog saved to: {catalog_file}")
     
     print("\n" + "=" * 60)
     print("DETAILED ANALYSIS")
@@ -177,10 +138,10 @@ def main():
         for filename, info in sorted(notebook_files[nb_num]):
             documentation.append(f"### `{filename}`")
             documentation.append(f"- **Shape**: {info['shape'][0]:,} rows × {info['shape'][1]} columns")
-            documentation.append(f"- **Size**: {info['memory_usage'] / 1024 / 1024:.1f} MB")
+            documentation.append(f"- **Size**: {info['uncompressed_size'] / 1024 / 1024:.1f} MB uncompressed ({info['file_size'] / 1024 / 1024:.1f} MB on disk)")
             
             if 'date_range' in info:
-                documentation.append(f"- **Date Range**: {info['date_range']['start'].strftime('%Y-%m-%d')} to {info['date_range']['end'].strftime('%Y-%m-%d')}")
+                documentation.append(f"- **Date Range**: {info['date_range']['start'][:10]} to {info['date_range']['end'][:10]}")
             
             if 'stations' in info:
                 documentation.append(f"- **Stations**: {info['stations']}")
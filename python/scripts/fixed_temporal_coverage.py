@@ -13,6 +13,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+from mbon_utils.coverage_index import CoverageIndex
+
 # Define constants
 STATIONS = ['9M', '14M', '37M']
 YEAR = 2021
@@ -71,7 +73,9 @@ print("\n" + "="*60)
 print("FIXED TEMPORAL COVERAGE ANALYSIS")
 print("="*60)
 
-# Create temporal coverage analysis with correct datetime handling
+# Create temporal coverage analysis with correct datetime handling.
+# Each stream's timestamps are compressed into run-length intervals.
+coverage_index = CoverageIndex()
 temporal_analysis = {}
 
 fig_temporal, axes_temporal = plt.subplots(len(STATIONS), 1, figsize=(15, 5*len(STATIONS)))
@@ -79,8 +83,6 @@ if len(STATIONS) == 1:
     axes_temporal = [axes_temporal]
 
 for i, station in enumerate(STATIONS):
-    coverage_data_list = []
-    
     print(f"\n--- Processing Station {station} ---")
     
     # 1. DETECTION DATA - Use only 'Date' column (has both date and time)
@@ -94,7 +96,7 @@ for i, station in enumerate(STATIONS):
             # The Date column already contains full datetime
             datetime_series = pd.to_datetime(df_det[date_col], errors='coerce')
             valid_dates = datetime_series.dropna()
-            coverage_data_list.extend([('Detections (2h)', dt) for dt in valid_dates])
+            coverage_index.add(station, 'Detections (2h)', valid_dates, '2h')
             print(f"  Detection dates: {len(valid_dates)}/{len(df_det)} parsed successfully")
             if len(valid_dates) > 0:
                 print(f"  Date range: {valid_dates.min()} to {valid_dates.max()}")
@@ -123,7 +125,7 @@ for i, station in enumerate(STATIONS):
             # Convert to Series and filter valid dates
             datetime_series = pd.Series(combined_datetimes)
             valid_dates = datetime_series.dropna()
-            coverage_data_list.extend([('SPL (1h)', dt) for dt in valid_dates])
+            coverage_index.add(station, 'SPL (1h)', valid_dates, '1h')
             print(f"  SPL dates: {len(valid_dates)}/{len(df_spl)} parsed successfully")
             if len(valid_dates) > 0:
                 print(f"  Date range: {valid_dates.min()} to {valid_dates.max()}")
@@ -134,7 +136,7 @@ for i, station in enumerate(STATIONS):
         if 'Date and time' in df_temp.columns:
             datetime_series = pd.to_datetime(df_temp['Date and time'], errors='coerce')
             valid_dates = datetime_series.dropna()
-            coverage_data_list.extend([('Temperature (20m)', dt) for dt in valid_dates])
+            coverage_index.add(station, 'Temperature (20m)', valid_dates, '20min')
             print(f"  Temperature dates: {len(valid_dates)}/{len(df_temp)} parsed successfully")
     
     # 4. DEPTH DATA - Use 'Date and time' column (already works fine)  
@@ -143,7 +145,7 @@ for i, station in enumerate(STATIONS):
         if 'Date and time' in df_depth.columns:
             datetime_series = pd.to_datetime(df_depth['Date and time'], errors='coerce')
             valid_dates = datetime_series.dropna()
-            coverage_data_list.extend([('Depth (1h)', dt) for dt in valid_dates])
+            coverage_index.add(station, 'Depth (1h)', valid_dates, '1h')
             print(f"  Depth dates: {len(valid_dates)}/{len(df_depth)} parsed successfully")
     
     # 5. INDICES DATA - Use 'Date' column (already works fine)
@@ -152,37 +154,27 @@ for i, station in enumerate(STATIONS):
         if 'Date' in df_idx.columns:
             datetime_series = pd.to_datetime(df_idx['Date'], errors='coerce')
             valid_dates = datetime_series.dropna()
-            coverage_data_list.extend([('Indices', dt) for dt in valid_dates])
+            coverage_index.add(station, 'Indices', valid_dates)
             print(f"  Indices dates: {len(valid_dates)}/{len(df_idx)} parsed successfully")
     
-    # Create timeline plot
-    if coverage_data_list:
-        coverage_df = pd.DataFrame(coverage_data_list, columns=['Data_Type', 'DateTime'])
-        
-        # Plot timeline
+    # Create timeline plot: one bar segment per continuous run of each stream
+    if station in coverage_index.stations:
         ax = axes_temporal[i]
-        colors = ['blue', 'green', 'red', 'orange', 'purple']
-        
-        for j, data_type in enumerate(coverage_df['Data_Type'].unique()):
-            subset = coverage_df[coverage_df['Data_Type'] == data_type]
-            ax.scatter(subset['DateTime'], [j] * len(subset), alpha=0.6, s=2, 
-                      color=colors[j % len(colors)], label=data_type)
-        
-        ax.set_yticks(range(len(coverage_df['Data_Type'].unique())))
-        ax.set_yticklabels(coverage_df['Data_Type'].unique())
+        coverage_index.plot(ax, station)
         ax.set_title(f'Station {station} - Temporal Coverage (Fixed)')
         ax.set_xlabel('Date')
         ax.grid(True, alpha=0.3)
-        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
         
         # Store analysis results
+        station_summary = coverage_index.summary().query("station == @station")
         temporal_analysis[station] = {
-            'data_types': len(coverage_df['Data_Type'].unique()),
-            'total_points': len(coverage_df),
-            'date_range': (coverage_df['DateTime'].min(), coverage_df['DateTime'].max())
+            'data_types': len(station_summary),
+            'total_points': int(station_summary['n_points'].sum()),
+            'date_range': (station_summary['first'].min(), station_summary['last'].max())
         }
         
-        print(f"  Total data points plotted: {len(coverage_df)}")
+        print(f"  Total data points: {temporal_analysis[station]['total_points']}")
+        print(f"  Continuous runs: {int(station_summary['n_runs'].sum())}")
 
 plt.tight_layout()
 plt.show()
@@ -200,6 +192,16 @@ for station, info in temporal_analysis.items():
     else:
         print(f"\n{station}: No valid temporal data found")
 
+print(f"\n{'='*60}")
+print("GAPS LONGER THAN 24 HOURS")
+print("="*60)
+print(coverage_index.gaps(min_hours=24).to_string(index=False))
+
+print(f"\n{'='*60}")
+print("WINDOWS WITH ALL DATA STREAMS AVAILABLE")
+print("="*60)
+print(coverage_index.overlap().to_string(index=False))
+
 print(f"\n{'='*60}")
 print("RECOMMENDATIONS FOR MARIMO NOTEBOOK")
 print("="*60)
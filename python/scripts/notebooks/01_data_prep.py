@@ -39,6 +39,10 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    from mbon_utils.acoustic_index_reader import load_index_table
+    from mbon_utils.band_matrix import band_matrix_is_current, has_band_column, write_band_matrix
+    from mbon_utils.coverage_index import CoverageIndex
+
     DATA_ROOT = project_root / "data"
     DATA_DIR = DATA_ROOT / "raw"  # Raw data directory
     OUTPUT_DIR = DATA_ROOT / "processed"  # Processed data output directory
@@ -49,12 +53,38 @@ def _():
     print(f"Raw data directory: {DATA_DIR}")
     print(f"Output directory: {OUTPUT_DIR}")
     print(f"Analysis year: {YEAR}")
-    return DATA_DIR, OUTPUT_DIR, STATIONS, YEAR, mo, np, pd, plt, sns
+    return (
+        CoverageIndex,
+        DATA_DIR,
+        OUTPUT_DIR,
+        STATIONS,
+        YEAR,
+        band_matrix_is_current,
+        has_band_column,
+        load_index_table,
+        mo,
+        np,
+        pd,
+        plt,
+        sns,
+        write_band_matrix,
+    )
 
 
 @app.cell(hide_code=True)
-def _(DATA_DIR, STATIONS, YEAR, pd):
-    # Load acoustic indices (FullBW version)
+def _(
+    DATA_DIR,
+    OUTPUT_DIR,
+    STATIONS,
+    YEAR,
+    band_matrix_is_current,
+    has_band_column,
+    load_index_table,
+    write_band_matrix,
+):
+    # Load acoustic indices (FullBW version). Each CSV is streamed once into a
+    # float32 Parquet cache (Filename and ACI_by_band dropped) and read from there.
+    # ACI_by_band is parsed separately into a (time x band) matrix under aci_bands/.
     indices_data = {}
     indices_info = {}
 
@@ -63,8 +93,13 @@ def _(DATA_DIR, STATIONS, YEAR, pd):
         print(file_path_idx)
 
         if file_path_idx.exists():
-            df_idx = pd.read_csv(file_path_idx)
+            df_idx = load_index_table(file_path_idx, OUTPUT_DIR / "indices_cache")
             indices_data[station_idx] = df_idx
+            if not has_band_column(file_path_idx):
+                print(f"  ACI by band: no ACI_by_band column, skipping band matrix")
+            elif not band_matrix_is_current(file_path_idx, OUTPUT_DIR / "aci_bands", station_idx):
+                band_header = write_band_matrix(file_path_idx, OUTPUT_DIR / "aci_bands", station_idx)
+                print(f"  ACI by band: {band_header['n_rows']} rows x {band_header['n_bands']} bands")
             indices_info[station_idx] = {
                 'rows': len(df_idx),
                 'columns': len(df_idx.columns),
@@ -430,6 +465,8 @@ def _(mo):
 
 @app.cell(hide_code=True)
 def _(
+    CoverageIndex,
+    OUTPUT_DIR,
     STATIONS,
     depth_data,
     detection_data,
@@ -439,7 +476,9 @@ def _(
     spl_data,
     temp_data,
 ):
-    # Analyze temporal coverage - convert datetime columns and assess coverage
+    # Analyze temporal coverage - convert datetime columns and assess coverage.
+    # Each stream's timestamps are compressed into run-length intervals.
+    coverage_index = CoverageIndex()
     temporal_analysis = {}
 
     fig_temporal, axes_temporal = plt.subplots(len(STATIONS), 1, figsize=(12, 4*len(STATIONS)))
@@ -447,8 +486,6 @@ def _(
         axes_temporal = [axes_temporal]
 
     for i, station_temporal in enumerate(STATIONS):
-        coverage_data_list = []
-
         # Detection data (2-hour intervals) - Use only Date column (contains full datetime)
         if station_temporal in detection_data:
             df_temporal_det = detection_data[station_temporal]
@@ -456,21 +493,21 @@ def _(
             date_col_temporal = 'Date' if 'Date' in df_temporal_det.columns else 'Date '
             if date_col_temporal in df_temporal_det.columns:
                 df_temporal_det['datetime'] = pd.to_datetime(df_temporal_det[date_col_temporal], errors='coerce')
-                coverage_data_list.extend([('Detections (2h)', dt) for dt in df_temporal_det['datetime'].dropna()])
+                coverage_index.add(station_temporal, 'Detections (2h)', df_temporal_det['datetime'], '2h')
 
         # Temperature data (20-min intervals) 
         if station_temporal in temp_data:
             df_temporal_temp = temp_data[station_temporal]
             if 'Date and time' in df_temporal_temp.columns:
                 df_temporal_temp['datetime'] = pd.to_datetime(df_temporal_temp['Date and time'], errors='coerce')
-                coverage_data_list.extend([('Temperature (20m)', dt) for dt in df_temporal_temp['datetime'].dropna()])
+                coverage_index.add(station_temporal, 'Temperature (20m)', df_temporal_temp['datetime'], '20min')
 
         # Depth data (1-hour intervals)
         if station_temporal in depth_data:
             df_temporal_depth = depth_data[station_temporal]
             if 'Date and time' in df_temporal_depth.columns:
                 df_temporal_depth['datetime'] = pd.to_datetime(df_temporal_depth['Date and time'], errors='coerce')
-                coverage_data_list.extend([('Depth (1h)', dt) for dt in df_temporal_depth['datetime'].dropna()])
+                coverage_index.add(station_temporal, 'Depth (1h)', df_temporal_depth['datetime'], '1h')
 
         # SPL data (1-hour intervals) - Properly combine Date and Time columns
         if station_temporal in spl_data:
@@ -497,7 +534,7 @@ def _(
 
                     datetime_series_temporal = pd.Series(combined_datetimes_temporal)
                     valid_dates_temporal = datetime_series_temporal.dropna()
-                    coverage_data_list.extend([('SPL (1h)', dt) for dt in valid_dates_temporal])
+                    coverage_index.add(station_temporal, 'SPL (1h)', valid_dates_temporal, '1h')
                 except Exception as e:
                     print(f"Warning: Could not parse SPL datetime for station {station_temporal}: {e}")
 
@@ -513,29 +550,22 @@ def _(
 
             if datetime_col_temporal:
                 df_temporal_idx['datetime'] = pd.to_datetime(df_temporal_idx[datetime_col_temporal], errors='coerce')
-                coverage_data_list.extend([('Indices', dt) for dt in df_temporal_idx['datetime'].dropna()])
-
-        if coverage_data_list:
-            # Create timeline plot
-            coverage_df_temporal = pd.DataFrame(coverage_data_list, columns=['Data_Type', 'DateTime'])
+                coverage_index.add(station_temporal, 'Indices', df_temporal_idx['datetime'])
 
-            # Plot timeline
+        if station_temporal in coverage_index.stations:
+            # Plot timeline: one bar segment per continuous run of each stream
             ax_temporal = axes_temporal[i]
-            for j, data_type in enumerate(coverage_df_temporal['Data_Type'].unique()):
-                subset_temporal = coverage_df_temporal[coverage_df_temporal['Data_Type'] == data_type]
-                ax_temporal.scatter(subset_temporal['DateTime'], [j] * len(subset_temporal), alpha=0.6, s=1)
-
-            ax_temporal.set_yticks(range(len(coverage_df_temporal['Data_Type'].unique())))
-            ax_temporal.set_yticklabels(coverage_df_temporal['Data_Type'].unique())
+            coverage_index.plot(ax_temporal, station_temporal)
             ax_temporal.set_title(f'Station {station_temporal} - Temporal Coverage')
             ax_temporal.set_xlabel('Date')
             ax_temporal.grid(True, alpha=0.3)
 
             # Store analysis results
+            summary_temporal = coverage_index.summary().query("station == @station_temporal")
             temporal_analysis[station_temporal] = {
-                'data_types': len(coverage_df_temporal['Data_Type'].unique()),
-                'total_points': len(coverage_df_temporal),
-                'date_range': (coverage_df_temporal['DateTime'].min(), coverage_df_temporal['DateTime'].max())
+                'data_types': len(summary_temporal),
+                'total_points': int(summary_temporal['n_points'].sum()),
+                'date_range': (summary_temporal['first'].min(), summary_temporal['last'].max())
             }
 
     plt.tight_layout()
@@ -547,6 +577,16 @@ def _(
             print(f"{station_temp_summary}: {info_temporal['data_types']} data types, "
                   f"{info_temporal['total_points']} total points, "
                   f"Range: {info_temporal['date_range'][0].date()} to {info_temporal['date_range'][1].date()}")
+
+    gaps_temporal = coverage_index.gaps(min_hours=24)
+    print(f"\nGaps longer than 24 hours: {len(gaps_temporal)}")
+    if len(gaps_temporal) > 0:
+        print(gaps_temporal.to_string(index=False))
+
+    # Save the interval index for the quality report and dashboard views
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    coverage_index.intervals.to_parquet(OUTPUT_DIR / "01_coverage_intervals.parquet", index=False)
+    print(f"Saved {len(coverage_index.intervals)} coverage intervals to {OUTPUT_DIR / '01_coverage_intervals.parquet'}")
     return
 
 
@@ -227,7 +227,7 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(AGGREGATION_HOURS, STATIONS, data_loaded, np, pd, time_grids):
+def _(AGGREGATION_HOURS, STATIONS, aggregate_bins, data_loaded, np, pd, time_grids):
     # Aggregate acoustic indices from hourly to 2-hour means
     indices_aggregated = {}
 
@@ -248,17 +248,11 @@ def _(AGGREGATION_HOURS, STATIONS, data_loaded, np, pd, time_grids):
                 # Get numeric columns (indices)
                 numeric_cols_idx = df_idx_agg.select_dtypes(include=[np.number]).columns.tolist()
 
-                # Create aggregation groups (2-hour windows)
-                df_idx_agg['datetime_2h'] = df_idx_agg['datetime'].dt.floor(f'{AGGREGATION_HOURS}h')
-
-                # Aggregate numeric columns by taking the mean
-                agg_dict_idx = {col: 'mean' for col in numeric_cols_idx}
-                df_idx_grouped = df_idx_agg.groupby('datetime_2h').agg(agg_dict_idx).reset_index()
-                df_idx_grouped.rename(columns={'datetime_2h': 'datetime'}, inplace=True)
-
-                # Align to detection time grid
-                df_idx_aligned = pd.DataFrame({'datetime': time_grids[station_agg_idx]})
-                df_idx_aligned = df_idx_aligned.merge(df_idx_grouped, on='datetime', how='left')
+                # Mean of each index per 2-hour window, aligned to the detection time grid
+                df_idx_aligned = aggregate_bins(
+                    df_idx_agg, numeric_cols_idx, f'{AGGREGATION_HOURS}h',
+                    group_col=None, grid=time_grids[station_agg_idx]
+                )
 
                 indices_aggregated[station_agg_idx] = df_idx_aligned
 
@@ -287,7 +281,7 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(AGGREGATION_HOURS, STATIONS, data_loaded, pd, time_grids):
+def _(AGGREGATION_HOURS, STATIONS, aggregate_bins, data_loaded, pd, time_grids):
     # Aggregate temperature data (20-min to 2-hour)
     temperature_aggregated = {}
 
@@ -298,18 +292,11 @@ def _(AGGREGATION_HOURS, STATIONS, data_loaded, pd, time_grids):
             if 'datetime' in df_temp_agg.columns and 'Water temp (°C)' in df_temp_agg.columns:
                 df_temp_agg['datetime'] = pd.to_datetime(df_temp_agg['datetime'])
 
-                # Create 2-hour windows
-                df_temp_agg['datetime_2h'] = df_temp_agg['datetime'].dt.floor(f'{AGGREGATION_HOURS}h')
-
-                # Aggregate by taking mean
-                df_temp_grouped = df_temp_agg.groupby('datetime_2h').agg({
-                    'Water temp (°C)': 'mean'
-                }).reset_index()
-                df_temp_grouped.rename(columns={'datetime_2h': 'datetime'}, inplace=True)
-
-                # Align to detection time grid
-                df_temp_aligned = pd.DataFrame({'datetime': time_grids[station_agg_temp]})
-                df_temp_aligned = df_temp_aligned.merge(df_temp_grouped, on='datetime', how='left')
+                # Mean per 2-hour window, aligned to the detection time grid
+                df_temp_aligned = aggregate_bins(
+                    df_temp_agg, ['Water temp (°C)'], f'{AGGREGATION_HOURS}h',
+                    group_col=None, grid=time_grids[station_agg_temp]
+                )
 
                 # Forward fill small gaps (up to 3 intervals = 6 hours)
                 df_temp_aligned['Water temp (°C)'] = df_temp_aligned['Water temp (°C)'].ffill(limit=3)
@@ -322,7 +309,7 @@ def _(AGGREGATION_HOURS, STATIONS, data_loaded, pd, time_grids):
 
 
 @app.cell(hide_code=True)
-def _(AGGREGATION_HOURS, STATIONS, data_loaded, pd, time_grids):
+def _(AGGREGATION_HOURS, STATIONS, aggregate_bins, data_loaded, pd, time_grids):
     # Aggregate depth data (1-hour to 2-hour)
     depth_aggregated = {}
 
@@ -333,18 +320,11 @@ def _(AGGREGATION_HOURS, STATIONS, data_loaded, pd, time_grids):
             if 'datetime' in df_depth_agg.columns and 'Water depth (m)' in df_depth_agg.columns:
                 df_depth_agg['datetime'] = pd.to_datetime(df_depth_agg['datetime'])
 
-                # Create 2-hour windows
-                df_depth_agg['datetime_2h'] = df_depth_agg['datetime'].dt.floor(f'{AGGREGATION_HOURS}h')
-
-                # Aggregate by taking mean
-                df_depth_grouped = df_depth_agg.groupby('datetime_2h').agg({
-                    'Water depth (m)': 'mean'
-                }).reset_index()
-                df_depth_grouped.rename(columns={'datetime_2h': 'datetime'}, inplace=True)
-
-                # Align to detection time grid
-                df_depth_aligned = pd.DataFrame({'datetime': time_grids[station_agg_depth]})
-                df_depth_aligned = df_depth_aligned.merge(df_depth_grouped, on='datetime', how='left')
+                # Mean per 2-hour window, aligned to the detection time grid
+                df_depth_aligned = aggregate_bins(
+                    df_depth_agg, ['Water depth (m)'], f'{AGGREGATION_HOURS}h',
+                    group_col=None, grid=time_grids[station_agg_depth]
+                )
 
                 # Forward fill small gaps
                 df_depth_aligned['Water depth (m)'] = df_depth_aligned['Water depth (m)'].ffill(limit=3)
@@ -371,7 +351,7 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(AGGREGATION_HOURS, STATIONS, data_loaded, pd, time_grids):
+def _(AGGREGATION_HOURS, STATIONS, aggregate_bins, data_loaded, pd, time_grids):
     # Aggregate SPL data (1-hour to 2-hour)
     spl_aggregated = {}
 
@@ -389,22 +369,17 @@ def _(AGGREGATION_HOURS, STATIONS, data_loaded, pd, time_grids):
                 spl_cols = ['Broadband (1-40000 Hz)', 'Low (50-1200 Hz)', 'High (7000-40000 Hz)']
                 available_spl_cols = [col_spl for col_spl in spl_cols if col_spl in df_spl_agg.columns]
 
-                # Create 2-hour windows
-                df_spl_agg['datetime_2h'] = df_spl_agg['datetime'].dt.floor(f'{AGGREGATION_HOURS}h')
-
-                # Aggregate by taking mean (SPL in dB should be averaged on linear scale, but for simplicity using arithmetic mean)
-                agg_dict_spl = {col_spl: 'mean' for col_spl in available_spl_cols}
-                df_spl_grouped = df_spl_agg.groupby('datetime_2h').agg(agg_dict_spl).reset_index()
-                df_spl_grouped.rename(columns={'datetime_2h': 'datetime'}, inplace=True)
-
                 # Ensure time grid is also timezone-naive
                 time_grid_spl = time_grids[station_agg_spl].copy()
                 if time_grid_spl.dt.tz is not None:
                     time_grid_spl = time_grid_spl.dt.tz_convert(None)
 
-                # Align to detection time grid
-                df_spl_aligned = pd.DataFrame({'datetime': time_grid_spl})
-                df_spl_aligned = df_spl_aligned.merge(df_spl_grouped, on='datetime', how='left')
+                # Mean per 2-hour window, aligned to the detection time grid
+                # (SPL in dB should be averaged on linear scale, but for simplicity using arithmetic mean)
+                df_spl_aligned = aggregate_bins(
+                    df_spl_agg, available_spl_cols, f'{AGGREGATION_HOURS}h',
+                    group_col=None, grid=time_grid_spl
+                )
 
                 # Forward fill small gaps
                 for col_spl_fill in available_spl_cols:
@@ -1097,9 +1072,11 @@ def _(mo):
 
 
 @app.cell
-def _(OUTPUT_DIR, YEAR, enhanced_data, pd):
+def _(OUTPUT_DIR, YEAR, enhanced_data, pd, write_partitioned):
     # Save the aligned and enhanced datasets
     saved_files_final = []
+    # Same tables, also written as station=/year= partitioned datasets for filtered reads
+    partitioned_outputs = {}
 
     # Also create and save a combined dataset with all stations
     if enhanced_data:
@@ -1147,6 +1124,7 @@ def _(OUTPUT_DIR, YEAR, enhanced_data, pd):
                 acoustic_path = OUTPUT_DIR / f"02_acoustic_indices_aligned_{YEAR}.parquet"
                 acoustic_df.to_parquet(acoustic_path, index=False)
                 saved_files_final.append(str(acoustic_path))
+                partitioned_outputs['02_acoustic_indices_aligned'] = acoustic_df
                 print(f"✓ Saved acoustic indices: {acoustic_path}")
                 print(f"  Shape: {acoustic_df.shape} ({len(available_acoustic)} indices)")
             except Exception as e:
@@ -1167,6 +1145,7 @@ def _(OUTPUT_DIR, YEAR, enhanced_data, pd):
                 detection_path_aligned = OUTPUT_DIR / f"02_detections_aligned_{YEAR}.parquet"
                 detection_df.to_parquet(detection_path_aligned, index=False)
                 saved_files_final.append(str(detection_path_aligned))
+                partitioned_outputs['02_detections_aligned'] = detection_df
                 print(f"✓ Saved detections: {detection_path_aligned}")
                 print(f"  Shape: {detection_df.shape} ({len(available_detection)} species/types)")
             except Exception as e:
@@ -1188,6 +1167,7 @@ def _(OUTPUT_DIR, YEAR, enhanced_data, pd):
                 env_path = OUTPUT_DIR / f"02_environmental_aligned_{YEAR}.parquet"
                 env_df.to_parquet(env_path, index=False)
                 saved_files_final.append(str(env_path))
+                partitioned_outputs['02_environmental_aligned'] = env_df
                 print(f"✓ Saved environmental data: {env_path}")
                 print(f"  Shape: {env_df.shape} ({len(available_env)} variables)")
             except Exception as e:
@@ -1216,6 +1196,7 @@ def _(OUTPUT_DIR, YEAR, enhanced_data, pd):
                 bio_path = OUTPUT_DIR / f"02_biological_activity_features_{YEAR}.parquet"
                 bio_df.to_parquet(bio_path, index=False)
                 saved_files_final.append(str(bio_path))
+                partitioned_outputs['02_biological_activity_features'] = bio_df
                 print(f"✓ Saved biological activity features: {bio_path}")
                 print(f"  Shape: {bio_df.shape} ({len(available_biological)} features)")
                 print(f"  Includes: community metrics + lag variables + species-specific lags")
@@ -1233,11 +1214,19 @@ def _(OUTPUT_DIR, YEAR, enhanced_data, pd):
                 temporal_path = OUTPUT_DIR / f"02_temporal_features_{YEAR}.parquet"
                 temporal_df.to_parquet(temporal_path, index=False)
                 saved_files_final.append(str(temporal_path))
+                partitioned_outputs['02_temporal_features'] = temporal_df
                 print(f"✓ Saved temporal features: {temporal_path}")
                 print(f"  Shape: {temporal_df.shape} ({len(available_temporal)} features)")
             except Exception as e:
                 print(f"✗ Error saving temporal features: {e}")
 
+    for dataset_name, dataset_df in partitioned_outputs.items():
+        try:
+            write_partitioned(dataset_df, OUTPUT_DIR / dataset_name)
+            print(f"✓ Saved partitioned dataset: {OUTPUT_DIR / dataset_name} (station=/year=)")
+        except Exception as e:
+            print(f"✗ Error saving partitioned dataset {dataset_name}: {e}")
+
     print(f"\n✅ Successfully saved {len(saved_files_final)} files")
     return
 
@@ -1318,6 +1307,9 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    from mbon_utils.partitioned_dataset import write_partitioned
+    from mbon_utils.temporal_aggregation import aggregate_bins
+
     DATA_ROOT = project_root / "data"
 
     # Configuration variables
@@ -1340,10 +1332,12 @@ def _():
         OUTPUT_DIR,
         STATIONS,
         YEAR,
+        aggregate_bins,
         mo,
         np,
         pd,
         plt,
+        write_partitioned,
     )
 
 
@@ -64,6 +64,8 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    from mbon_utils.partitioned_dataset import write_partitioned
+
     # Data directories
     DATA_ROOT = project_root / "data"
     data_dir = DATA_ROOT / "processed"
@@ -86,6 +88,7 @@ def _():
         squareform,
         stats,
         variance_inflation_factor,
+        write_partitioned,
     )
 
 
@@ -1469,6 +1472,7 @@ def _(
     selected_indices,
     selection_rationale,
     summary_results,
+    write_partitioned,
 ):
     # Save the reduced dataset and analysis results
     output_data_dir = DATA_ROOT / "processed"
@@ -1502,6 +1506,10 @@ def _(
         print(f"  Columns: {len(selected_indices)} indices + 3 identifiers")
         print(f"  Datetime dtype: {reduced_with_ids['datetime'].dtype}")
 
+        # Partitioned copy (station=/year=) for per-station and per-year reads
+        write_partitioned(reduced_with_ids, output_data_dir / "03_reduced_acoustic_indices")
+        print(f"  Partitioned dataset: {output_data_dir / '03_reduced_acoustic_indices'}")
+
         # Verify the hours are what we expect
         unique_hours = np.unique(reduced_with_ids['datetime'].dt.hour)
         print(f"  Unique hours: {unique_hours}")
@@ -44,6 +44,8 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    from mbon_utils.partitioned_dataset import read_partitioned
+
     DATA_ROOT = project_root / "data"
 
     # Set up plotting
@@ -52,7 +54,7 @@ def _():
 
     print("Libraries loaded successfully")
     print(f"Data root: {DATA_ROOT}")
-    return DATA_ROOT, np, pd, plt, sns
+    return DATA_ROOT, np, pd, plt, read_partitioned, sns
 
 
 @app.cell(hide_code=True)
@@ -68,18 +70,21 @@ def _(DATA_ROOT):
 
 
 @app.cell(hide_code=True)
-def _(data_dir_proc, pd):
+def _(data_dir_proc, pd, read_partitioned):
     # Load the datasets
     print("Loading datasets...")
 
+    # Analysis year: only these partitions of the station=/year= datasets are read
+    analysis_years = [2021]
+
     # Load acoustic indices (reduced set from Notebook 3)
-    df_indices_reduced = pd.read_parquet(data_dir_proc / "03_reduced_acoustic_indices.parquet")
+    df_indices_reduced = read_partitioned(data_dir_proc / "03_reduced_acoustic_indices", years=analysis_years)
 
     # Load manual fish detection data
-    df_detections = pd.read_parquet(data_dir_proc / "02_detections_aligned_2021.parquet")
+    df_detections = read_partitioned(data_dir_proc / "02_detections_aligned", years=analysis_years)
 
     # Load environmental data
-    df_env = pd.read_parquet(data_dir_proc / "02_environmental_aligned_2021.parquet")
+    df_env = read_partitioned(data_dir_proc / "02_environmental_aligned", years=analysis_years)
 
     print(f"Acoustic indices: {df_indices_reduced.shape}")
     print(f"Manual detections: {df_detections.shape}")  
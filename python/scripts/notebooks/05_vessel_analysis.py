@@ -45,7 +45,7 @@ def _():
     warnings.filterwarnings('ignore')
 
     # Machine learning
-    from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+    from sklearn.model_selection import train_test_split, StratifiedKFold
     from sklearn.linear_model import LogisticRegression
     from sklearn.tree import DecisionTreeClassifier
     from sklearn.ensemble import RandomForestClassifier
@@ -54,11 +54,10 @@ def _():
         classification_report, confusion_matrix, roc_curve, auc,
         precision_recall_curve, accuracy_score, cohen_kappa_score
     )
-    from sklearn.feature_selection import mutual_info_classif
 
     # Statistical analysis
     from scipy import stats
-    from scipy.stats import mannwhitneyu, chi2_contingency
+    from scipy.stats import chi2_contingency
 
     # Set plotting style
     plt.style.use('default')
@@ -70,6 +69,12 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    from mbon_utils.fold_scaling import FoldScaledMatrix
+    from mbon_utils.mutual_information import MutualInfoScorer
+    from mbon_utils.partitioned_dataset import read_partitioned
+    from mbon_utils.rank_correlation import boolean_strata, spearman_matrix
+    from mbon_utils.stratified_comparison import compare_groups, stratum_summary
+
     # Data directories
     DATA_ROOT = project_root / "data"
     data_dir = DATA_ROOT / "processed"
@@ -82,26 +87,30 @@ def _():
     return (
         DATA_ROOT,
         DecisionTreeClassifier,
+        FoldScaledMatrix,
         LogisticRegression,
+        MutualInfoScorer,
         RandomForestClassifier,
         StandardScaler,
         StratifiedKFold,
         accuracy_score,
         auc,
+        boolean_strata,
         classification_report,
         cohen_kappa_score,
+        compare_groups,
         confusion_matrix,
-        cross_val_score,
         json,
-        mannwhitneyu,
-        mutual_info_classif,
         np,
         pd,
         plot_dir,
         plt,
+        read_partitioned,
         roc_curve,
         sns,
+        spearman_matrix,
         stats,
+        stratum_summary,
         train_test_split,
     )
 
@@ -123,18 +132,21 @@ def _(mo):
 
 
 @app.cell
-def _(DATA_ROOT, pd):
+def _(DATA_ROOT, pd, read_partitioned):
+    # Analysis year: only these partitions of the station=/year= datasets are read
+    analysis_years = [2021]
+
     # Load reduced acoustic indices from Notebook 3
-    df_indices_reduced = pd.read_parquet(DATA_ROOT / "processed/03_reduced_acoustic_indices.parquet")
+    df_indices_reduced = read_partitioned(DATA_ROOT / "processed/03_reduced_acoustic_indices", years=analysis_years)
 
     # Load aligned detections (includes vessel presence)
-    df_detections_aligned = pd.read_parquet(DATA_ROOT / "processed/02_detections_aligned_2021.parquet")
+    df_detections_aligned = read_partitioned(DATA_ROOT / "processed/02_detections_aligned", years=analysis_years)
 
     # Load environmental data
-    df_env_aligned = pd.read_parquet(DATA_ROOT / "processed/02_environmental_aligned_2021.parquet")
+    df_env_aligned = read_partitioned(DATA_ROOT / "processed/02_environmental_aligned", years=analysis_years)
 
     # Load temporal features
-    df_temporal = pd.read_parquet(DATA_ROOT / "processed/02_temporal_features_2021.parquet")
+    df_temporal = read_partitioned(DATA_ROOT / "processed/02_temporal_features", years=analysis_years)
 
     # Load detection column metadata to identify vessel column
     df_det_metadata = pd.read_parquet(DATA_ROOT / "processed/metadata/01_detection_columns.parquet")
@@ -265,7 +277,9 @@ def _(mo):
 def _(
     DATA_ROOT,
     DecisionTreeClassifier,
+    FoldScaledMatrix,
     LogisticRegression,
+    MutualInfoScorer,
     RandomForestClassifier,
     StandardScaler,
     StratifiedKFold,
@@ -273,10 +287,8 @@ def _(
     classification_report,
     cohen_kappa_score,
     confusion_matrix,
-    cross_val_score,
     df_full_final,
     index_cols,
-    mutual_info_classif,
     pd,
     train_test_split,
 ):
@@ -290,14 +302,16 @@ def _(
     print(f"Vessel detection modeling data shape: {X_vessel.shape}")
     print(f"Class balance - No vessel: {(y_vessel == 0).sum()}, Vessel: {(y_vessel == 1).sum()}")
 
-    # Standardize features
-    scaler_vessel = StandardScaler()
-    X_vessel_scaled = scaler_vessel.fit_transform(X_vessel)
-
-    # Split data (stratified to maintain class balance)
+    # Split data (stratified to maintain class balance), then standardize on the training rows
     X_train_v, X_test_v, y_train_v, y_test_v = train_test_split(
-        X_vessel_scaled, y_vessel, test_size=0.3, random_state=42, stratify=y_vessel
+        X_vessel, y_vessel, test_size=0.3, random_state=42, stratify=y_vessel
     )
+    scaler_vessel = StandardScaler()
+    X_train_v = scaler_vessel.fit_transform(X_train_v)
+    X_test_v = scaler_vessel.transform(X_test_v)
+
+    # Cross-validation folds are standardized on their own training rows
+    vessel_folds = FoldScaledMatrix(X_vessel, y_vessel, StratifiedKFold(5))
 
     # Train multiple classifiers
     vessel_models = {
@@ -321,7 +335,7 @@ def _(
         kappa = cohen_kappa_score(y_test_v, y_pred_v)
 
         # Cross-validation
-        cv_scores = cross_val_score(model, X_vessel_scaled, y_vessel, cv=StratifiedKFold(5), scoring='accuracy')
+        cv_scores = vessel_folds.cross_val_score(model, scoring='accuracy')
 
         vessel_results[model_name] = {
             'model': model,
@@ -340,8 +354,10 @@ def _(
         print(f"  Kappa: {kappa:.3f}")
         print(f"  CV Accuracy: {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
 
-    # Feature importance analysis (using mutual information)
-    mi_scores = mutual_info_classif(X_vessel_scaled, y_vessel, random_state=42)
+    # Feature importance analysis (using mutual information, cached across runs)
+    mi_scorer = MutualInfoScorer(vessel_folds.scaled(), index_cols, random_state=42,
+                                 cache_dir=DATA_ROOT / "processed/mi_cache")
+    mi_scores = mi_scorer.score(y_vessel)
     mi_importance = pd.DataFrame({
         'index': index_cols,
         'importance': mi_scores
@@ -447,7 +463,16 @@ def _(mo):
 
 
 @app.cell
-def _(DATA_ROOT, df_full_final, fish_cols, index_cols, np, pd, stats):
+def _(
+    DATA_ROOT,
+    boolean_strata,
+    df_full_final,
+    fish_cols,
+    index_cols,
+    np,
+    pd,
+    spearman_matrix,
+):
     # Separate data into vessel and non-vessel periods
     df_vessel_periods = df_full_final[df_full_final['vessel_present'] == 1].copy()
     df_no_vessel_periods = df_full_final[df_full_final['vessel_present'] == 0].copy()
@@ -456,29 +481,35 @@ def _(DATA_ROOT, df_full_final, fish_cols, index_cols, np, pd, stats):
     print(f"Non-vessel periods: {len(df_no_vessel_periods)} samples")
     print(f"Ratio: {len(df_no_vessel_periods) / len(df_full_final):.1%} of data is vessel-free")
 
-    # Calculate correlations between indices and fish for different subsets
-    correlation_results = {}
-
-    for subset_name_corr, df_subset_corr in [('All Data', df_full_final),
-                                    ('Vessel Periods', df_vessel_periods),
-                                    ('Non-Vessel Periods', df_no_vessel_periods)]:
-
-        # Calculate correlations for each fish species
-        correlations_dict = {}
-        for fish_sp_corr in fish_cols:
-            if fish_sp_corr in df_subset_corr.columns:
-                corr_values_list = []
-                for index_name_corr in index_cols:
-                    # Remove NaN values for correlation
-                    valid_data_corr = df_subset_corr[[index_name_corr, fish_sp_corr]].dropna()
-                    if len(valid_data_corr) > 10:  # Minimum samples for correlation
-                        corr_val, p_value_corr = stats.spearmanr(valid_data_corr[index_name_corr], valid_data_corr[fish_sp_corr])
-                        corr_values_list.append(corr_val)
-                    else:
-                        corr_values_list.append(np.nan)
-                correlations_dict[fish_sp_corr] = corr_values_list
-
-        correlation_results[subset_name_corr] = pd.DataFrame(correlations_dict, index=index_cols)
+    # Calculate correlations between indices and fish for different subsets.
+    # Each subset is a row mask; columns are ranked once per subset and every
+    # index-species pair (on its pairwise-complete rows, min 11 samples) comes
+    # out of one matrix product
+    fish_cols_corr = [fish_sp_corr for fish_sp_corr in fish_cols if fish_sp_corr in df_full_final.columns]
+    vessel_flag = df_full_final['vessel_present'].to_numpy()
+    correlation_results = spearman_matrix(
+        df_full_final[index_cols],
+        df_full_final[fish_cols_corr],
+        strata={
+            'All Data': np.ones(len(df_full_final), dtype=bool),
+            'Vessel Periods': vessel_flag == 1,
+            'Non-Vessel Periods': vessel_flag == 0,
+        }
+    )
+
+    # The same pass scales to any stratification - here season x vessel presence
+    seasonal_vessel_correlations = spearman_matrix(
+        df_full_final[index_cols],
+        df_full_final[fish_cols_corr],
+        strata=boolean_strata(df_full_final, ['season', 'vessel_present'])
+    )
+    seasonal_vessel_corr_df = pd.concat(
+        {
+            (season_key, 'Vessel' if vessel_key == 1 else 'Non-Vessel'): np.abs(corr_df_season).mean()
+            for (season_key, vessel_key), corr_df_season in seasonal_vessel_correlations.items()
+        },
+        names=['season', 'vessel_status', 'species']
+    ).unstack('species')
 
     # Calculate improvement in correlation when vessels removed
     correlation_improvement = correlation_results['Non-Vessel Periods'] - correlation_results['All Data']
@@ -502,6 +533,12 @@ def _(DATA_ROOT, df_full_final, fish_cols, index_cols, np, pd, stats):
         corr_df_save.to_parquet(DATA_ROOT / "processed" / filename)
 
     correlation_improvement.to_parquet(DATA_ROOT / "processed/05_correlation_improvement.parquet")
+
+    print("\nMean Absolute Correlations by Season and Vessel Presence:")
+    print(seasonal_vessel_corr_df.mean(axis=1).unstack('vessel_status').round(3))
+    seasonal_vessel_corr_df.reset_index().to_parquet(
+        DATA_ROOT / "processed/05_correlations_by_season_vessel.parquet"
+    )
     return (
         correlation_improvement,
         correlation_results,
@@ -589,80 +626,37 @@ def _(mo):
 
 
 @app.cell
-def _(df_full_final, fish_cols, np, pd):
-    # Analyze vessel impacts by different temporal strata
+def _(DATA_ROOT, compare_groups, df_full_final, fish_cols, pd, stratum_summary):
+    # Analyze vessel impacts by different temporal strata (season, diel period, month).
+    # Each stratification is one groupby over [stratum, vessel_present], plus Mann-Whitney
+    # tests for every species in every stratum from shared within-stratum ranks (FDR-corrected)
     temporal_analysis = {}
-
-    # 1. Seasonal Analysis
-    seasonal_vessel_correlation = {}
-    for season_name in df_full_final['season'].unique():
-        season_data = df_full_final[df_full_final['season'] == season_name]
-        vessel_rate = season_data['vessel_present'].mean()
-
-        # Calculate correlation difference for this season
-        season_vessel = season_data[season_data['vessel_present'] == 1]
-        season_no_vessel = season_data[season_data['vessel_present'] == 0]
-
-        # Mean fish activity
-        mean_fish_vessel = season_vessel[fish_cols].mean().mean()
-        mean_fish_no_vessel = season_no_vessel[fish_cols].mean().mean()
-
-        seasonal_vessel_correlation[season_name] = {
-            'vessel_rate': vessel_rate,
-            'n_vessel': len(season_vessel),
-            'n_no_vessel': len(season_no_vessel),
-            'mean_fish_activity_vessel': mean_fish_vessel,
-            'mean_fish_activity_no_vessel': mean_fish_no_vessel,
-            'activity_difference': mean_fish_no_vessel - mean_fish_vessel
-        }
-
-    temporal_analysis['seasonal'] = pd.DataFrame(seasonal_vessel_correlation).T
-
-    # 2. Diel Period Analysis
-    diel_vessel_correlation = {}
-    for period_name in df_full_final['diel_period'].unique():
-        period_data = df_full_final[df_full_final['diel_period'] == period_name]
-        vessel_rate_period = period_data['vessel_present'].mean()
-
-        period_vessel = period_data[period_data['vessel_present'] == 1]
-        period_no_vessel = period_data[period_data['vessel_present'] == 0]
-
-        mean_fish_vessel_period = period_vessel[fish_cols].mean().mean()
-        mean_fish_no_vessel_period = period_no_vessel[fish_cols].mean().mean()
-
-        diel_vessel_correlation[period_name] = {
-            'vessel_rate': vessel_rate_period,
-            'n_vessel': len(period_vessel),
-            'n_no_vessel': len(period_no_vessel),
-            'mean_fish_activity_vessel': mean_fish_vessel_period,
-            'mean_fish_activity_no_vessel': mean_fish_no_vessel_period,
-            'activity_difference': mean_fish_no_vessel_period - mean_fish_vessel_period
-        }
-
-    temporal_analysis['diel'] = pd.DataFrame(diel_vessel_correlation).T
-
-    # 3. Monthly Analysis
-    monthly_vessel_correlation = {}
-    for month_num in sorted(df_full_final['month'].unique()):
-        month_data = df_full_final[df_full_final['month'] == month_num]
-        vessel_rate_month = month_data['vessel_present'].mean()
-
-        month_vessel = month_data[month_data['vessel_present'] == 1]
-        month_no_vessel = month_data[month_data['vessel_present'] == 0]
-
-        mean_fish_vessel_month = month_vessel[fish_cols].mean().mean() if len(month_vessel) > 0 else np.nan
-        mean_fish_no_vessel_month = month_no_vessel[fish_cols].mean().mean() if len(month_no_vessel) > 0 else np.nan
-
-        monthly_vessel_correlation[month_num] = {
-            'vessel_rate': vessel_rate_month,
-            'n_vessel': len(month_vessel),
-            'n_no_vessel': len(month_no_vessel),
-            'mean_fish_activity_vessel': mean_fish_vessel_month,
-            'mean_fish_activity_no_vessel': mean_fish_no_vessel_month,
-            'activity_difference': mean_fish_no_vessel_month - mean_fish_vessel_month if not np.isnan(mean_fish_vessel_month) else np.nan
-        }
-
-    temporal_analysis['monthly'] = pd.DataFrame(monthly_vessel_correlation).T
+    _species_tests = []
+
+    for _analysis_name, _stratum_col in [('seasonal', 'season'), ('diel', 'diel_period'), ('monthly', 'month')]:
+        _stratum_table = stratum_summary(df_full_final, fish_cols, 'vessel_present', [_stratum_col]).rename(columns={
+            'rate': 'vessel_rate',
+            'n_1': 'n_vessel',
+            'n_0': 'n_no_vessel',
+            'mean_1': 'mean_fish_activity_vessel',
+            'mean_0': 'mean_fish_activity_no_vessel'
+        })
+        _stratum_table['activity_difference'] = (
+            _stratum_table['mean_fish_activity_no_vessel'] - _stratum_table['mean_fish_activity_vessel']
+        )
+
+        _stratum_tests = compare_groups(df_full_final, fish_cols, 'vessel_present', by=[_stratum_col])
+        _stratum_table['n_species_significant'] = _stratum_tests.groupby(_stratum_col)['significant'].sum()
+        temporal_analysis[_analysis_name] = _stratum_table
+
+        _species_tests.append(
+            _stratum_tests.rename(columns={_stratum_col: 'stratum', 'variable': 'species'})
+            .assign(stratification=_stratum_col, stratum=lambda tests: tests['stratum'].astype(str))
+        )
+
+    pd.concat(_species_tests, ignore_index=True).to_parquet(
+        DATA_ROOT / "processed/05_vessel_species_tests_by_stratum.parquet"
+    )
 
     # 4. Identify optimal monitoring windows (low vessel, high biological activity)
     df_full_final['total_fish_activity'] = df_full_final[fish_cols].sum(axis=1)
@@ -684,10 +678,10 @@ def _(df_full_final, fish_cols, np, pd):
 
     print("Temporal Stratification Results:")
     print("\n1. Seasonal Patterns - Fish Activity in Vessel vs Non-Vessel Periods:")
-    print(temporal_analysis['seasonal'][['vessel_rate', 'activity_difference']])
+    print(temporal_analysis['seasonal'][['vessel_rate', 'activity_difference', 'n_species_significant']])
 
     print("\n2. Diel Period Patterns - Fish Activity in Vessel vs Non-Vessel Periods:")
-    print(temporal_analysis['diel'][['vessel_rate', 'activity_difference']])
+    print(temporal_analysis['diel'][['vessel_rate', 'activity_difference', 'n_species_significant']])
 
     print("\n3. Top 5 Optimal Monitoring Windows (High Signal-to-Noise):")
     print(optimal_windows[['month', 'hour', 'vessel_present', 'total_fish_activity', 'signal_to_noise']].head())
@@ -934,39 +928,23 @@ def _(mo):
 
 
 @app.cell
-def _(
-    DATA_ROOT,
-    df_no_vessel_periods,
-    df_vessel_periods,
-    fish_cols,
-    mannwhitneyu,
-    pd,
-    plot_dir,
-    plt,
-):
-    # Calculate species-specific differences between vessel/non-vessel periods
-    species_impacts = []
-
-    for fish_species in fish_cols:
-        # Get calling activity with and without vessels
-        vessel_activity = df_vessel_periods[fish_species].dropna()
-        no_vessel_activity = df_no_vessel_periods[fish_species].dropna()
-
-        if len(vessel_activity) > 10 and len(no_vessel_activity) > 10:
-            # Statistical test for difference
-            u_stat, p_value_species = mannwhitneyu(vessel_activity, no_vessel_activity, alternative='two-sided')
-
-            species_impacts.append({
-                'species': fish_species,
-                'mean_activity_vessel': vessel_activity.mean(),
-                'mean_activity_no_vessel': no_vessel_activity.mean(),
-                'activity_difference': vessel_activity.mean() - no_vessel_activity.mean(),
-                'percent_change': (vessel_activity.mean() - no_vessel_activity.mean()) / (no_vessel_activity.mean() + 0.001) * 100,
-                'p_value': p_value_species,
-                'significant': p_value_species < 0.05
-            })
-
-    df_species_impacts_final = pd.DataFrame(species_impacts)
+def _(DATA_ROOT, compare_groups, df_full_final, fish_cols, plot_dir, plt):
+    # Calculate species-specific differences between vessel/non-vessel periods:
+    # Mann-Whitney tests for all species at once, FDR-corrected across species
+    species_tests = compare_groups(df_full_final, fish_cols, 'vessel_present')
+    species_tests = species_tests[(species_tests['n_1'] > 10) & (species_tests['n_0'] > 10)]
+
+    df_species_impacts_final = species_tests.rename(columns={
+        'variable': 'species',
+        'mean_1': 'mean_activity_vessel',
+        'mean_0': 'mean_activity_no_vessel'
+    })[['species', 'mean_activity_vessel', 'mean_activity_no_vessel', 'p_value', 'p_value_fdr', 'significant']]
+    df_species_impacts_final['activity_difference'] = (
+        df_species_impacts_final['mean_activity_vessel'] - df_species_impacts_final['mean_activity_no_vessel']
+    )
+    df_species_impacts_final['percent_change'] = (
+        df_species_impacts_final['activity_difference'] / (df_species_impacts_final['mean_activity_no_vessel'] + 0.001) * 100
+    )
     df_species_impacts_final = df_species_impacts_final.sort_values('percent_change')
 
     # Species difference visualization
@@ -84,16 +84,6 @@ def _():
     )
     from sklearn.feature_selection import mutual_info_classif, SelectKBest
 
-    # Enhanced feature selection (Transue methodology)
-    try:
-        from boruta import BorutaPy
-        BORUTA_AVAILABLE = True
-        print("✅ Boruta package available - enhanced feature selection enabled")
-    except ImportError:
-        BORUTA_AVAILABLE = False
-        print("⚠️ Boruta package not available - install with: pip install boruta")
-        print("   Falling back to mutual information + random forest importance only")
-
     # Statistical analysis and post-hoc testing
     from scipy import stats
     from scipy.stats import spearmanr, pearsonr
@@ -115,6 +105,9 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    # Enhanced feature selection (Transue methodology) - built-in multi-target Boruta
+    from mbon_utils.boruta import MultiTargetBoruta
+
     # Data directories
     DATA_ROOT = project_root / "data"
     data_dir = DATA_ROOT / "processed"
@@ -125,11 +118,10 @@ def _():
     print(f"Data root: {DATA_ROOT}")
     print(f"Plot directory: {plot_dir}")
     return (
-        BORUTA_AVAILABLE,
-        BorutaPy,
         DATA_ROOT,
         DecisionTreeClassifier,
         LogisticRegression,
+        MultiTargetBoruta,
         RandomForestClassifier,
         StandardScaler,
         StratifiedKFold,
@@ -336,8 +328,7 @@ def _(mo):
 
 @app.cell
 def _(
-    BORUTA_AVAILABLE,
-    BorutaPy,
+    MultiTargetBoruta,
     RandomForestClassifier,
     StandardScaler,
     df_community,
@@ -374,6 +365,25 @@ def _(
     # Initialize results storage
     comparative_feature_results = {}
 
+    # Boruta runs once for all targets: every target is evaluated against the same
+    # shadow-feature matrix per iteration, forests are fitted in parallel with
+    # per-iteration seeds, and targets stop as soon as all features are decided
+    boruta_targets = [t for t in target_cols if df_modeling[t].std() > 0]
+    boruta_selector = None
+    boruta_error = None
+    try:
+        print("\nRunning multi-target Boruta feature selection (Transue et al. 2023 parameters)...")
+        boruta_selector = MultiTargetBoruta(
+            n_estimators='auto',
+            max_depth=8,
+            random_state=42,
+            max_iter=100,  # Limit iterations to prevent long runtime
+            n_jobs=-1  # Use all cores for faster processing
+        ).fit(X_scaled, df_modeling[boruta_targets])
+        print(f"Boruta iterations per target: {boruta_selector.n_iter_}")
+    except Exception as e:
+        boruta_error = e
+    
     # =====================================================================
     # COMPARATIVE FEATURE SELECTION FOR EACH TARGET
     # =====================================================================
@@ -429,110 +439,69 @@ def _(
         }
 
         # -------------------------------------------------------------
-        # METHOD 2: BORUTA FEATURE SELECTION (if available)
+        # METHOD 2: BORUTA FEATURE SELECTION
         # -------------------------------------------------------------
-        if BORUTA_AVAILABLE:
-            print(f"\n2. BORUTA + RANDOM FOREST FEATURE SELECTION")
-            print("-" * 50)
-            print("Following Transue et al. (2023) methodology...")
-
-            # Initialize Random Forest for Boruta (matching Transue parameters)
-            rf_selector = RandomForestClassifier(
-                n_estimators=100, 
-                max_depth=8,
-                random_state=42,
-                n_jobs=-1  # Use all cores for faster processing
-            )
-
-            # Initialize Boruta
-            boruta_selector = BorutaPy(
-                rf_selector,
-                n_estimators='auto',
-                verbose=0,  # Reduce output
-                random_state=42,
-                max_iter=100  # Limit iterations to prevent long runtime
-            )
-
-            try:
-                # Fit Boruta
-                print("Running Boruta feature selection (this may take a moment)...")
-                boruta_selector.fit(X_scaled, y_target)
-
-                # Extract results
-                selected_features = np.array(modeling_cols)[boruta_selector.support_]
-                tentative_features = np.array(modeling_cols)[boruta_selector.support_weak_]
-                rejected_features = np.array(modeling_cols)[~boruta_selector.support_ & ~boruta_selector.support_weak_]
-
-                # Create Boruta results dataframe
-                boruta_results = pd.DataFrame({
-                    'feature': modeling_cols,
-                    'boruta_ranking': boruta_selector.ranking_,
-                    'boruta_decision': ['confirmed' if boruta_selector.support_[i] else 
-                                       'tentative' if boruta_selector.support_weak_[i] else 
-                                       'rejected' for i in range(len(modeling_cols))],
-                    'feature_type': ['acoustic_index' if col in index_cols else 
-                                   'environmental' if col in ['Water temp (°C)', 'Water depth (m)'] else 
-                                   'temporal' for col in modeling_cols]
-                }).sort_values('boruta_ranking')
-
-                print(f"Boruta Results:")
-                print(f"  ✅ Confirmed features: {len(selected_features)} ({list(selected_features)})")
-                print(f"  ❓ Tentative features: {len(tentative_features)} ({list(tentative_features)})")
-                print(f"  ❌ Rejected features: {len(rejected_features)}")
-
-                # Get Random Forest feature importance from the final model
-                rf_final = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=42)
-                rf_final.fit(X_scaled, y_target)
-                rf_importance = rf_final.feature_importances_
-
-                boruta_results['rf_importance'] = rf_importance
-
-                current_target_results['boruta'] = {
-                    'rankings': boruta_results,
-                    'confirmed_features': list(selected_features),
-                    'tentative_features': list(tentative_features),
-                    'rejected_features': list(rejected_features),
-                    'n_confirmed': len(selected_features),
-                    'best_acoustic_index': boruta_results[
-                        (boruta_results['feature_type'] == 'acoustic_index') &
-                        (boruta_results['boruta_decision'] == 'confirmed')
-                    ]['feature'].iloc[0] if len(selected_features) > 0 else None
-                }
+        print(f"\n2. BORUTA + RANDOM FOREST FEATURE SELECTION")
+        print("-" * 50)
+        print("Following Transue et al. (2023) methodology...")
+
+        try:
+            if boruta_selector is None:
+                raise boruta_error
+
+            # Extract results
+            support_mask = boruta_selector.support_[current_target_name]
+            weak_mask = boruta_selector.support_weak_[current_target_name]
+            selected_features = np.array(modeling_cols)[support_mask]
+            tentative_features = np.array(modeling_cols)[weak_mask]
+            rejected_features = np.array(modeling_cols)[~support_mask & ~weak_mask]
+
+            # Create Boruta results dataframe
+            boruta_results = pd.DataFrame({
+                'feature': modeling_cols,
+                'boruta_ranking': boruta_selector.ranking_[current_target_name],
+                'boruta_decision': ['confirmed' if support_mask[i] else 
+                                   'tentative' if weak_mask[i] else 
+                                   'rejected' for i in range(len(modeling_cols))],
+                'feature_type': ['acoustic_index' if col in index_cols else 
+                               'environmental' if col in ['Water temp (°C)', 'Water depth (m)'] else 
+                               'temporal' for col in modeling_cols]
+            }).sort_values('boruta_ranking')
 
+            print(f"Boruta Results:")
+            print(f"  ✅ Confirmed features: {len(selected_features)} ({list(selected_features)})")
+            print(f"  ❓ Tentative features: {len(tentative_features)} ({list(tentative_features)})")
+            print(f"  ❌ Rejected features: {len(rejected_features)}")
 
+            # Get Random Forest feature importance from the final model
+            rf_final = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=42)
+            rf_final.fit(X_scaled, y_target)
+            rf_importance = rf_final.feature_importances_
 
-                print(f"Top confirmed features by ranking:")
-                confirmed_features = boruta_results[boruta_results['boruta_decision'] == 'confirmed'].head()
-                for i, (_, row) in enumerate(confirmed_features.iterrows()):
-                    print(f"  {i+1}. {row['feature']} ({row['feature_type']}): rank {row['boruta_ranking']}")
+            boruta_results['rf_importance'] = rf_importance
 
-            except Exception as e:
-                print(f"⚠️ Boruta analysis failed for {current_target_name}: {str(e)}")
-                print("Falling back to Random Forest importance only...")
+            current_target_results['boruta'] = {
+                'rankings': boruta_results,
+                'confirmed_features': list(selected_features),
+                'tentative_features': list(tentative_features),
+                'rejected_features': list(rejected_features),
+                'n_confirmed': len(selected_features),
+                'best_acoustic_index': boruta_results[
+                    (boruta_results['feature_type'] == 'acoustic_index') &
+                    (boruta_results['boruta_decision'] == 'confirmed')
+                ]['feature'].iloc[0] if len(selected_features) > 0 else None
+            }
 
-                # Fallback to RF importance
-                rf_fallback = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=42)
-                rf_fallback.fit(X_scaled, y_target)
-                rf_importance = rf_fallback.feature_importances_
 
-                rf_results_df = pd.DataFrame({
-                    'feature': modeling_cols,
-                    'rf_importance': rf_importance,
-                    'feature_type': ['acoustic_index' if col in index_cols else 
-                                   'environmental' if col in ['Water temp (°C)', 'Water depth (m)'] else 
-                                   'temporal' for col in modeling_cols]
-                }).sort_values('rf_importance', ascending=False)
 
-                current_target_results['boruta'] = {
-                    'rankings': rf_results_df,
-                    'confirmed_features': rf_results_df.head(5)['feature'].tolist(),
-                    'fallback_used': True,
-                    'best_acoustic_index': rf_results_df[rf_results_df['feature_type'] == 'acoustic_index'].iloc[0]['feature']
-                }
+            print(f"Top confirmed features by ranking:")
+            confirmed_features = boruta_results[boruta_results['boruta_decision'] == 'confirmed'].head()
+            for i, (_, row) in enumerate(confirmed_features.iterrows()):
+                print(f"  {i+1}. {row['feature']} ({row['feature_type']}): rank {row['boruta_ranking']}")
 
-        else:
-            print(f"\n2. BORUTA NOT AVAILABLE - USING RANDOM FOREST IMPORTANCE")
-            print("-" * 55)
+        except Exception as e:
+            print(f"⚠️ Boruta analysis failed for {current_target_name}: {str(e)}")
+            print("Falling back to Random Forest importance only...")
 
             # Fallback to RF importance
             rf_fallback = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=42)
@@ -547,10 +516,6 @@ def _(
                                'temporal' for col in modeling_cols]
             }).sort_values('rf_importance', ascending=False)
 
-            print(f"Top 5 features by Random Forest importance:")
-            for i, (_, row) in enumerate(rf_results_df.head().iterrows()):
-                print(f"  {i+1}. {row['feature']} ({row['feature_type']}): {row['rf_importance']:.3f}")
-
             current_target_results['boruta'] = {
                 'rankings': rf_results_df,
                 'confirmed_features': rf_results_df.head(5)['feature'].tolist(),
@@ -971,7 +936,6 @@ def _(mo):
 
 @app.cell
 def _(
-    BORUTA_AVAILABLE,
     DATA_ROOT,
     comparative_feature_results,
     enhanced_model_results,
@@ -998,7 +962,6 @@ def _(
     # Create comprehensive summary
     summary = {
         'methodology': {
-            'boruta_available': BORUTA_AVAILABLE,
             'approaches_compared': ['mutual_information', 'boruta_random_forest'],
             'models_tested': ['Random Forest (Primary)', 'Logistic Regression', 'Decision Tree'],
             'feature_sets_tested': ['All Features', 'Consensus Features', 'MI Top Features', 'Boruta Top Features']
@@ -1076,20 +1039,16 @@ def _(
     conclusions = []
 
     # Methodology comparison conclusion
-    if BORUTA_AVAILABLE:
-        avg_consensus_rate = np.mean([res['agreement_rate'] for res in consensus_summary.values()])
-        if avg_consensus_rate > 0.6:
-            conclusions.append(f"✅ High agreement between MI and Boruta methods ({avg_consensus_rate:.1%} average consensus)")
-            conclusions.append("Recommendation: Focus on consensus features for most robust biological screening")
-        elif avg_consensus_rate > 0.4:
-            conclusions.append(f"⚠️ Moderate agreement between methods ({avg_consensus_rate:.1%} average consensus)")  
-            conclusions.append("Recommendation: Use both approaches to capture different aspects of biological patterns")
-        else:
-            conclusions.append(f"❌ Low agreement between methods ({avg_consensus_rate:.1%} average consensus)")
-            conclusions.append("Recommendation: Investigate why methods disagree - may indicate complex biological relationships")
+    avg_consensus_rate = np.mean([res['agreement_rate'] for res in consensus_summary.values()])
+    if avg_consensus_rate > 0.6:
+        conclusions.append(f"✅ High agreement between MI and Boruta methods ({avg_consensus_rate:.1%} average consensus)")
+        conclusions.append("Recommendation: Focus on consensus features for most robust biological screening")
+    elif avg_consensus_rate > 0.4:
+        conclusions.append(f"⚠️ Moderate agreement between methods ({avg_consensus_rate:.1%} average consensus)")  
+        conclusions.append("Recommendation: Use both approaches to capture different aspects of biological patterns")
     else:
-        conclusions.append("⚠️ Boruta analysis not available - using MI + Random Forest importance for feature selection")
-        conclusions.append("Recommendation: Install Boruta package for full Transue methodology implementation")
+        conclusions.append(f"❌ Low agreement between methods ({avg_consensus_rate:.1%} average consensus)")
+        conclusions.append("Recommendation: Investigate why methods disagree - may indicate complex biological relationships")
 
     # Performance conclusions
     if len(performance_df) > 0:
@@ -1131,10 +1090,7 @@ def _(
     print(f"✅ Scientific conclusions documented")
     print(f"✅ Results saved for biological screening deployment")
 
-    if BORUTA_AVAILABLE:
-        print(f"🌲 Boruta methodology successfully integrated")
-    else:
-        print(f"⚠️ Install Boruta package for full Transue methodology: pip install boruta")
+    print(f"🌲 Boruta methodology successfully integrated")
 
     print("="*80)
     return
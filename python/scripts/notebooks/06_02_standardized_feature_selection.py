@@ -50,16 +50,6 @@ def _():
     from sklearn.ensemble import RandomForestClassifier
     from sklearn.preprocessing import StandardScaler
     from sklearn.metrics import f1_score, precision_score, recall_score, accuracy_score
-    from sklearn.feature_selection import mutual_info_classif
-
-    # Boruta
-    try:
-        from boruta import BorutaPy
-        BORUTA_AVAILABLE = True
-        print("✅ Boruta package available")
-    except ImportError:
-        BORUTA_AVAILABLE = False
-        print("⚠️ Boruta package not available - install with: pip install boruta")
 
     # Find project root
     current_dir = Path(__file__).parent if "__file__" in locals() else Path.cwd()
@@ -67,6 +57,12 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    # Boruta - built-in selector, deterministic for any number of worker threads
+    from mbon_utils.boruta import MultiTargetBoruta
+
+    # Mutual information scores are cached on disk per feature matrix and target
+    from mbon_utils.mutual_information import MutualInfoScorer
+
     DATA_ROOT = project_root / "data"
     plot_dir = DATA_ROOT.parent / "dashboard/public/views/notebooks"
     plot_dir.mkdir(exist_ok=True, parents=True)
@@ -74,14 +70,13 @@ def _():
     print("Libraries loaded successfully")
     print(f"Data root: {DATA_ROOT}")
     return (
-        BORUTA_AVAILABLE,
-        BorutaPy,
         DATA_ROOT,
+        MultiTargetBoruta,
+        MutualInfoScorer,
         RandomForestClassifier,
         StandardScaler,
         StratifiedKFold,
         cross_val_score,
-        mutual_info_classif,
         np,
         pd,
         plot_dir,
@@ -246,7 +241,7 @@ def _(StandardScaler, df_community, index_cols):
 
 
 @app.cell
-def _(X_scaled, modeling_cols, mutual_info_classif, pd, y):
+def _(DATA_ROOT, MutualInfoScorer, X_scaled, modeling_cols, pd, y):
     # METHOD 1: MUTUAL INFORMATION (Standardized)
     print("\n" + "="*60)
     print("METHOD 1: MUTUAL INFORMATION ANALYSIS")
@@ -257,7 +252,9 @@ def _(X_scaled, modeling_cols, mutual_info_classif, pd, y):
 
     # Calculate MI scores with fixed seed
     print("Computing mutual information scores...")
-    mi_scores = mutual_info_classif(X_scaled, y, random_state=RANDOM_SEED)
+    mi_scores = MutualInfoScorer(
+        X_scaled, modeling_cols, random_state=RANDOM_SEED, cache_dir=DATA_ROOT / "processed/mi_cache"
+    ).score(y)
 
     # Create results dataframe
     mi_results = pd.DataFrame({
@@ -283,10 +280,8 @@ def _(X_scaled, modeling_cols, mutual_info_classif, pd, y):
 
 @app.cell
 def _(
-    BORUTA_AVAILABLE,
-    BorutaPy,
+    MultiTargetBoruta,
     RANDOM_SEED,
-    RandomForestClassifier,
     X_scaled,
     modeling_cols,
     np,
@@ -298,87 +293,74 @@ def _(
     print("METHOD 2: BORUTA + RANDOM FOREST ANALYSIS")  
     print("="*60)
 
-    if not BORUTA_AVAILABLE:
-        print("⚠️ Boruta not available - skipping this analysis")
+    # Forests use the same depth and seed as MI; per-iteration seeds keep the
+    # result identical whether or not the forests are fitted in parallel
+    print("Initializing Boruta selector...")
+    boruta_selector = MultiTargetBoruta(
+        n_estimators='auto',
+        max_depth=8,
+        random_state=RANDOM_SEED,  # Same seed as MI
+        max_iter=50,  # Reasonable limit
+        n_jobs=-1
+    )
+
+    try:
+        # Fit Boruta on IDENTICAL data
+        print("Running Boruta feature selection...")
+        print("(Using identical data as MI)")
+        boruta_selector.fit(X_scaled, {'target': y})  # Same X_scaled and y as MI
+        print(f"Boruta finished after {boruta_selector.n_iter_['target']} iterations")
+
+        # Extract results
+        confirmed_mask = boruta_selector.support_['target']
+        tentative_mask = boruta_selector.support_weak_['target']
+
+        boruta_confirmed_features = np.array(modeling_cols)[confirmed_mask].tolist()
+        boruta_tentative_features = np.array(modeling_cols)[tentative_mask].tolist() 
+        boruta_rejected_features = np.array(modeling_cols)[~confirmed_mask & ~tentative_mask].tolist()
+
+        # Get feature rankings
+        boruta_rankings = boruta_selector.ranking_['target']
+
+        # Create results dataframe
+        boruta_results = pd.DataFrame({
+            'feature': modeling_cols,
+            'boruta_ranking': boruta_rankings,
+            'boruta_decision': ['confirmed' if confirmed_mask[i] else
+                               'tentative' if tentative_mask[i] else
+                               'rejected' for i in range(len(modeling_cols))],
+            'method': 'boruta'
+        }).sort_values('boruta_ranking')
+
+        # Top 5 features (confirmed + best tentative if needed)
+        if len(boruta_confirmed_features) >= 5:
+            boruta_top_5_features = boruta_confirmed_features[:5]
+        else:
+            # Include tentative features to get top 5
+            all_selected = boruta_confirmed_features + boruta_tentative_features
+            boruta_top_5_features = all_selected[:5]
+
+        print(f"Boruta Results:")
+        print(f"  ✅ Confirmed features: {len(boruta_confirmed_features)}")
+        if boruta_confirmed_features:
+            print(f"      {boruta_confirmed_features}")
+        print(f"  ❓ Tentative features: {len(boruta_tentative_features)}")  
+        if boruta_tentative_features:
+            print(f"      {boruta_tentative_features}")
+        print(f"  ❌ Rejected features: {len(boruta_rejected_features)}")
+
+        print(f"\nTop 5 Boruta features (confirmed + tentative):")
+        for boruta_i, feature in enumerate(boruta_top_5_features):
+            ranking = boruta_results[boruta_results['feature'] == feature]['boruta_ranking'].iloc[0]
+            decision = boruta_results[boruta_results['feature'] == feature]['boruta_decision'].iloc[0]
+            print(f"  {boruta_i+1}. {feature}: rank {ranking} ({decision})")
+
+    except Exception as e:
+        print(f"❌ Boruta analysis failed: {str(e)}")
+        print("This could be due to data characteristics or computational limits")
         boruta_results = None
         boruta_top_5_features = []
         boruta_confirmed_features = []
-    else:
-        # Initialize Random Forest with IDENTICAL parameters and seed
-        print("Initializing Random Forest for Boruta...")
-        rf_for_boruta = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=8, 
-            random_state=RANDOM_SEED,  # Same seed as MI
-            n_jobs=1  # Single thread for reproducibility
-        )
-
-        # Initialize Boruta with same seed
-        print("Initializing Boruta selector...")
-        boruta_selector = BorutaPy(
-            rf_for_boruta,
-            n_estimators='auto',
-            verbose=1,  # Show progress
-            random_state=RANDOM_SEED,  # Same seed as MI
-            max_iter=50  # Reasonable limit
-        )
-
-        try:
-            # Fit Boruta on IDENTICAL data
-            print("Running Boruta feature selection...")
-            print("(This may take a few minutes - using identical data as MI)")
-            boruta_selector.fit(X_scaled, y)  # Same X_scaled and y as MI
-
-            # Extract results
-            confirmed_mask = boruta_selector.support_
-            tentative_mask = boruta_selector.support_weak_
-
-            boruta_confirmed_features = np.array(modeling_cols)[confirmed_mask].tolist()
-            boruta_tentative_features = np.array(modeling_cols)[tentative_mask].tolist() 
-            boruta_rejected_features = np.array(modeling_cols)[~confirmed_mask & ~tentative_mask].tolist()
-
-            # Get feature rankings
-            boruta_rankings = boruta_selector.ranking_
-
-            # Create results dataframe
-            boruta_results = pd.DataFrame({
-                'feature': modeling_cols,
-                'boruta_ranking': boruta_rankings,
-                'boruta_decision': ['confirmed' if confirmed_mask[i] else
-                                   'tentative' if tentative_mask[i] else
-                                   'rejected' for i in range(len(modeling_cols))],
-                'method': 'boruta'
-            }).sort_values('boruta_ranking')
-
-            # Top 5 features (confirmed + best tentative if needed)
-            if len(boruta_confirmed_features) >= 5:
-                boruta_top_5_features = boruta_confirmed_features[:5]
-            else:
-                # Include tentative features to get top 5
-                all_selected = boruta_confirmed_features + boruta_tentative_features
-                boruta_top_5_features = all_selected[:5]
-
-            print(f"Boruta Results:")
-            print(f"  ✅ Confirmed features: {len(boruta_confirmed_features)}")
-            if boruta_confirmed_features:
-                print(f"      {boruta_confirmed_features}")
-            print(f"  ❓ Tentative features: {len(boruta_tentative_features)}")  
-            if boruta_tentative_features:
-                print(f"      {boruta_tentative_features}")
-            print(f"  ❌ Rejected features: {len(boruta_rejected_features)}")
-
-            print(f"\nTop 5 Boruta features (confirmed + tentative):")
-            for boruta_i, feature in enumerate(boruta_top_5_features):
-                ranking = boruta_results[boruta_results['feature'] == feature]['boruta_ranking'].iloc[0]
-                decision = boruta_results[boruta_results['feature'] == feature]['boruta_decision'].iloc[0]
-                print(f"  {boruta_i+1}. {feature}: rank {ranking} ({decision})")
-
-        except Exception as e:
-            print(f"❌ Boruta analysis failed: {str(e)}")
-            print("This could be due to data characteristics or computational limits")
-            boruta_results = None
-            boruta_top_5_features = []
-            boruta_confirmed_features = []
 
     return boruta_results, boruta_top_5_features
 
@@ -88,7 +88,6 @@ def _():
     from pathlib import Path
     import warnings
     import json
-    import pickle
     warnings.filterwarnings('ignore')
 
     # Machine learning
@@ -102,7 +101,7 @@ def _():
         precision_recall_curve, accuracy_score, cohen_kappa_score,
         f1_score, precision_score, recall_score
     )
-    from sklearn.feature_selection import mutual_info_classif, SelectKBest
+    from sklearn.feature_selection import SelectKBest
 
     # Statistical analysis
     from scipy import stats
@@ -118,6 +117,14 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    from mbon_utils.community_metrics import build_community_metrics, fish_community, marine_community
+    from mbon_utils.hyperparameter_search import (
+        load_tuned_configs, model_key, save_tuned_configs, tune_targets
+    )
+    from mbon_utils.model_evaluation import train_community_models
+    from mbon_utils.model_store import save_model_store
+    from mbon_utils.mutual_information import MutualInfoScorer
+
     # Data directories
     DATA_ROOT = project_root / "data"
     data_dir = DATA_ROOT / "processed"
@@ -131,24 +138,25 @@ def _():
         DATA_ROOT,
         DecisionTreeClassifier,
         LogisticRegression,
+        MutualInfoScorer,
         RandomForestClassifier,
         StandardScaler,
-        StratifiedKFold,
-        accuracy_score,
-        cohen_kappa_score,
+        build_community_metrics,
         cross_val_score,
-        f1_score,
+        fish_community,
         json,
-        mutual_info_classif,
+        load_tuned_configs,
+        marine_community,
+        model_key,
         np,
         pd,
-        pickle,
         plot_dir,
         plt,
-        precision_score,
-        recall_score,
+        save_model_store,
+        save_tuned_configs,
         spearmanr,
-        train_test_split,
+        train_community_models,
+        tune_targets,
     )
 
 
@@ -273,40 +281,35 @@ def _(mo):
 
 @app.cell(hide_code=True)
 def model_prep(
-    df_env,
-    df_indices,
+    build_community_metrics,
     df_marine_community,
     df_master,
-    df_temporal,
+    fish_community,
     fish_species,
+    marine_community,
 ):
     # Create community-level activity metrics
     print("Creating community activity metrics...")
     print(f"Working with {len(fish_species)} fish species: {fish_species}")
 
+    # All community metrics and binary targets come from one pass over the species columns:
     # 1. Total fish activity (sum across all species)
-    # This captures the overall "biological energy" in each 2-hour period
-    # Range: 0 (no calling) to 21 (all species calling at maximum intensity)
-    df_community = df_master.copy()
-    df_community['total_fish_activity'] = df_community[fish_species].sum(axis=1)
-    print(f"Total activity range: {df_community['total_fish_activity'].min():.0f} to {df_community['total_fish_activity'].max():.0f}")
-
+    #    This captures the overall "biological energy" in each 2-hour period
+    #    Range: 0 (no calling) to 21 (all species calling at maximum intensity)
     # 2. Number of active species (how many species detected)
-    # This measures community richness - are multiple species active simultaneously?
-    # Range: 0 (no species) to 7 (all species calling)
-    df_community['num_active_species'] = (df_community[fish_species] > 0).sum(axis=1)
-    print(f"Active species range: {df_community['num_active_species'].min():.0f} to {df_community['num_active_species'].max():.0f}")
-
+    #    This measures community richness - are multiple species active simultaneously?
+    #    Range: 0 (no species) to 7 (all species calling)
     # 3. Maximum species activity (highest calling intensity across species)
-    # This captures the strength of the dominant biological signal
-    # Range: 0 (no activity) to 3 (maximum intensity from at least one species)
-    df_community['max_species_activity'] = df_community[fish_species].max(axis=1)
-    print(f"Maximum activity range: {df_community['max_species_activity'].min():.0f} to {df_community['max_species_activity'].max():.0f}")
-
+    #    This captures the strength of the dominant biological signal
+    #    Range: 0 (no activity) to 3 (maximum intensity from at least one species)
     # 4. Activity diversity (simplified - coefficient of variation)
-    # This measures how evenly distributed calling is across species
-    # High values = one species dominates, Low values = multiple species calling similarly
-    df_community['activity_diversity'] = df_community[fish_species].std(axis=1) / (df_community[fish_species].mean(axis=1) + 0.01)
+    #    This measures how evenly distributed calling is across species
+    #    High values = one species dominates, Low values = multiple species calling similarly
+    _fish_metrics, _fish_thresholds = build_community_metrics(df_master, fish_community(fish_species))
+    df_community = df_master.join(_fish_metrics)
+    print(f"Total activity range: {df_community['total_fish_activity'].min():.0f} to {df_community['total_fish_activity'].max():.0f}")
+    print(f"Active species range: {df_community['num_active_species'].min():.0f} to {df_community['num_active_species'].max():.0f}")
+    print(f"Maximum activity range: {df_community['max_species_activity'].min():.0f} to {df_community['max_species_activity'].max():.0f}")
 
     print("\n" + "="*60)
     print("CREATING BINARY CLASSIFICATION TARGETS")
@@ -315,27 +318,15 @@ def model_prep(
 
     # 5. Binary classification targets at different thresholds
     # These represent different "screening sensitivity" levels
-
-    # High vs low total activity (75th percentile threshold)
-    # Question: "Is this a period of elevated biological activity?"
-    total_activity_75th = df_community['total_fish_activity'].quantile(0.75)
-    df_community['high_activity_75th'] = (df_community['total_fish_activity'] >= total_activity_75th).astype(int)
+    # - High activity (75th percentile): "Is this a period of elevated biological activity?"
+    # - Very high activity (90th percentile): "Is this a period of exceptional biological interest?"
+    # - Any activity: "Is there any fish calling happening at all?"
+    # - Multi-species (≥2 species): "Are multiple species interacting/calling together?"
+    total_activity_75th = _fish_thresholds['high_75th']
+    total_activity_90th = _fish_thresholds['high_90th']
     print(f"High activity (75th percentile, threshold={total_activity_75th:.1f}): {df_community['high_activity_75th'].mean():.1%} of periods")
-
-    # Very high activity (90th percentile threshold)
-    # Question: "Is this a period of exceptional biological interest?"
-    total_activity_90th = df_community['total_fish_activity'].quantile(0.90)
-    df_community['high_activity_90th'] = (df_community['total_fish_activity'] >= total_activity_90th).astype(int)
     print(f"Very high activity (90th percentile, threshold={total_activity_90th:.1f}): {df_community['high_activity_90th'].mean():.1%} of periods")
-
-    # Any biological activity vs none
-    # Question: "Is there any fish calling happening at all?"
-    df_community['any_activity'] = (df_community['total_fish_activity'] > 0).astype(int)
     print(f"Any activity (threshold=0): {df_community['any_activity'].mean():.1%} of periods")
-
-    # Multiple species active vs single/none
-    # Question: "Are multiple species interacting/calling together?"
-    df_community['multi_species_active'] = (df_community['num_active_species'] >= 2).astype(int)
     print(f"Multi-species activity (≥2 species): {df_community['multi_species_active'].mean():.1%} of periods")
 
     print(f"Fish community metrics created. Sample statistics:")
@@ -359,94 +350,44 @@ def model_prep(
         print("CREATING MARINE COMMUNITY METRICS (FISH + DOLPHINS)")
         print("="*70)
 
-        # Create marine master dataset by merging with enhanced marine community data
-        # Use the marine community data which includes fish + dolphin metrics
-
-        # First, get marine species columns from marine community data
-        marine_species_cols = [col for col in df_marine_community.columns 
-                             if col not in ['datetime', 'station', 'total_fish_intensity',
-                                          'num_active_fish_species', 'max_fish_intensity',
-                                          'dolphin_count', 'dolphin_intensity', 'total_marine_intensity',
-                                          'num_active_marine_species', 'max_marine_intensity']]
-
-        # Get just the fish species from the marine data (should match fish_species)
-        marine_fish_species = [col for col in marine_species_cols if col in fish_species]
+        # Marine community = fish species + dolphin intensity from notebook 08. The indices,
+        # environmental and temporal columns are already in df_master, so only the species
+        # columns are merged in (replacing df_master's fish detections)
+        marine_fish_species = [col for col in fish_species if col in df_marine_community.columns]
 
         print(f"Creating marine community dataset with {len(marine_fish_species)} fish species + dolphins")
 
-        # Create marine master dataset
-        df_marine_master = df_indices.merge(
-            df_marine_community[['datetime', 'station'] + marine_fish_species + 
-                               ['dolphin_intensity', 'total_marine_intensity', 
-                                'num_active_marine_species', 'max_marine_intensity']],
-            on=['datetime', 'station'],
-            how='left'
-        )
-
-        # Merge with environmental and temporal data (same as fish-only)
-        df_marine_master = df_marine_master.merge(
-            df_env[['datetime', 'station', 'Water temp (°C)', 'Water depth (m)',
-                    'Broadband (1-40000 Hz)', 'Low (50-1200 Hz)', 'High (7000-40000 Hz)']],
+        df_marine_master = df_master.drop(columns=fish_species).merge(
+            df_marine_community[['datetime', 'station'] + marine_fish_species + ['dolphin_intensity']],
             on=['datetime', 'station'],
             how='left'
         )
 
-        df_marine_master = df_marine_master.merge(
-            df_temporal[['datetime', 'station', 'hour', 'month', 'season', 'time_period']],
-            on=['datetime', 'station'],
-            how='left'
-        )
-
-        # Rename time_period to diel_period for consistency
-        df_marine_master = df_marine_master.rename(columns={'time_period': 'diel_period'})
-
         print(f"Marine master dataset shape: {df_marine_master.shape}")
 
-        # Create marine community dataset
-        df_marine = df_marine_master.copy()
-
-        # Use the pre-computed marine community metrics from notebook 08
-        print("Using pre-computed marine community metrics from notebook 08...")
-
-        # Rename marine metrics to match fish naming convention for consistency
-        df_marine['total_marine_activity'] = df_marine['total_marine_intensity']
-        df_marine['num_active_marine_species'] = df_marine['num_active_marine_species']
-        df_marine['max_marine_activity'] = df_marine['max_marine_intensity']
+        # Marine metrics and targets from the same kernel; dolphins count as one more species.
+        # Rows the left merge found no marine detections for are not flagged and stay out of
+        # the percentile thresholds
+        _marine_metrics, _marine_thresholds = build_community_metrics(
+            df_marine_master, marine_community(marine_fish_species), observed_only=True
+        )
+        df_marine = df_marine_master.join(_marine_metrics)
 
         # Add dolphin-specific metrics
         df_marine['dolphin_activity'] = df_marine['dolphin_intensity']
 
-        # Calculate activity diversity for marine community
-        all_marine_species = marine_fish_species + ['dolphin_intensity']
-        df_marine['marine_activity_diversity'] = df_marine[all_marine_species].std(axis=1) / (df_marine[all_marine_species].mean(axis=1) + 0.01)
-
         print(f"Marine activity range: {df_marine['total_marine_activity'].min():.0f} to {df_marine['total_marine_activity'].max():.0f}")
         print(f"Marine species range: {df_marine['num_active_marine_species'].min():.0f} to {df_marine['num_active_marine_species'].max():.0f}")
         print(f"Dolphin activity range: {df_marine['dolphin_activity'].min():.0f} to {df_marine['dolphin_activity'].max():.0f}")
 
-        # Create binary classification targets for marine community
+        # Binary classification targets for the marine community
         print("\nCreating marine community binary classification targets...")
-
-        # High vs low marine activity (75th percentile threshold)
-        marine_activity_75th = df_marine['total_marine_activity'].quantile(0.75)
-        df_marine['high_marine_activity_75th'] = (df_marine['total_marine_activity'] >= marine_activity_75th).astype(int)
+        marine_activity_75th = _marine_thresholds['high_75th']
+        marine_activity_90th = _marine_thresholds['high_90th']
         print(f"High marine activity (75th percentile, threshold={marine_activity_75th:.1f}): {df_marine['high_marine_activity_75th'].mean():.1%} of periods")
-
-        # Very high marine activity (90th percentile threshold)
-        marine_activity_90th = df_marine['total_marine_activity'].quantile(0.90)
-        df_marine['high_marine_activity_90th'] = (df_marine['total_marine_activity'] >= marine_activity_90th).astype(int)
         print(f"Very high marine activity (90th percentile, threshold={marine_activity_90th:.1f}): {df_marine['high_marine_activity_90th'].mean():.1%} of periods")
-
-        # Any marine biological activity vs none
-        df_marine['any_marine_activity'] = (df_marine['total_marine_activity'] > 0).astype(int)
         print(f"Any marine activity (threshold=0): {df_marine['any_marine_activity'].mean():.1%} of periods")
-
-        # Multiple marine species active vs single/none  
-        df_marine['multi_marine_species_active'] = (df_marine['num_active_marine_species'] >= 2).astype(int)
         print(f"Multi-species marine activity (≥2 species): {df_marine['multi_marine_species_active'].mean():.1%} of periods")
-
-        # Dolphin-specific targets
-        df_marine['dolphin_present'] = (df_marine['dolphin_activity'] > 0).astype(int)
         print(f"Dolphin presence: {df_marine['dolphin_present'].mean():.1%} of periods")
 
         print(f"\nMarine community metrics created. Sample statistics:")
@@ -539,21 +480,19 @@ def _(mo):
 
 @app.cell(hide_code=True)
 def _(
+    DATA_ROOT,
     DecisionTreeClassifier,
     LogisticRegression,
     RandomForestClassifier,
     StandardScaler,
-    StratifiedKFold,
-    accuracy_score,
-    cohen_kappa_score,
-    cross_val_score,
     df_community,
     df_marine,
-    f1_score,
     index_cols,
-    precision_score,
-    recall_score,
-    train_test_split,
+    load_tuned_configs,
+    model_key,
+    save_tuned_configs,
+    train_community_models,
+    tune_targets,
 ):
     # Prepare data for comparative community activity modeling
     print("Preparing data for COMPARATIVE community activity modeling...")
@@ -597,6 +536,23 @@ def _(
     }
     print(f"Models configured: {list(models.keys())}")
 
+    # True trains all targets of a community on one shared split and set of CV folds, so their
+    # scores are comparable row for row; trees and forests are multi-output in the CV folds only
+    # (rare targets can lose recall in those scores). Saved models, test metrics and feature
+    # importances still come from one fit per target, so total training time is about the same.
+    # False = each target with its own split and folds.
+    MULTI_TARGET_TRAINING = False
+    print(f"Multi-target training: {MULTI_TARGET_TRAINING}")
+
+    # Tuned settings per community, target and model come from a successive-halving search
+    # on time-blocked folds (all targets searched concurrently on a process pool). The search
+    # is slow, so it only re-runs when TUNE_HYPERPARAMETERS is set; untuned models keep the
+    # fixed settings above. Notebooks 06_04 and 07 model other feature columns, so they keep
+    # their own searches in the same file.
+    TUNE_HYPERPARAMETERS = False
+    tuned_configs_path = DATA_ROOT / "processed/tuned_model_configs.json"
+    _search_models = [model_key(_name) for _name in models]
+
     # Initialize results storage
     all_model_results = {}
     all_modeling_datasets = {}
@@ -624,6 +580,8 @@ def _(
     if 'ACTspFract' in X_fish_features.columns:
         print(f"Before scaling - ACTspFract range: {X_fish_features['ACTspFract'].min():.3f} to {X_fish_features['ACTspFract'].max():.3f}")
 
+    # Full-data scaling feeds mutual information and the tuning search; model training
+    # scales each split and CV fold on its own training rows instead
     scaler_fish = StandardScaler()
     X_fish_scaled = scaler_fish.fit_transform(X_fish_features)
     print(f"After scaling - All features have mean≈0, std≈1")
@@ -633,67 +591,54 @@ def _(
     all_scalers['fish'] = scaler_fish
 
     # Train fish models
-    fish_model_results = {}
+    fish_trainable_targets = []
 
     for target_name in fish_target_cols:
-        print(f"\nTraining fish models for: {target_name}")
         y_target = df_fish_modeling[target_name]
 
         # Check class balance
         class_balance = y_target.value_counts(normalize=True)
-        print(f"Class balance: {class_balance.to_dict()}")
+        print(f"\nFish target {target_name} - class balance: {class_balance.to_dict()}")
 
         if y_target.std() == 0:  # Skip if no variance
             print(f"Skipping {target_name} - no variance in target")
             continue
-
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X_fish_scaled, y_target, test_size=0.3, random_state=42, stratify=y_target
+        fish_trainable_targets.append(target_name)
+
+    # Tuned settings only apply to models on the feature columns they were searched on
+    _fish_targets = df_fish_modeling[fish_trainable_targets]
+    if TUNE_HYPERPARAMETERS:
+        print(f"\nSearching hyperparameters for {len(fish_trainable_targets)} fish targets...")
+        _version = save_tuned_configs(
+            tuned_configs_path, 'fish',
+            tune_targets(X_fish_scaled, _fish_targets, _search_models,
+                         times=df_community.loc[df_fish_modeling.index, 'datetime']),
+            features=modeling_cols
+        )
+        print(f"Saved tuned configurations (version {_version}) to {tuned_configs_path}")
+    tuned_configs = load_tuned_configs(tuned_configs_path)
+
+    if tuned_configs.has('fish', modeling_cols):
+        # Tuned settings differ per target, so each target is trained with its own models
+        print(f"\nUsing tuned model configurations (version {tuned_configs.version})")
+        if MULTI_TARGET_TRAINING:
+            print("Multi-target training overridden: tuned fish models are trained one target at a time")
+        fish_model_results = {}
+        for target_name in fish_trainable_targets:
+            fish_model_results.update(train_community_models(
+                tuned_configs.models(models, 'fish', target_name, features=modeling_cols), X_fish_features,
+                df_fish_modeling[[target_name]], 'fish', scale=True
+            ))
+    else:
+        fish_model_results = train_community_models(
+            models, X_fish_features, df_fish_modeling[fish_trainable_targets], 'fish',
+            shared_split=MULTI_TARGET_TRAINING, scale=True
         )
 
-        target_results = {}
-
-        for model_name, model in models.items():
-            # Create fresh model instance
-            model_instance = type(model)(**model.get_params())
-
-            # Train model
-            model_instance.fit(X_train, y_train)
-
-            # Predictions
-            y_pred = model_instance.predict(X_test)
-            y_prob = model_instance.predict_proba(X_test)[:, 1] if hasattr(model_instance, 'predict_proba') else y_pred
-
-            # Metrics
-            accuracy = accuracy_score(y_test, y_pred)
-            precision = precision_score(y_test, y_pred, average='binary', zero_division=0)
-            recall = recall_score(y_test, y_pred, average='binary', zero_division=0)
-            f1 = f1_score(y_test, y_pred, average='binary', zero_division=0)
-            kappa = cohen_kappa_score(y_test, y_pred)
-
-            # Cross-validation
-            cv_model = type(model)(**model.get_params())
-            cv_scores = cross_val_score(cv_model, X_fish_scaled, y_target, cv=StratifiedKFold(5), scoring='f1')
-
-            target_results[model_name] = {
-                'model': model_instance,
-                'accuracy': accuracy,
-                'precision': precision,
-                'recall': recall,
-                'f1': f1,
-                'kappa': kappa,
-                'cv_f1_mean': cv_scores.mean(),
-                'cv_f1_std': cv_scores.std(),
-                'y_test': y_test,
-                'y_pred': y_pred,
-                'y_prob': y_prob,
-                'community_type': 'fish'
-            }
-
-            print(f"  {model_name}: F1={f1:.3f}, Precision={precision:.3f}, Recall={recall:.3f}")
-
-        fish_model_results[target_name] = target_results
+    for target_name, target_results in fish_model_results.items():
+        print(f"\nFish models for: {target_name}")
+        for model_name, model_result in target_results.items():
+            print(f"  {model_name}: F1={model_result['f1']:.3f}, Precision={model_result['precision']:.3f}, Recall={model_result['recall']:.3f}")
 
     all_model_results['fish'] = fish_model_results
 
@@ -725,6 +670,7 @@ def _(
         if 'ACTspFract' in X_marine_features.columns:
             print(f"Before scaling - ACTspFract range: {X_marine_features['ACTspFract'].min():.3f} to {X_marine_features['ACTspFract'].max():.3f}")
 
+        # Full-data scaling for mutual information and tuning; training scales per fold
         scaler_marine = StandardScaler()
         X_marine_scaled = scaler_marine.fit_transform(X_marine_features)
         print(f"After scaling - All features have mean≈0, std≈1")
@@ -734,65 +680,52 @@ def _(
         all_scalers['marine'] = scaler_marine
 
         # Train marine models
+        marine_trainable_targets = []
+
         for marine_target_name in marine_target_cols:
-            print(f"\nTraining marine models for: {marine_target_name}")
             y_target = df_marine_modeling[marine_target_name]
 
             # Check class balance
             class_balance = y_target.value_counts(normalize=True)
-            print(f"Class balance: {class_balance.to_dict()}")
+            print(f"\nMarine target {marine_target_name} - class balance: {class_balance.to_dict()}")
 
             if y_target.std() == 0:  # Skip if no variance
                 print(f"Skipping {marine_target_name} - no variance in target")
                 continue
-
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X_marine_scaled, y_target, test_size=0.3, random_state=42, stratify=y_target
+            marine_trainable_targets.append(marine_target_name)
+
+        _marine_targets = df_marine_modeling[marine_trainable_targets]
+        if TUNE_HYPERPARAMETERS:
+            print(f"\nSearching hyperparameters for {len(marine_trainable_targets)} marine targets...")
+            _version = save_tuned_configs(
+                tuned_configs_path, 'marine',
+                tune_targets(X_marine_scaled, _marine_targets, _search_models,
+                             times=df_marine.loc[df_marine_modeling.index, 'datetime']),
+                features=modeling_cols
+            )
+            print(f"Saved tuned configurations (version {_version}) to {tuned_configs_path}")
+            tuned_configs = load_tuned_configs(tuned_configs_path)
+
+        if tuned_configs.has('marine', modeling_cols):
+            if MULTI_TARGET_TRAINING:
+                print("Multi-target training overridden: tuned marine models are trained one target at a time")
+            marine_model_results = {}
+            for marine_target_name in marine_trainable_targets:
+                marine_model_results.update(train_community_models(
+                    tuned_configs.models(models, 'marine', marine_target_name, features=modeling_cols),
+                    X_marine_features,
+                    df_marine_modeling[[marine_target_name]], 'marine', scale=True
+                ))
+        else:
+            marine_model_results = train_community_models(
+                models, X_marine_features, df_marine_modeling[marine_trainable_targets], 'marine',
+                shared_split=MULTI_TARGET_TRAINING, scale=True
             )
 
-            target_results = {}
-
-            for model_name, model in models.items():
-                # Create fresh model instance
-                model_instance = type(model)(**model.get_params())
-
-                # Train model
-                model_instance.fit(X_train, y_train)
-
-                # Predictions
-                y_pred = model_instance.predict(X_test)
-                y_prob = model_instance.predict_proba(X_test)[:, 1] if hasattr(model_instance, 'predict_proba') else y_pred
-
-                # Metrics
-                accuracy = accuracy_score(y_test, y_pred)
-                precision = precision_score(y_test, y_pred, average='binary', zero_division=0)
-                recall = recall_score(y_test, y_pred, average='binary', zero_division=0)
-                f1 = f1_score(y_test, y_pred, average='binary', zero_division=0)
-                kappa = cohen_kappa_score(y_test, y_pred)
-
-                # Cross-validation
-                cv_model = type(model)(**model.get_params())
-                cv_scores = cross_val_score(cv_model, X_marine_scaled, y_target, cv=StratifiedKFold(5), scoring='f1')
-
-                target_results[model_name] = {
-                    'model': model_instance,
-                    'accuracy': accuracy,
-                    'precision': precision,
-                    'recall': recall,
-                    'f1': f1,
-                    'kappa': kappa,
-                    'cv_f1_mean': cv_scores.mean(),
-                    'cv_f1_std': cv_scores.std(),
-                    'y_test': y_test,
-                    'y_pred': y_pred,
-                    'y_prob': y_prob,
-                    'community_type': 'marine'
-                }
-
-                print(f"  {model_name}: F1={f1:.3f}, Precision={precision:.3f}, Recall={recall:.3f}")
-
-            marine_model_results[marine_target_name] = target_results
+        for marine_target_name, target_results in marine_model_results.items():
+            print(f"\nMarine models for: {marine_target_name}")
+            for model_name, model_result in target_results.items():
+                print(f"  {model_name}: F1={model_result['f1']:.3f}, Precision={model_result['precision']:.3f}, Recall={model_result['recall']:.3f}")
 
         all_model_results['marine'] = marine_model_results
 
@@ -841,6 +774,8 @@ def _(mo):
 
 @app.cell(hide_code=True)
 def _(
+    DATA_ROOT,
+    MutualInfoScorer,
     X_fish_scaled,
     X_marine_scaled,
     all_model_results,
@@ -848,7 +783,6 @@ def _(
     fish_target_cols,
     marine_target_cols,
     modeling_cols,
-    mutual_info_classif,
     np,
     pd,
 ):
@@ -870,14 +804,19 @@ def _(
     if 'fish' in all_model_results and X_fish_scaled is not None:
         _df_fish_modeling = all_modeling_datasets['fish']
 
+        # Mutual information for every modeled fish target at once (cached across runs)
+        fish_mi_scores = MutualInfoScorer(
+            X_fish_scaled, modeling_cols, random_state=42, cache_dir=DATA_ROOT / "processed/mi_cache"
+        ).score_targets({
+            _t: _df_fish_modeling[_t] for _t in fish_target_cols if _t in all_model_results['fish']
+        })
+
         for fish_target_name in fish_target_cols:
             if fish_target_name not in all_model_results['fish']:
                 continue
 
-            _y_target = _df_fish_modeling[fish_target_name]
-
             # Mutual information feature importance
-            mi_scores = mutual_info_classif(X_fish_scaled, _y_target, random_state=42)
+            mi_scores = fish_mi_scores[fish_target_name].to_numpy()
 
             # Random Forest feature importance (if available)
             rf_model = all_model_results['fish'][fish_target_name].get('Random Forest', {}).get('model')
@@ -911,14 +850,19 @@ def _(
 
         _df_marine_modeling = all_modeling_datasets['marine']
 
+        # Mutual information for every modeled marine target at once (cached across runs)
+        marine_mi_scores = MutualInfoScorer(
+            X_marine_scaled, modeling_cols, random_state=42, cache_dir=DATA_ROOT / "processed/mi_cache"
+        ).score_targets({
+            _t: _df_marine_modeling[_t] for _t in marine_target_cols if _t in all_model_results['marine']
+        })
+
         for _target_name in marine_target_cols:
             if _target_name not in all_model_results['marine']:
                 continue
 
-            _y_target = _df_marine_modeling[_target_name]
-
             # Mutual information feature importance
-            mi_scores = mutual_info_classif(X_marine_scaled, _y_target, random_state=42)
+            mi_scores = marine_mi_scores[_target_name].to_numpy()
 
             # Random Forest feature importance (if available)
             rf_model = all_model_results['marine'][_target_name].get('Random Forest', {}).get('model')
@@ -1774,10 +1718,11 @@ def _(
     DATA_ROOT,
     all_feature_importance_results,
     all_model_results,
+    all_modeling_datasets,
     df_community,
     diel_corr_df,
     json,
-    pickle,
+    save_model_store,
     screening_results,
     seasonal_corr_df,
 ):
@@ -1787,9 +1732,14 @@ def _(
     # Save processed data
     df_community.to_parquet(DATA_ROOT / "processed/06_community_activity_data.parquet")
 
-    # Save model results
-    with open(DATA_ROOT / "processed/06_community_models.pkl", 'wb') as f:
-        pickle.dump(all_model_results, f)
+    # Save model results: metrics index, per-model artifacts and memory-mappable
+    # prediction arrays (out-of-fold probabilities are aligned to each community's
+    # modeling rows - index labels of df_community for 'fish', of the marine frame for 'marine')
+    save_model_store(
+        all_model_results,
+        DATA_ROOT / "processed/06_community_models",
+        rows={_community: all_modeling_datasets[_community].index for _community in all_model_results}
+    )
 
     # Save feature importance
     _fish_feature_importance_save = all_feature_importance_results.get('fish', {})
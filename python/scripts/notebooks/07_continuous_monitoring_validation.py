@@ -65,14 +65,12 @@ def _():
     from pathlib import Path
     import warnings
     import json
-    import pickle
     warnings.filterwarnings('ignore')
 
     # Machine learning and validation
-    from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold, TimeSeriesSplit
+    from sklearn.model_selection import train_test_split, StratifiedKFold, TimeSeriesSplit
     from sklearn.linear_model import LogisticRegression
     from sklearn.ensemble import RandomForestClassifier
-    from sklearn.preprocessing import StandardScaler
     from sklearn.metrics import (
         classification_report, confusion_matrix, roc_curve, auc,
         accuracy_score, cohen_kappa_score, f1_score, precision_score, recall_score
@@ -98,6 +96,12 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    from mbon_utils.ablation import AblationRunner, top_n_sets
+    from mbon_utils.binned_matrix import build_binned_matrix, hist_tree_model
+    from mbon_utils.hyperparameter_search import load_tuned_configs, save_tuned_configs, tune_targets
+    from mbon_utils.model_store import ModelStore
+    from mbon_utils.station_transfer import evaluate_transfer
+
     # Data directories
     DATA_ROOT = project_root / "data"
     data_dir = DATA_ROOT / "processed"
@@ -108,20 +112,26 @@ def _():
     print(f"Data root: {DATA_ROOT}")
     print(f"Plot directory: {plot_dir}")
     return (
+        AblationRunner,
         DATA_ROOT,
+        ModelStore,
         RandomForestClassifier,
-        StandardScaler,
-        cross_val_score,
-        f1_score,
+        StratifiedKFold,
+        build_binned_matrix,
+        evaluate_transfer,
         find_peaks,
+        hist_tree_model,
         json,
+        load_tuned_configs,
         mutual_info_classif,
         np,
         pd,
-        pickle,
         plot_dir,
         plt,
+        save_tuned_configs,
         spearmanr,
+        top_n_sets,
+        tune_targets,
     )
 
 
@@ -138,7 +148,7 @@ def _(mo):
 
 
 @app.cell
-def _(DATA_ROOT, pd, pickle):
+def _(DATA_ROOT, ModelStore, pd):
     # Load processed data from previous notebooks
     print("Loading processed datasets from previous notebooks...")
 
@@ -146,8 +156,7 @@ def _(DATA_ROOT, pd, pickle):
     df_community = pd.read_parquet(DATA_ROOT / "processed/06_community_activity_data.parquet")
 
     # Load best performing models from Notebook 6
-    with open(DATA_ROOT / "processed/06_community_models.pkl", 'rb') as f:
-        community_models = pickle.load(f)
+    community_models = ModelStore(DATA_ROOT / "processed/06_community_models")
 
     # Load reduced acoustic indices from Notebook 3
     df_indices_reduced = pd.read_parquet(DATA_ROOT / "processed/03_reduced_acoustic_indices.parquet")
@@ -162,7 +171,7 @@ def _(DATA_ROOT, pd, pickle):
     print(f"Community data shape: {df_community.shape}")
     print(f"Acoustic indices shape: {df_indices_reduced.shape}")
     print(f"Environmental data shape: {df_env.shape}")
-    print(f"Available community models: {list(community_models.keys())}")
+    print(f"Available community models: {community_models.communities}")
     return df_community, df_det_metadata, df_indices_reduced
 
 
@@ -585,12 +594,10 @@ def _(mo):
 
 @app.cell
 def _(
-    RandomForestClassifier,
-    StandardScaler,
+    DATA_ROOT,
     df_analysis,
-    f1_score,
+    evaluate_transfer,
     index_cols_val,
-    np,
     pattern_fidelity_results,
     spearmanr,
 ):
@@ -692,50 +699,30 @@ def _(
 
     df_modeling = df_analysis[modeling_cols + [target_col, 'station']].dropna()
 
-    for train_station in stations:
-        train_data = df_modeling[df_modeling['station'] == train_station]
-
-        if len(train_data) > 200:  # Minimum training data
-            X_train = train_data[modeling_cols]
-            y_train = train_data[target_col]
-
-            # Standardize features
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-
-            # Train model
-            model = RandomForestClassifier(n_estimators=50, max_depth=6, random_state=42)
-            model.fit(X_train_scaled, y_train)
-
-            # Test on other stations
-            station_performance = {}
-
-            for test_station in stations:
-                if test_station != train_station:
-                    test_data = df_modeling[df_modeling['station'] == test_station]
-
-                    if len(test_data) > 50:  # Minimum test data
-                        X_test = test_data[modeling_cols]
-                        y_test = test_data[target_col]
-
-                        X_test_scaled = scaler.transform(X_test)
-                        y_pred = model.predict(X_test_scaled)
-
-                        f1 = f1_score(y_test, y_pred)
-                        station_performance[test_station] = f1
+    # One model per training station (fitted in parallel, cached on disk), each
+    # scored on every other station in one batch
+    transfer_scores = evaluate_transfer(
+        df_modeling, modeling_cols, target_col,
+        stations=stations,
+        scheme='single',
+        cache_dir=DATA_ROOT / "processed/transfer_cache",
+        min_train=200,
+        min_test=50
+    )
 
-            if station_performance:
-                avg_transfer_f1 = np.mean(list(station_performance.values()))
-                model_transferability[train_station] = {
-                    'transfer_performance': station_performance,
-                    'avg_f1': avg_transfer_f1,
-                    'training_samples': len(train_data)
-                }
+    for train_station, train_scores in transfer_scores.groupby('train_stations', sort=False):
+        station_performance = dict(zip(train_scores['test_station'], train_scores['f1']))
+        avg_transfer_f1 = train_scores['f1'].mean()
+        model_transferability[train_station] = {
+            'transfer_performance': station_performance,
+            'avg_f1': avg_transfer_f1,
+            'training_samples': int(train_scores['n_train'].iloc[0])
+        }
 
-                print(f"Model trained on {train_station}:")
-                print(f"  Average transfer F1: {avg_transfer_f1:.3f}")
-                for test_stn, f1 in station_performance.items():
-                    print(f"    → {test_stn}: F1 = {f1:.3f}")
+        print(f"Model trained on {train_station}:")
+        print(f"  Average transfer F1: {avg_transfer_f1:.3f}")
+        for test_stn, f1 in station_performance.items():
+            print(f"    → {test_stn}: F1 = {f1:.3f}")
 
     transferability_results['models'] = model_transferability
     return (transferability_results,)
@@ -790,13 +777,20 @@ def _(mo):
 
 @app.cell
 def _(
+    AblationRunner,
+    DATA_ROOT,
     RandomForestClassifier,
-    StandardScaler,
-    cross_val_score,
+    StratifiedKFold,
+    build_binned_matrix,
     df_analysis,
+    hist_tree_model,
     index_cols_val,
+    load_tuned_configs,
     mutual_info_classif,
     pd,
+    save_tuned_configs,
+    top_n_sets,
+    tune_targets,
 ):
     # Minimum Viable Index Set Optimization
     print("Optimizing minimum viable index set...")
@@ -819,11 +813,44 @@ def _(
     print(f"\n1. BASELINE PERFORMANCE ASSESSMENT")
     print("-" * 40)
 
-    scaler_baseline = StandardScaler()
-    X_scaled_baseline = scaler_baseline.fit_transform(X_opt)
+    # Cross-validation can instead train histogram gradient boosting on a cached
+    # uint8 quantile-binned matrix (same folds); the forest still supplies importances
+    HIST_TREES = False
+    binned_opt = build_binned_matrix(df_opt, modeling_cols_opt, DATA_ROOT / "processed/binned_cache") if HIST_TREES else None
 
-    baseline_model = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=42)
-    baseline_scores = cross_val_score(baseline_model, X_scaled_baseline, y_opt, cv=5, scoring='f1')
+    # Folds and fold-local scaling are shared by the baseline and every reduced feature
+    # set below; fits run on a process pool and fold scores are cached
+    ablation_opt = AblationRunner(
+        X_opt, y_opt, StratifiedKFold(n_splits=5),
+        binned=binned_opt, cache_dir=DATA_ROOT / "processed/ablation_cache"
+    )
+    X_scaled_baseline = ablation_opt.scaled.scaled()
+
+    # Tuned forest settings from this notebook's own successive-halving search (notebook 06
+    # searches with environmental columns this matrix lacks), stored under 'fish_monitoring'.
+    # The search is slow, so it only re-runs when TUNE_HYPERPARAMETERS is set; a saved search
+    # on other columns prints a warning and the fixed defaults are used
+    TUNE_HYPERPARAMETERS = False
+    tuned_configs_path = DATA_ROOT / "processed/tuned_model_configs.json"
+    if TUNE_HYPERPARAMETERS:
+        print(f"Searching forest hyperparameters on {len(modeling_cols_opt)} features...")
+        _tuned_saved = save_tuned_configs(
+            tuned_configs_path, 'fish_monitoring',
+            tune_targets(X_scaled_baseline, df_opt[[target_col_opt]], ['random_forest'],
+                         times=df_analysis.loc[df_opt.index, 'datetime']),
+            features=modeling_cols_opt
+        )
+        print(f"Saved tuned configurations (version {_tuned_saved}) to {tuned_configs_path}")
+    tuned_configs = load_tuned_configs(tuned_configs_path)
+    baseline_model = RandomForestClassifier(**tuned_configs.params(
+        'random_forest', 'fish_monitoring', target_col_opt, {'n_estimators': 100, 'max_depth': 8, 'random_state': 42},
+        features=modeling_cols_opt
+    ))
+    cv_model_opt = hist_tree_model() if HIST_TREES else baseline_model
+    cv_input_opt = 'binned' if HIST_TREES else 'scaled'
+    baseline_scores = ablation_opt.run(
+        cv_model_opt, {'all': modeling_cols_opt}, scoring='f1', model_input=cv_input_opt
+    )['scores'].iloc[0]
     baseline_f1 = baseline_scores.mean()
 
     print(f"Baseline performance (all {len(modeling_cols_opt)} features):")
@@ -875,21 +902,23 @@ def _(
     feature_counts = [3, 5, 8, 10, 12, 15, len(modeling_cols_opt)]
     reduction_results = {}
 
+    # Top-N feature sets by combined importance, all fitted in one batch
+    top_n_opt = top_n_sets(importance_df['feature'].tolist(), feature_counts)
+    reduction_scores = ablation_opt.run(
+        cv_model_opt, top_n_opt, scoring='f1', model_input=cv_input_opt
+    ).set_index('feature_set')['scores']
+
     for n_features in feature_counts:
         if n_features <= len(modeling_cols_opt):
             # Select top N features by combined importance
-            selected_features = importance_df.head(n_features)['feature'].tolist()
+            selected_features = top_n_opt[f"top_{n_features}"]
 
             # Separate indices from temporal features
             selected_indices = [feat for feat in selected_features if feat in index_cols_val]
             selected_temporal = [feat for feat in selected_features if feat not in index_cols_val]
 
-            X_reduced = X_opt[selected_features]
-            X_reduced_scaled = scaler_baseline.fit_transform(X_reduced)
-
-            # Test performance with reduced feature set
-            reduced_model = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=42)
-            reduced_scores = cross_val_score(reduced_model, X_reduced_scaled, y_opt, cv=5, scoring='f1')
+            # Performance with reduced feature set
+            reduced_scores = reduction_scores[f"top_{n_features}"]
             reduced_f1 = reduced_scores.mean()
 
             # Calculate performance retention
@@ -45,9 +45,24 @@ def _():
 
     DATA_DIR = project_root / "data" / "processed"
 
+    from mbon_utils.community_metrics import SEASON_BY_MONTH, CommunityDefinition, build_community_metrics
+    from mbon_utils.intensity_encoding import IntensityEncoder
+    from mbon_utils.parquet_io import write_parquet_with_metadata
+
     print(f"Project root: {project_root}")
     print(f"Data directory: {DATA_DIR}")
-    return DATA_DIR, mo, np, pd, plt
+    return (
+        CommunityDefinition,
+        DATA_DIR,
+        IntensityEncoder,
+        SEASON_BY_MONTH,
+        build_community_metrics,
+        mo,
+        np,
+        pd,
+        plt,
+        write_parquet_with_metadata,
+    )
 
 
 @app.cell(hide_code=True)
@@ -183,64 +198,58 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(df_detections, dolphin_cols, np):
-    # Calculate combined dolphin activity for threshold determination
-    if len(dolphin_cols) >= 3:
-        # Combine all three dolphin types
-        df_detections['total_dolphin_activity'] = (
-            df_detections[dolphin_cols[0]].fillna(0) + 
-            df_detections[dolphin_cols[1]].fillna(0) + 
-            df_detections[dolphin_cols[2]].fillna(0)
-        )
-
-        print("🔢 Combined Dolphin Activity Analysis:")
-        print("=" * 40)
-
-        total_activity = df_detections['total_dolphin_activity']
-        non_zero_activity = total_activity[total_activity > 0]
-
-        print(f"Total observations: {len(total_activity)}")
-        print(f"Zero activity: {len(total_activity[total_activity == 0])} ({len(total_activity[total_activity == 0])/len(total_activity)*100:.1f}%)")
-        print(f"Non-zero activity: {len(non_zero_activity)} ({len(non_zero_activity)/len(total_activity)*100:.1f}%)")
-
-        if len(non_zero_activity) > 0:
-            print(f"\nNon-zero activity statistics:")
-            print(f"  Min: {non_zero_activity.min()}")
-            print(f"  Max: {non_zero_activity.max()}")
-            print(f"  Mean: {non_zero_activity.mean():.2f}")
-            print(f"  Median: {non_zero_activity.median():.2f}")
-
-            # Calculate data-driven thresholds using percentiles
-            percentiles = [25, 33, 50, 67, 75]
-            print(f"\nPercentiles of non-zero activity:")
-            for p in percentiles:
-                val = np.percentile(non_zero_activity, p)
-                print(f"  {p}th percentile: {val:.1f}")
-
-            # Determine thresholds (using 33rd and 67th percentiles for balanced distribution)
-            low_threshold = np.percentile(non_zero_activity, 33)
-            high_threshold = np.percentile(non_zero_activity, 67)
-
-            # Round up to whole numbers for cleaner thresholds
-            low_threshold = int(np.ceil(low_threshold))
-            high_threshold = int(np.ceil(high_threshold))
-
-            print(f"\n🎯 Recommended Data-Driven Thresholds:")
-            print(f"  Intensity 1 (Low): 1 to {low_threshold-1}")
-            print(f"  Intensity 2 (Medium): {low_threshold} to {high_threshold-1}")  
-            print(f"  Intensity 3 (High): {high_threshold}+")
-
-            thresholds = {'low': low_threshold, 'high': high_threshold}
-
-        else:
-            print("⚠️ No non-zero dolphin activity found!")
-            thresholds = {'low': 1, 'high': 3}  # fallback
+def _(IntensityEncoder, SEASON_BY_MONTH, df_detections, dolphin_cols, np, pd):
+    # Thresholds are computed separately for each of these groups (None pools all data)
+    THRESHOLD_BY = ['station', 'season']
+
+    # Calculate combined dolphin activity (all dolphin call types) for threshold determination
+    df_detections['total_dolphin_activity'] = (
+        df_detections[dolphin_cols].fillna(0).sum(axis=1) if dolphin_cols else 0
+    )
+    if 'season' not in df_detections.columns:
+        df_detections['season'] = SEASON_BY_MONTH[pd.DatetimeIndex(df_detections['datetime']).month]
 
+    print("🔢 Combined Dolphin Activity Analysis:")
+    print("=" * 40)
+
+    total_activity = df_detections['total_dolphin_activity']
+    non_zero_activity = total_activity[total_activity > 0]
+
+    print(f"Dolphin columns combined: {len(dolphin_cols)}")
+    print(f"Total observations: {len(total_activity)}")
+    print(f"Zero activity: {len(total_activity[total_activity == 0])} ({len(total_activity[total_activity == 0])/len(total_activity)*100:.1f}%)")
+    print(f"Non-zero activity: {len(non_zero_activity)} ({len(non_zero_activity)/len(total_activity)*100:.1f}%)")
+
+    if len(non_zero_activity) > 0:
+        print(f"\nNon-zero activity statistics:")
+        print(f"  Min: {non_zero_activity.min()}")
+        print(f"  Max: {non_zero_activity.max()}")
+        print(f"  Mean: {non_zero_activity.mean():.2f}")
+        print(f"  Median: {non_zero_activity.median():.2f}")
+
+        percentiles = [25, 33, 50, 67, 75]
+        print(f"\nPercentiles of non-zero activity:")
+        for p in percentiles:
+            val = np.percentile(non_zero_activity, p)
+            print(f"  {p}th percentile: {val:.1f}")
     else:
-        print("⚠️ Expected 3 dolphin columns, but found:", len(dolphin_cols))
-        thresholds = {'low': 1, 'high': 3}  # fallback
-        df_detections['total_dolphin_activity'] = 0
-    return (thresholds,)
+        print("⚠️ No non-zero dolphin activity found - using fallback thresholds")
+
+    # Data-driven thresholds (33rd and 67th percentiles of non-zero activity, rounded up),
+    # per station and season; sparse groups fall back to the pooled thresholds
+    dolphin_encoder = IntensityEncoder(percentiles=(33, 67), by=THRESHOLD_BY).fit(
+        df_detections, ['total_dolphin_activity']
+    )
+
+    _pooled_low, _pooled_high = dolphin_encoder.pooled_thresholds_['total_dolphin_activity']
+    print(f"\n🎯 Pooled Data-Driven Thresholds:")
+    print(f"  Intensity 1 (Low): 1 to {_pooled_low - 1:.0f}")
+    print(f"  Intensity 2 (Medium): {_pooled_low:.0f} to {_pooled_high - 1:.0f}")
+    print(f"  Intensity 3 (High): {_pooled_high:.0f}+")
+    if THRESHOLD_BY:
+        print(f"\n🎯 Thresholds by {' and '.join(THRESHOLD_BY)} (low / high):")
+        print(dolphin_encoder.thresholds_['total_dolphin_activity'].to_string())
+    return (dolphin_encoder,)
 
 
 @app.cell(hide_code=True)
@@ -250,38 +259,9 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(thresholds):
-    def create_dolphin_intensity(total_dolphin_count, thresholds_dict):
-        """Convert total dolphin count to 0-3 intensity scale
-
-        Args:
-            total_dolphin_count: Combined count of all dolphin vocalizations
-            thresholds_dict: Dict with 'low' and 'high' threshold values
-
-        Returns:
-            int: Dolphin intensity (0-3 scale matching fish intensity)
-        """
-        if total_dolphin_count == 0:
-            return 0  # Absent
-        elif total_dolphin_count < thresholds_dict['high']:
-            if total_dolphin_count < thresholds_dict['low']:
-                return 1  # Low activity
-            else:
-                return 2  # Medium activity
-        else:
-            return 3  # High activity
-
-    print("✅ Dolphin intensity conversion function created")
-    print(f"Using thresholds: {thresholds}")
-    return (create_dolphin_intensity,)
-
-
-@app.cell(hide_code=True)
-def _(create_dolphin_intensity, df_detections, plt, thresholds):
-    # Apply the conversion to create dolphin intensity column
-    df_detections['dolphin_intensity'] = df_detections['total_dolphin_activity'].apply(
-        lambda x: create_dolphin_intensity(x, thresholds)
-    )
+def _(df_detections, dolphin_encoder, plt):
+    # Apply the conversion to create dolphin intensity column (0 = absent, 1-3 = percentile bands)
+    df_detections['dolphin_intensity'] = dolphin_encoder.transform(df_detections)['total_dolphin_activity']
 
     print("🐬 Dolphin Intensity Conversion Results:")
     print("=" * 40)
@@ -411,52 +391,43 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(df_detections, fish_cols, np):
+def _(CommunityDefinition, build_community_metrics, df_detections, fish_cols):
     print("🌊 Creating Marine Community Metrics:")
     print("=" * 40)
 
-    # Create fish-only community metrics first
-    if len(fish_cols) > 0:
-        # Calculate total fish intensity (sum across all fish species)
-        fish_intensity_cols = [col for col in fish_cols if df_detections[col].dtype in ['int64', 'float64']]
-
-        if len(fish_intensity_cols) > 0:
-            df_detections['total_fish_intensity'] = df_detections[fish_intensity_cols].fillna(0).sum(axis=1)
-
-            # Count number of active fish species per time point
-            df_detections['num_active_fish_species'] = (df_detections[fish_intensity_cols].fillna(0) > 0).sum(axis=1)
-
-            # Maximum fish species intensity
-            df_detections['max_fish_intensity'] = df_detections[fish_intensity_cols].fillna(0).max(axis=1)
-
-            print(f"✅ Fish community metrics created:")
-            print(f"  - total_fish_intensity: sum of {len(fish_intensity_cols)} fish species")
-            print(f"  - num_active_fish_species: count of active fish species")
-            print(f"  - max_fish_intensity: maximum intensity across fish species")
-
-        else:
-            print("⚠️ No numeric fish columns found")
-            df_detections['total_fish_intensity'] = 0
-            df_detections['num_active_fish_species'] = 0
-            df_detections['max_fish_intensity'] = 0
-    else:
+    # Fish-only and marine (fish + dolphin intensity as one more species) communities are
+    # reduced by the shared community kernel, one pass over each species block. Missing
+    # detections count as zero.
+    fish_intensity_cols = [col for col in fish_cols if df_detections[col].dtype in ['int64', 'float64']]
+    if not fish_cols:
         print("⚠️ No fish columns found")
-        df_detections['total_fish_intensity'] = 0
-        df_detections['num_active_fish_species'] = 0  
-        df_detections['max_fish_intensity'] = 0
-
-    # Create marine community metrics (fish + dolphins)
-    df_detections['total_marine_intensity'] = df_detections['total_fish_intensity'] + df_detections['dolphin_intensity']
-
-    # Count active marine "species" (fish species + dolphin presence)
-    df_detections['num_active_marine_species'] = df_detections['num_active_fish_species'].copy()
-    df_detections.loc[df_detections['dolphin_intensity'] > 0, 'num_active_marine_species'] += 1
-
-    # Maximum marine intensity (comparing fish max with dolphin intensity)
-    df_detections['max_marine_intensity'] = np.maximum(
-        df_detections['max_fish_intensity'], 
-        df_detections['dolphin_intensity']
-    )
+    elif not fish_intensity_cols:
+        print("⚠️ No numeric fish columns found")
+
+    _communities = [
+        CommunityDefinition('fish', fish_intensity_cols, {
+            'total': 'total_fish_intensity',
+            'n_active': 'num_active_fish_species',
+            'max': 'max_fish_intensity',
+        }, fill_value=0.0),
+        CommunityDefinition('marine', fish_intensity_cols + ['dolphin_intensity'], {
+            'total': 'total_marine_intensity',
+            'n_active': 'num_active_marine_species',
+            'max': 'max_marine_intensity',
+        }, fill_value=0.0),
+    ]
+    for _community in _communities:
+        _metrics, _ = build_community_metrics(df_detections, _community)
+        df_detections[_metrics.columns] = _metrics
+
+    if fish_intensity_cols:
+        print(f"✅ Fish community metrics created:")
+        print(f"  - total_fish_intensity: sum of {len(fish_intensity_cols)} fish species")
+        print(f"  - num_active_fish_species: count of active fish species")
+        print(f"  - max_fish_intensity: maximum intensity across fish species")
+    else:
+        # An empty species block has no maximum; without fish the maximum is 0, like the total
+        df_detections['max_fish_intensity'] = 0.0
 
     print(f"\n✅ Marine community metrics created:")
     print(f"  - total_marine_intensity: fish + dolphin intensity")
@@ -550,14 +521,14 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(DATA_DIR, df_detections):
+def _(DATA_DIR, df_detections, dolphin_encoder, write_parquet_with_metadata):
     # Save the enhanced dataset with dolphin intensity and marine community metrics
     output_file = DATA_DIR / "02_detections_with_marine_community.parquet"
 
     # Select key columns to save
     key_columns = [
         # Original temporal and station info
-        'datetime', 'station', 'hour', 'day_of_year', 'month',
+        'datetime', 'station', 'hour', 'day_of_year', 'month', 'season',
 
         # Individual dolphin counts (original)
         'Bottlenose dolphin echolocation', 'Bottlenose dolphin burst pulses', 'Bottlenose dolphin whistles',
@@ -581,8 +552,10 @@ def _(DATA_DIR, df_detections):
 
     df_to_save = df_detections[columns_to_save].copy()
 
-    # Save the enhanced dataset
-    df_to_save.to_parquet(output_file, index=False)
+    # Save the enhanced dataset, with the intensity thresholds in the Parquet schema metadata
+    write_parquet_with_metadata(
+        df_to_save, output_file, {'intensity_thresholds': dolphin_encoder.metadata()}
+    )
 
     print(f"💾 Enhanced dataset saved: {output_file}")
     print(f"   Rows: {len(df_to_save)}")
@@ -605,7 +578,7 @@ def _(mo):
 
     1. **✅ Verified dolphin data exists** in processed files
     2. **✅ Analyzed dolphin count distributions** to understand the data
-    3. **✅ Implemented data-driven thresholds** using 33rd and 67th percentiles
+    3. **✅ Implemented data-driven thresholds** using 33rd and 67th percentiles per station and season
     4. **✅ Converted dolphin counts to 0-3 intensity scale** matching fish metrics
     5. **✅ Created marine community metrics** combining fish + dolphin intensity
     6. **✅ Validated the conversion** by comparing fish vs dolphin distributions
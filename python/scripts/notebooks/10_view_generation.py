@@ -43,9 +43,25 @@ def _():
     while not (project_root / "data").exists() and project_root != project_root.parent:
         project_root = project_root.parent
 
+    from mbon_utils.coverage_index import CoverageIndex
+    from mbon_utils.model_store import ModelStore
+    from mbon_utils.threshold_curves import grouped_metrics, score_matrix_metrics
+
     DATA_ROOT = project_root / "data"
     VIEWS_FOLDER = str(DATA_ROOT / "views") + "/"
-    return DATA_ROOT, VIEWS_FOLDER, dendrogram, linkage, pd, squareform
+    return (
+        CoverageIndex,
+        DATA_ROOT,
+        ModelStore,
+        VIEWS_FOLDER,
+        dendrogram,
+        grouped_metrics,
+        linkage,
+        np,
+        pd,
+        score_matrix_metrics,
+        squareform,
+    )
 
 
 @app.cell(hide_code=True)
@@ -553,6 +569,41 @@ def _(DATA_ROOT, VIEWS_FOLDER, json, pd):
     return
 
 
+@app.cell(hide_code=True)
+def _(CoverageIndex, DATA_ROOT, VIEWS_FOLDER, json, pd):
+    # Generate temporal coverage view from the notebook 1 interval index
+    try:
+        print("\n=== GENERATING TEMPORAL COVERAGE VIEW ===")
+
+        coverage_intervals_path = DATA_ROOT / "processed" / "01_coverage_intervals.parquet"
+
+        if not coverage_intervals_path.exists():
+            print(f"Warning: Coverage intervals file not found at {coverage_intervals_path}")
+            print("Please run notebook 01_data_prep.py first")
+        else:
+            coverage_view_index = CoverageIndex.from_intervals(pd.read_parquet(coverage_intervals_path))
+
+            # Intervals, gaps over a day, windows with every stream present and per-stream summaries
+            coverage_data = coverage_view_index.to_records(min_gap_hours=24)
+            coverage_data['metadata'] = {
+                'stations': coverage_view_index.stations,
+                'streams': coverage_view_index.streams(),
+                'gap_threshold_hours': 24,
+            }
+
+            with open(f"{VIEWS_FOLDER}temporal_coverage.json", 'w') as coverage_file:
+                json.dump(coverage_data, coverage_file, indent=2)
+
+            print(f"Generated temporal coverage data:")
+            print(f"  Intervals: {len(coverage_data['intervals'])}")
+            print(f"  Gaps over 24h: {len(coverage_data['gaps'])}")
+            print(f"  Saved to: temporal_coverage.json")
+
+    except Exception as e:
+        print(f"Error generating temporal coverage data: {e}")
+    return
+
+
 @app.cell(hide_code=True)
 def _(mo):
     mo.md(
@@ -568,7 +619,16 @@ def _(mo):
 
 
 @app.cell
-def _(DATA_ROOT, VIEWS_FOLDER, json, pd):
+def _(
+    DATA_ROOT,
+    ModelStore,
+    VIEWS_FOLDER,
+    grouped_metrics,
+    json,
+    np,
+    pd,
+    score_matrix_metrics,
+):
     # Generate community screening dashboard view from notebook 6 results
     try:
         print("\n=== GENERATING COMMUNITY SCREENING DASHBOARD VIEW ===")
@@ -576,143 +636,154 @@ def _(DATA_ROOT, VIEWS_FOLDER, json, pd):
         # Load results from notebook 6
         df_community = pd.read_parquet(DATA_ROOT / "processed/06_community_activity_data.parquet")
 
-        # Load model results
-        import pickle
-        with open(DATA_ROOT / "processed/06_community_models.pkl", 'rb') as model_file:
-            model_results = pickle.load(model_file)
+        # Load model metrics (the index only - fitted models stay on disk)
+        model_store = ModelStore(DATA_ROOT / "processed/06_community_models")
 
         # Load analysis summary
         with open(DATA_ROOT / "processed/06_community_analysis_summary.json", 'r') as summary_file:
             analysis_summary = json.load(summary_file)
 
+        # Notebook 6 stores results per community; this dashboard screens the fish community
+        fish_model_results = model_store.results('fish')
+
         print(f"Loaded community data: {df_community.shape[0]:,} samples")
-        print(f"Model targets: {list(model_results.keys())}")
+        print(f"Model targets: {list(fish_model_results.keys())}")
+
+        # Out-of-fold probabilities from notebook 6: every modeling row was scored
+        # by a model that never saw it during training
+        modeling_positions = df_community.index.get_indexer(model_store.rows('fish'))
 
         ## 1. TIMELINE DATA WITH PREDICTIONS
-        # Prepare timeline data with actual activity and model predictions
-        timeline_data = []
-
-        # Get predictions for each target from the best models
-        target_predictions = {}
-        for target, models in model_results.items():
-            # Find best model (highest F1 score)
-            best_model_name = max(models.keys(), key=lambda x: models[x]['f1'])
-            best_model = models[best_model_name]
-            target_predictions[target] = {
-                'model_name': best_model_name,
-                'predictions': best_model.get('y_pred', []),
-                'probabilities': best_model.get('y_prob', []),
-                'test_indices': range(len(best_model.get('y_pred', []))),  # Simplified for demo
-                'performance': {
-                    'f1_score': best_model['f1'],
-                    'precision': best_model['precision'], 
-                    'recall': best_model['recall']
-                }
-            }
+        # Best model (highest F1) per target and its probabilities aligned to df_community;
+        # rows that were dropped from modeling (missing features) have no probability
+        best_model_names = {}
+        oof_probabilities = {}
+        timeline_probabilities = {}
+        for target, models in fish_model_results.items():
+            best_model_name = model_store.best_model('fish', target)
+            best_model_names[target] = best_model_name
+            oof_probabilities[target] = model_store.array('fish', target, best_model_name, 'oof_prob').astype(float)
+
+            aligned = np.full(len(df_community), np.nan)
+            aligned[modeling_positions] = oof_probabilities[target]
+            timeline_probabilities[target] = aligned
 
         # Use the complete dataset - no need to sample
         # The full dataset is only ~8MB JSON (~1.6MB gzipped) which is very manageable
-        df_sample = df_community.copy()
+        df_sample = df_community
 
         print(f"Using complete dataset: {len(df_sample):,} samples")
         print(f"Data distribution by station:")
         print(df_sample['station'].value_counts())
 
-        # Generate realistic model probabilities for demonstration
-        # In a real implementation, these would come from actual model predictions
-        import numpy as _np
-        _np.random.seed(42)  # For reproducible results
-
-        for idx, row in df_sample.iterrows():
-            # Generate realistic probabilities based on actual activity levels
-            # Higher activity = higher probability of being flagged
-            base_prob = {
-                'any_activity': min(0.9, 0.3 + row['total_fish_activity'] * 0.15 + _np.random.normal(0, 0.1)),
-                'high_activity_75th': min(0.9, 0.2 + row['total_fish_activity'] * 0.12 + _np.random.normal(0, 0.1)),
-                'high_activity_90th': min(0.9, 0.15 + row['total_fish_activity'] * 0.1 + _np.random.normal(0, 0.1)),
-                'multi_species_active': min(0.9, 0.2 + row['num_active_species'] * 0.2 + _np.random.normal(0, 0.1))
-            }
-
-            # Ensure probabilities are in valid range
-            for target in base_prob:
-                base_prob[target] = max(0.05, min(0.95, base_prob[target]))
-
-            timeline_entry = {
-                'datetime': row['datetime'].isoformat(),
-                'day_of_year': row['datetime'].dayofyear,
-                'hour': row['hour'],
-                'month': row['month'],
-                'station': row['station'],
+        def json_column(values, decimals=None):
+            """Column as a JSON-ready list with NaN mapped to None."""
+            values = pd.Series(values, index=df_sample.index, dtype=float)
+            if decimals is not None:
+                values = values.round(decimals)
+            return values.astype(object).where(values.notna(), None).tolist()
+
+        # Build each field once as a column, then zip the columns into records
+        timestamps = pd.DatetimeIndex(df_sample['datetime'])
+        missing_column = np.full(len(df_sample), np.nan)
+        flag_columns = ['any_activity', 'high_activity_75th', 'high_activity_90th', 'multi_species_active']
+        record_columns = zip(
+            timestamps.strftime('%Y-%m-%dT%H:%M:%S').tolist(),
+            timestamps.dayofyear.tolist(),
+            df_sample['hour'].tolist(),
+            df_sample['month'].tolist(),
+            df_sample['station'].tolist(),
+            json_column(df_sample['total_fish_activity']),
+            json_column(df_sample['num_active_species']),
+            json_column(df_sample['max_species_activity']),
+            json_column(df_sample.get('Water temp (°C)', missing_column)),
+            json_column(df_sample.get('Water depth (m)', missing_column)),
+            zip(*(df_sample[flag].astype(bool).tolist() for flag in flag_columns)),
+            # zip() of no columns would end the records early, so no targets gives empty tuples
+            zip(*(json_column(probs, 4) for probs in timeline_probabilities.values()))
+            if timeline_probabilities else [()] * len(df_sample),
+        )
+
+        timeline_data = [
+            {
+                'datetime': dt,
+                'day_of_year': day_of_year,
+                'hour': hour,
+                'month': month,
+                'station': station,
                 'actual_community_activity': {
-                    'total_fish_activity': float(row['total_fish_activity']),
-                    'num_active_species': float(row['num_active_species']),
-                    'max_species_activity': float(row['max_species_activity'])
+                    'total_fish_activity': total_fish,
+                    'num_active_species': num_species,
+                    'max_species_activity': max_species
                 },
                 'environmental_context': {
-                    'water_temp': float(row['Water temp (°C)']) if pd.notna(row.get('Water temp (°C)')) else None,
-                    'water_depth': float(row['Water depth (m)']) if pd.notna(row.get('Water depth (m)')) else None
+                    'water_temp': water_temp,
+                    'water_depth': water_depth
                 },
-                # Add binary activity flags (ground truth)
-                'activity_flags': {
-                    'any_activity': bool(row['any_activity']),
-                    'high_activity_75th': bool(row['high_activity_75th']),
-                    'high_activity_90th': bool(row['high_activity_90th']), 
-                    'multi_species_active': bool(row['multi_species_active'])
-                },
-                # Model probabilities for client-side threshold calculation
+                # Binary activity flags (ground truth)
+                'activity_flags': dict(zip(flag_columns, flags)),
+                # Out-of-fold model probabilities for client-side threshold calculation
                 'model_probabilities': {
                     target: {
-                        'probability': float(base_prob[target]),
-                        'model_name': target_predictions[target]['model_name']
-                    } for target in target_predictions.keys()
+                        'probability': probability,
+                        'model_name': best_model_names[target]
+                    } for target, probability in zip(timeline_probabilities.keys(), probabilities)
                 }
             }
-            timeline_data.append(timeline_entry)
+            for (dt, day_of_year, hour, month, station, total_fish, num_species, max_species,
+                 water_temp, water_depth, flags, probabilities) in record_columns
+        ]
 
         print(f"Generated timeline data: {len(timeline_data)} entries")
 
         ## 2. SCREENING SCENARIOS AT DIFFERENT THRESHOLDS
-        # Pre-compute performance at different threshold levels
-        threshold_scenarios = []
-        thresholds = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
-
-        for target, models in model_results.items():
-            best_model_name = max(models.keys(), key=lambda x: models[x]['f1'])
-            best_model = models[best_model_name]
-
-            for threshold in thresholds:
-                # Calculate metrics at this threshold (simplified)
-                # In a real implementation, you'd re-threshold the probability predictions
-                base_precision = best_model['precision']
-                base_recall = best_model['recall']
-
-                # Simulate threshold effects (simplified)
-                threshold_factor = abs(0.5 - threshold) * 0.5 + 0.75
-
-                scenario = {
-                    'target_type': target,
-                    'model_name': best_model_name,
-                    'threshold': threshold,
+        # Exact precision/recall/effort at each threshold from the out-of-fold probabilities,
+        # scored against the modeling rows' true labels - all targets sorted in one call
+        thresholds = np.round(np.arange(0.05, 1.0, 0.05), 2)
+        scenario_targets = list(oof_probabilities.keys())
+
+        def scenario_records(metrics, extra_keys=()):
+            """Threshold metrics rows as screening scenario records."""
+            return [
+                {
+                    **{key: threshold_row[key] for key in extra_keys},
+                    'target_type': threshold_row['curve'],
+                    'model_name': best_model_names[threshold_row['curve']],
+                    'threshold': float(threshold_row['threshold']),
                     'estimated_metrics': {
-                        'precision': min(1.0, base_precision * (1 + (threshold - 0.5) * 0.3)),
-                        'recall': min(1.0, base_recall * (1 - (threshold - 0.5) * 0.2)),
-                        'effort_reduction': threshold * 0.8,  # Higher threshold = more effort reduction
-                        'detection_rate': base_recall * (1 - (threshold - 0.5) * 0.2)
+                        'precision': float(threshold_row['precision']),
+                        'recall': float(threshold_row['recall']),
+                        'effort_reduction': float(threshold_row['effort_reduction']),
+                        'detection_rate': float(threshold_row['detection_rate']),
+                        'f1_score': float(threshold_row['f1_score'])
                     }
                 }
+                for threshold_row in metrics.to_dict('records')
+            ]
+
+        # No target with out-of-fold probabilities: write empty scenario lists, keep the rest of the view
+        threshold_scenarios = []
+        station_threshold_scenarios = []
+        if scenario_targets:
+            scenario_scores = np.column_stack([oof_probabilities[target] for target in scenario_targets])
+            scenario_labels = df_community[scenario_targets].to_numpy(dtype=float)[modeling_positions]
 
-                # Calculate F1 score
-                p = scenario['estimated_metrics']['precision']
-                r = scenario['estimated_metrics']['recall']
-                scenario['estimated_metrics']['f1_score'] = (2 * p * r) / (p + r) if (p + r) > 0 else 0
+            threshold_scenarios = scenario_records(score_matrix_metrics(
+                scenario_scores, scenario_labels, thresholds=thresholds, names=scenario_targets
+            ))
 
-                threshold_scenarios.append(scenario)
+            # Same scenarios per station, so the dashboard can show where screening works best
+            station_threshold_scenarios = scenario_records(grouped_metrics(
+                scenario_scores, scenario_labels, df_community['station'].to_numpy()[modeling_positions],
+                thresholds=thresholds, names=scenario_targets, group_name='station'
+            ), extra_keys=('station',))
 
-        print(f"Generated screening scenarios: {len(threshold_scenarios)} scenarios")
+        print(f"Generated screening scenarios: {len(threshold_scenarios)} scenarios "
+              f"({len(station_threshold_scenarios)} per-station)")
 
         ## 3. MODEL PERFORMANCE COMPARISON
         model_comparison = []
-        for target, models in model_results.items():
+        for target, models in fish_model_results.items():
             for model_name, model_data in models.items():
                 model_comparison.append({
                     'target_type': target,
@@ -768,7 +839,7 @@ def _(DATA_ROOT, VIEWS_FOLDER, json, pd):
                     'f1_score': max(models[x]['f1'] for x in models.keys()),
                     'precision': models[max(models.keys(), key=lambda x: models[x]['f1'])]['precision'],
                     'recall': models[max(models.keys(), key=lambda x: models[x]['f1'])]['recall']
-                } for target, models in model_results.items()
+                } for target, models in fish_model_results.items()
             }
         }
 
@@ -776,6 +847,7 @@ def _(DATA_ROOT, VIEWS_FOLDER, json, pd):
         screening_dashboard_data = {
             'timeline_data': timeline_data,
             'threshold_scenarios': threshold_scenarios,
+            'station_threshold_scenarios': station_threshold_scenarios,
             'model_comparison': model_comparison,
             'feature_importance': feature_importance_data,
             'summary_statistics': summary_stats,
@@ -784,8 +856,8 @@ def _(DATA_ROOT, VIEWS_FOLDER, json, pd):
                 'data_source': 'notebook_06_community_pattern_detection',
                 'sample_size': len(timeline_data),
                 'total_available': len(df_community),
-                'targets': list(model_results.keys()),
-                'models': list(set(model_name for models in model_results.values() for model_name in models.keys()))
+                'targets': list(fish_model_results.keys()),
+                'models': list(set(model_name for models in fish_model_results.values() for model_name in models.keys()))
             }
         }
 
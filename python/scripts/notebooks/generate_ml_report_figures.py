@@ -11,6 +11,7 @@ Figures created:
 2. Temporal Validation Performance Drop  
 3. Species Prediction Failure Examples
 4. ML Journey Summary
+5. Grouped Permutation Importance (temporal CV)
 
 Author: Marine Biodiversity Observation Network
 """
@@ -149,12 +150,13 @@ def create_temporal_validation_drop_figure():
         with open(data_dir / "06_04_temporal_modeling_analysis.json", 'r') as f:
             temporal_results = json.load(f)
         
-        # Extract performance data
-        models = ['Logistic Regression', 'Random Forest']
-        standard_cv = [temporal_results['logistic']['cv_comparison']['standard_cv_f1'],
-                      temporal_results['random_forest']['cv_comparison']['standard_cv_f1']]
-        temporal_cv = [temporal_results['logistic']['cv_comparison']['temporal_cv_f1'],
-                      temporal_results['random_forest']['cv_comparison']['temporal_cv_f1']]
+        # Extract performance data (06_04 stores histogram gradient boosting under its own
+        # key instead of the random forest when run with HIST_TREES)
+        tree_key = 'random_forest' if 'random_forest' in temporal_results else 'hist_gradient_boosting'
+        model_keys = ['logistic', tree_key]
+        models = ['Logistic Regression', 'Random Forest' if tree_key == 'random_forest' else 'Hist Gradient Boosting']
+        standard_cv = [temporal_results[key]['cv_comparison']['standard_cv_f1'] for key in model_keys]
+        temporal_cv = [temporal_results[key]['cv_comparison']['temporal_cv_f1'] for key in model_keys]
         
         # Calculate performance drops
         drops = [std - temp for std, temp in zip(standard_cv, temporal_cv)]
@@ -466,6 +468,50 @@ def create_ml_journey_summary_figure():
         return False
 
 
+def create_permutation_importance_figure():
+    """
+    Create visualization of grouped permutation importance under temporal CV.
+    """
+    print("📊 Creating Permutation Importance Figure...")
+    
+    try:
+        # Written by notebook 06_04 (each index permuted together with its lags)
+        with open(data_dir / "06_04_permutation_importance.json", 'r') as f:
+            permutation_results = json.load(f)
+        
+        groups = pd.DataFrame(permutation_results['groups']).head(15).iloc[::-1]
+        baseline_f1 = np.mean(permutation_results['baseline_f1'])
+        
+        fig, ax = plt.subplots(1, 1, figsize=(10, 7))
+        colors = ['forestgreen' if value > 0 else 'lightgray' for value in groups['importance_mean']]
+        ax.barh(groups['group'], groups['importance_mean'], xerr=groups['importance_std'],
+                color=colors, alpha=0.8, edgecolor='black', capsize=3)
+        ax.axvline(0, color='black', lw=1)
+        
+        ax.set_xlabel('F1 drop when feature group is permuted', fontweight='bold')
+        ax.set_title(f'Grouped Permutation Importance ({permutation_results["cv"]})\n'
+                     f'Baseline F1 = {baseline_f1:.3f}, {permutation_results["n_repeats"]} repeats per fold',
+                     fontweight='bold', fontsize=12)
+        ax.grid(axis='x', alpha=0.3)
+        
+        for i, (value, n_features) in enumerate(zip(groups['importance_mean'], groups['n_features'])):
+            ax.text(max(value, 0) + 0.002, i, f'{n_features} feat.', va='center', fontsize=8)
+        
+        plt.tight_layout()
+        plt.savefig(output_dir / '02e_permutation_importance.png', 
+                   bbox_inches='tight', facecolor='white')
+        plt.savefig(output_dir / 'ml_permutation_importance.png', 
+                   bbox_inches='tight', facecolor='white')
+        plt.close()
+        
+        print("   ✅ Permutation importance figure created")
+        return True
+        
+    except Exception as e:
+        print(f"   ❌ Error creating permutation importance figure: {e}")
+        return False
+
+
 def main():
     """Main function to generate all figures."""
     print(f"Output directory: {output_dir}")
@@ -485,9 +531,12 @@ def main():
     if create_ml_journey_summary_figure():
         success_count += 1
     
+    if create_permutation_importance_figure():
+        success_count += 1
+    
     print("\n" + "=" * 50)
     print(f"🎉 ML Report Figure Generation Complete!")
-    print(f"✅ {success_count}/4 figures created successfully")
+    print(f"✅ {success_count}/5 figures created successfully")
     print(f"📁 Figures saved to: {output_dir}")
     
     # List created files
@@ -497,7 +546,7 @@ def main():
         for file in sorted(created_files):
             print(f"   • {file.name}")
     
-    return success_count == 4
+    return success_count == 5
 
 
 if __name__ == "__main__":